@@ -0,0 +1 @@
+default_app_config = 'group_project_v2.apps.GroupProjectV2Config'  # pylint: disable=invalid-name
@@ -0,0 +1,402 @@
+"""
+Shared cache and revalidation of memoized project API reads.
+
+``memoize_with_expiration`` keeps values in per-process dicts. With ``GROUP_PROJECT_V2_API_CACHE_BACKEND`` Django
+setting pointing at a backend class, values missing or expired in the process are looked up in the shared backend
+before calling the API, and values fetched from the API are stored there - so all worker processes share warm data.
+
+``DjangoCacheBackend`` stores values in the Django cache named by ``GROUP_PROJECT_V2_API_CACHE_ALIAS`` setting
+(default ``"default"``) - locmem, file-based, memcached, redis or any other configured cache. Values are stored as
+compact JSON, with DTOs registered with ``register_dto`` stored as their attributes. Keys are namespaced by memoized
+function, course and content id; other arguments are hashed.
+
+Shared cache errors are logged and treated as cache misses.
+
+Memoized entries also keep validators (``ETag`` and ``Last-Modified`` headers) of the response they were built from,
+if the memoized function made a single API request. When such entry expires the request is sent as a conditional
+one, and if the API responds with 304 Not Modified the entry is kept for another caching period - without parsing the
+response or building DTOs again (see ``revalidation``).
+"""
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.utils.module_loading import import_string
+
+from group_project_v2 import api_tracing, metrics
+
+log = logging.getLogger(__name__)
+
+# bump when serialization format or memoized functions' results change incompatibly
+KEY_PREFIX = 'group_project_v2:api:2'
+NAMESPACE_PARAMETERS = ('course_id', 'content_id')
+
+_SET_TAG = '$s'
+_TUPLE_TAG = '$t'
+_DTO_TAG = '$o'
+_DICT_TAG = '$d'
+_TAGS = (_SET_TAG, _TUPLE_TAG, _DTO_TAG, _DICT_TAG)
+
+_dto_classes = {}
+_backend = None  # pylint: disable=invalid-name
+_local = threading.local()
+
+
+class NotModified(Exception):
+    """
+    Raised instead of returning response to conditional request if requested resource was not modified
+    """
+
+
+def register_dto(cls):
+    """
+    Class decorator - allows storing instances of the class in shared cache. Instances are stored as their attributes
+    and restored without calling ``__init__``.
+    """
+    _dto_classes[cls.__name__] = cls
+    return cls
+
+
+def _encode_tagged(value):
+    """
+    Encodes value of a type JSON does not have as single-key dict, tagged with the type
+    """
+    if isinstance(value, tuple):
+        return {_TUPLE_TAG: [_encode(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {_SET_TAG: [_encode(item) for item in value]}
+    if _dto_classes.get(type(value).__name__) is type(value):
+        return {_DTO_TAG: [type(value).__name__, _encode(vars(value))]}
+    raise TypeError("Can't store {} in shared cache".format(type(value).__name__))
+
+
+def _encode(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise TypeError("Can't store dict with non-string keys in shared cache")
+        encoded = {key: _encode(item) for key, item in value.items()}
+        # dicts looking like tagged values are tagged too
+        return {_DICT_TAG: encoded} if len(encoded) == 1 and next(iter(encoded)).startswith('$') else encoded
+    return _encode_tagged(value)
+
+
+def _decode_tagged(tag, tagged_value):
+    if tag == _DICT_TAG:
+        return {key: _decode(item) for key, item in tagged_value.items()}
+    if tag == _TUPLE_TAG:
+        return tuple(_decode(item) for item in tagged_value)
+    if tag == _SET_TAG:
+        return set(_decode(item) for item in tagged_value)
+    class_name, attributes = tagged_value
+    dto = object.__new__(_dto_classes[class_name])
+    dto.__dict__.update(_decode(attributes))
+    return dto
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1 and next(iter(value)) in _TAGS:
+        return _decode_tagged(*next(iter(value.items())))
+    return {key: _decode(item) for key, item in value.items()}
+
+
+def dumps(entry):
+    """
+    :param dict entry: memoized entry - timestamp and result
+    :rtype: str
+    """
+    return json.dumps(
+        [entry['timestamp'].timestamp(), _encode(entry['result']), entry.get('validators')], separators=(',', ':')
+    )
+
+
+def loads(data):
+    """
+    :param str data: entry serialized with ``dumps``
+    :rtype: dict
+    """
+    timestamp, result, validators = json.loads(data)
+    return {'timestamp': datetime.fromtimestamp(timestamp), 'result': _decode(result), 'validators': validators}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_signature(func):
+    return inspect.signature(func)
+
+
+def _get_argument_key(value):
+    get_cache_key = getattr(value, 'get_cache_key', None)
+    return get_cache_key() if callable(get_cache_key) else value
+
+
+def make_key(func, args, kwargs):
+    """
+    Returns shared cache key of memoized function call: key prefix, function path, course and content ids the
+    function is called with (arguments with names ending with ``course_id`` or ``content_id``) and a hash of all
+    arguments. Arguments are hashed by their ``repr``, or by result of ``get_cache_key()`` method if they have one -
+    so that the key is the same in every process.
+
+    :rtype: str
+    """
+    try:
+        arguments = _get_signature(func).bind(*args, **kwargs).arguments
+    except TypeError:
+        arguments = dict(enumerate(args), **kwargs)
+    namespace = ''.join(
+        ':{}={}'.format(name, value) for name, value in sorted(arguments.items())
+        if str(name).endswith(NAMESPACE_PARAMETERS)
+    )
+    arguments_key = repr([(name, _get_argument_key(value)) for name, value in arguments.items()])
+    digest = hashlib.sha1(arguments_key.encode('utf-8')).hexdigest()
+    return '{}:{}.{}{}:{}'.format(KEY_PREFIX, func.__module__, func.__qualname__, namespace, digest)
+
+
+class DjangoCacheBackend(object):
+    """
+    Stores entries in the Django cache named by ``GROUP_PROJECT_V2_API_CACHE_ALIAS`` setting
+    """
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'GROUP_PROJECT_V2_API_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)]
+
+    def get(self, key):
+        data = self.cache.get(key)
+        return loads(data) if data is not None else None
+
+    def set(self, key, entry, timeout):
+        self.cache.set(key, dumps(entry), timeout)
+
+
+def get_backend():
+    """
+    Returns backend configured with ``GROUP_PROJECT_V2_API_CACHE_BACKEND`` setting, or set with ``set_backend``;
+    None if shared cache is not used.
+    """
+    global _backend  # pylint: disable=global-statement
+    if _backend is None:
+        backend_path = getattr(settings, 'GROUP_PROJECT_V2_API_CACHE_BACKEND', None)
+        if backend_path:
+            _backend = import_string(backend_path)()
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Overrides configured backend; pass None to use the configured one again
+    """
+    global _backend  # pylint: disable=global-statement
+    _backend = backend
+
+
+def get_entry(key):
+    """
+    :param str key: shared cache key - see ``make_key``
+    :return: entry stored under the key, None if there's no such entry or shared cache can't be read
+    :rtype: dict|None
+    """
+    try:
+        return get_backend().get(key)
+    except Exception:  # pylint: disable=broad-except
+        log.warning("Failed to read shared cache entry %s", key, exc_info=True)
+        return None
+
+
+def set_entry(key, entry, timeout):
+    """
+    :param str key: shared cache key - see ``make_key``
+    :param dict entry: memoized entry - timestamp and result
+    :param datetime.timedelta timeout: for how long the entry should be kept
+    """
+    try:
+        get_backend().set(key, entry, timeout.total_seconds())
+    except Exception:  # pylint: disable=broad-except
+        log.warning("Failed to store shared cache entry %s", key, exc_info=True)
+
+
+class Revalidation(object):
+    """
+    Requests made by memoized function call - see ``revalidation``
+    """
+    def __init__(self, validators):
+        self.validators = validators
+        self.responses = []
+        self.nested_calls = False
+
+    def get_validators(self):
+        """
+        :return: validators of the response the call result was built from, None if it can't be revalidated
+        :rtype: dict|None
+        """
+        if self.nested_calls or len(self.responses) != 1:
+            return None
+        validators = self.responses[0]
+        return validators if validators['etag'] or validators['last_modified'] else None
+
+
+@contextmanager
+def revalidation(stale_entry):
+    """
+    Records validators of API responses received within the context, and makes requests made within the context
+    conditional on validators of ``stale_entry``
+
+    :param dict|None stale_entry: expired memoized entry
+    :rtype: Revalidation
+    """
+    outer = getattr(_local, 'revalidation', None)
+    _local.revalidation = Revalidation(stale_entry.get('validators') if stale_entry else None)
+    try:
+        yield _local.revalidation
+    finally:
+        _local.revalidation = outer
+
+
+def record_memoized_call():
+    """
+    Memoized functions calling other memoized functions can't be revalidated - their result might depend on the
+    data other functions returned from their cache
+    """
+    current = getattr(_local, 'revalidation', None)
+    if current is not None:
+        current.nested_calls = True
+
+
+def get_conditional_headers(url):
+    """
+    :return: headers making request to the URL conditional, if it's revalidating memoized entry
+    :rtype: dict|None
+    """
+    current = getattr(_local, 'revalidation', None)
+    validators = current.validators if current is not None else None
+    if not validators or validators['url'] != url:
+        return None
+    headers = {}
+    if validators['etag']:
+        headers['If-None-Match'] = validators['etag']
+    if validators['last_modified']:
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+def record_response(url, etag, last_modified):
+    """
+    Records validators of API response, if it's made by memoized function
+    """
+    current = getattr(_local, 'revalidation', None)
+    if current is not None:
+        current.responses.append({'url': url, 'etag': etag, 'last_modified': last_modified})
+
+
+def _get_latest_entry(*entries):
+    """
+    :param dict|None entries: memoized entries, possibly missing
+    :return: the most recent entry, the first one of equally recent; None if all entries are missing
+    :rtype: dict|None
+    """
+    return max((entry for entry in entries if entry is not None), key=lambda entry: entry['timestamp'], default=None)
+
+
+class MemoizedEntries(object):
+    """
+    Process cache of a function memoized with ``memoize_with_expiration``: loads entries from shared cache, or by
+    calling the function (revalidating stale entry, if possible), and refreshes them in background
+    """
+    def __init__(self, func, expires_after, shared_timeout):
+        """
+        :param callable func: memoized function
+        :param datetime.timedelta expires_after: caching period
+        :param datetime.timedelta shared_timeout: for how long entries are kept in shared cache
+        """
+        self.func = func
+        self.expires_after = expires_after
+        self.shared_timeout = shared_timeout
+        self.cache = {}
+        self._refreshing_keys = set()
+        self._refreshing_lock = threading.Lock()
+
+    def call(self, key, args, kwargs, stale_entry):
+        """
+        Calls func, or only revalidates stale entry with a conditional API request
+        """
+        name = self.func.__name__
+        try:
+            with api_tracing.cache_miss(), revalidation(stale_entry) as current_revalidation:
+                result = self.func(*args, **kwargs)
+        except NotModified:
+            log.info("Cached value for key %s not modified", key)
+            metrics.CACHE_REVALIDATIONS.inc(cache=name, result='not_modified')
+            return dict(stale_entry, timestamp=datetime.now())
+
+        if stale_entry is not None and stale_entry.get('validators'):
+            metrics.CACHE_REVALIDATIONS.inc(cache=name, result='modified')
+        log.info("Updating cached value for key %s", key)
+        return {
+            'timestamp': datetime.now(),
+            'result': result,
+            'validators': current_revalidation.get_validators(),
+        }
+
+    def is_fresh(self, entry):
+        """
+        :param dict entry: memoized entry
+        :rtype: bool
+        """
+        return entry['timestamp'] + self.expires_after > datetime.now()
+
+    def load(self, key, args, kwargs, stale_entry):
+        """
+        Takes fresh entry from shared cache, or calls func and stores result there; stores the entry in process cache
+        """
+        shared_key = make_key(self.func, args, kwargs) if get_backend() else None
+        shared_entry = get_entry(shared_key) if shared_key else None
+        if shared_entry is not None and self.is_fresh(shared_entry):
+            metrics.observe_cache_lookup('shared', hit=True)
+            api_tracing.record_cache_hit(self.func.__name__)
+            entry = shared_entry
+        else:
+            if shared_key:
+                metrics.observe_cache_lookup('shared', hit=False)
+            entry = self.call(key, args, kwargs, _get_latest_entry(stale_entry, shared_entry))
+            if shared_key:
+                set_entry(shared_key, entry, self.shared_timeout)
+        self.cache[key] = entry
+        return entry
+
+    def start_refresh(self, key):
+        """
+        Marks entry as being refreshed in background
+        :return: False if it's already being refreshed
+        :rtype: bool
+        """
+        with self._refreshing_lock:
+            if key in self._refreshing_keys:
+                return False
+            self._refreshing_keys.add(key)
+            return True
+
+    def refresh(self, key, args, kwargs):
+        """
+        Loads entry again, keeping current one if that fails - see ``start_refresh``
+        """
+        try:
+            self.load(key, args, kwargs, self.cache.get(key))
+        except Exception:  # pylint: disable=broad-except
+            log.warning("Failed to refresh cached value for key %s", key, exc_info=True)
+            metrics.CACHE_BACKGROUND_REFRESHES.inc(cache=self.func.__name__, result='failure')
+        else:
+            metrics.CACHE_BACKGROUND_REFRESHES.inc(cache=self.func.__name__, result='success')
+        finally:
+            with self._refreshing_lock:
+                self._refreshing_keys.discard(key)
@@ -1,7 +1,12 @@
+import inspect
 import json
 import logging
-from urllib.error import HTTPError
+import socket
+from contextlib import contextmanager
+from urllib.error import HTTPError, URLError
 
+from group_project_v2.circuit_breaker import CircuitOpenError
+from group_project_v2.json_requests import ResponseBody
 from group_project_v2.utils import gettext as _
 
 log = logging.getLogger(__name__)
@@ -31,7 +36,7 @@ class ApiError(Exception):
 
         # Look in response content for specific message from api response
         try:
-            self.content_dictionary = json.loads(thrown_error.read())
+            self.content_dictionary = json.loads(ResponseBody(thrown_error).read())
         except Exception:  # pylint: disable=broad-except
             self.content_dictionary = {}
 
@@ -44,17 +49,68 @@ class ApiError(Exception):
         return "ApiError '{}' ({})".format(self.message, self.code)
 
 
+class ApiConnectionError(ApiError):
+    """
+    Exception to be thrown when the Api could not be reached or did not respond in time
+    """
+    code = 503
+
+    def __init__(self, thrown_error):  # pylint: disable=super-init-not-called
+        self.message = str(getattr(thrown_error, 'reason', thrown_error))
+        super(ApiError, self).__init__()  # pylint: disable=bad-super-call
+
+
+class ApiCircuitOpenError(CircuitOpenError, ApiError):
+    """
+    Exception to be thrown instead of calling the Api while circuit of the endpoint is open
+    """
+    code = 503
+    message = _("Service is temporarily unavailable")
+
+    def __init__(self, endpoint, retry_after):  # pylint: disable=super-init-not-called
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super(ApiError, self).__init__()  # pylint: disable=bad-super-call
+
+
+@contextmanager
+def _converted_errors(func_name):
+    """
+    Converts errors raised within the context to ApiError
+    """
+    try:
+        yield
+    except CircuitOpenError as circuit_open_error:
+        log.warning(
+            "Not calling %s: circuit of %s is open, retry in %.1f seconds",
+            func_name, circuit_open_error.endpoint, circuit_open_error.retry_after
+        )
+        # pylint: disable=raise-missing-from
+        raise ApiCircuitOpenError(circuit_open_error.endpoint, circuit_open_error.retry_after)
+    except HTTPError as http_error:
+        api_error = ApiError(http_error, ERROR_CODE_MESSAGES.get(func_name, None))
+        log.exception("Error calling %s: %s", func_name, api_error)
+        raise api_error  # pylint: disable=raise-missing-from
+    except (URLError, socket.timeout, ConnectionError) as connection_error:
+        api_error = ApiConnectionError(connection_error)
+        log.exception("Error calling %s: %s", func_name, api_error)
+        raise api_error  # pylint: disable=raise-missing-from
+
+
 def api_error_protect(func):
     """
-    Decorator which will raise an ApiError for api calls
+    Decorator which will raise an ApiError for api calls. Errors raised while iterating over results of generator
+    functions are converted as well.
     """
+    if inspect.isgeneratorfunction(func):
+        def iterate_api_method(*args, **kwargs):
+            with _converted_errors(func.__name__):
+                yield from func(*args, **kwargs)
+
+        return iterate_api_method
 
     def call_api_method(*args, **kwargs):
-        try:
+        with _converted_errors(func.__name__):
             return func(*args, **kwargs)
-        except HTTPError as http_error:
-            api_error = ApiError(http_error, ERROR_CODE_MESSAGES.get(func.__name__, None))
-            log.exception("Error calling %s: %s", func.__name__, api_error)
-            raise api_error  # pylint: disable=raise-missing-from
 
     return call_api_method
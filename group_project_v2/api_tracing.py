@@ -0,0 +1,299 @@
+"""
+Per-request tracing of project API calls.
+
+A trace is started when an XBlock view is rendered or a handler is run (see ``ApiTracingXBlockMixin``) and collects
+every API call made on its behalf: HTTP method, endpoint template (URL path with IDs replaced by placeholders),
+latency, response size and whether the call was served from or populated ``memoize_with_expiration`` cache. When the
+outermost view or handler completes, trace summary is passed to the sink; endpoint templates called repeatedly within
+single request are reported as N+1 candidates.
+
+Tracing is configured with Django settings:
+
+* ``GROUP_PROJECT_V2_API_TRACING_SAMPLE_RATE`` - fraction of requests to trace, 0 (default) disables tracing
+* ``GROUP_PROJECT_V2_API_TRACING_SINK`` - dotted path to a callable accepting trace summary dict, defaults to logging
+* ``GROUP_PROJECT_V2_API_TRACING_N_PLUS_ONE_THRESHOLD`` - number of calls to the same endpoint template within single
+  request that makes it an N+1 candidate, default 3
+
+When request is not sampled the overhead is a thread-local lookup per API call.
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+log = logging.getLogger(__name__)
+
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 3
+
+ID_PLACEHOLDER = '{id}'
+KEY_PLACEHOLDER = '{key}'
+# numeric IDs, hex hashes/UUIDs and opaque keys (course and usage IDs) - anything that varies between calls
+NUMERIC_ID_RE = re.compile(r'^\d+$')
+HASH_ID_RE = re.compile(r'^[0-9a-fA-F-]{16,}$')
+OPAQUE_KEY_RE = re.compile(r'[:+@]')
+
+_local = threading.local()
+_sink = None  # pylint: disable=invalid-name
+
+
+def get_endpoint_template(url):
+    """
+    Strips server address, query string and IDs from URL, so that calls to the same endpoint for different objects
+    have the same template, e.g. http://lms/api/server/users/12/organizations/?page_size=0 becomes
+    /api/server/users/{id}/organizations/
+
+    :param str url:
+    :rtype: str
+    """
+    segments = urlsplit(url).path.split('/')
+    for index, segment in enumerate(segments):
+        if NUMERIC_ID_RE.match(segment) or HASH_ID_RE.match(segment):
+            segments[index] = ID_PLACEHOLDER
+        elif OPAQUE_KEY_RE.search(segment):
+            segments[index] = KEY_PLACEHOLDER
+    return '/'.join(segments)
+
+
+class ApiCall(object):
+    """
+    Single API call (or cache hit) recorded in a trace
+    """
+    def __init__(self, method, endpoint, cache=None):
+        self.method = method
+        self.endpoint = endpoint
+        self.cache = cache
+        self.latency = 0.0
+        self.bytes = 0
+        self.error = None
+
+    def to_dict(self):
+        return {
+            'method': self.method,
+            'endpoint': self.endpoint,
+            'cache': self.cache,
+            'latency': self.latency,
+            'bytes': self.bytes,
+            'error': self.error,
+        }
+
+
+class RequestTrace(object):
+    """
+    API calls made while serving single XBlock view or handler
+    """
+    def __init__(self, view):
+        self.view = view
+        self.calls = []
+        self.started = time.perf_counter()
+        self.duration = None
+        # bulk API methods issue calls from worker threads - list.append is atomic, but keep counters consistent
+        self._lock = threading.Lock()
+
+    def add_call(self, call):
+        with self._lock:
+            self.calls.append(call)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+    def get_n_plus_one_candidates(self, threshold):
+        """
+        :param int threshold: minimal number of calls to the same endpoint template
+        :rtype: list[dict]
+        """
+        counts = Counter(
+            (call.method, call.endpoint) for call in self.calls if call.cache != CACHE_HIT
+        )
+        return [
+            {'method': method, 'endpoint': endpoint, 'count': count}
+            for (method, endpoint), count in counts.most_common()
+            if count >= threshold
+        ]
+
+    def summary(self, n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        """
+        :rtype: dict
+        """
+        with self._lock:
+            calls = list(self.calls)
+        sent = [call for call in calls if call.cache != CACHE_HIT]
+        return {
+            'view': self.view,
+            'duration': self.duration,
+            'api_calls': len(sent),
+            'api_latency': sum(call.latency for call in sent),
+            'api_bytes': sum(call.bytes for call in sent),
+            'cache_hits': sum(1 for call in calls if call.cache == CACHE_HIT),
+            'cache_misses': sum(1 for call in calls if call.cache == CACHE_MISS),
+            'calls': [call.to_dict() for call in calls],
+            'n_plus_one': self.get_n_plus_one_candidates(n_plus_one_threshold),
+        }
+
+
+def log_sink(summary):
+    """
+    Default sink - logs one line per traced request, N+1 candidates are logged as warnings
+    """
+    log.info(
+        "API trace for %s: %d calls, %.1f ms in API, %d bytes, %d cache hits, %d cache misses, %.1f ms total",
+        summary['view'], summary['api_calls'], summary['api_latency'] * 1000, summary['api_bytes'],
+        summary['cache_hits'], summary['cache_misses'], (summary['duration'] or 0) * 1000
+    )
+    for candidate in summary['n_plus_one']:
+        log.warning(
+            "Possible N+1 API calls in %s: %s %s called %d times",
+            summary['view'], candidate['method'], candidate['endpoint'], candidate['count']
+        )
+
+
+def get_sink():
+    """
+    Returns sink configured with ``GROUP_PROJECT_V2_API_TRACING_SINK`` setting, or set with ``set_sink``
+    """
+    global _sink  # pylint: disable=global-statement
+    if _sink is None:
+        sink_path = getattr(settings, 'GROUP_PROJECT_V2_API_TRACING_SINK', None)
+        _sink = import_string(sink_path) if sink_path else log_sink
+    return _sink
+
+
+def set_sink(sink):
+    """
+    :param callable|None sink: callable accepting trace summary dict; None restores configured sink
+    """
+    global _sink  # pylint: disable=global-statement
+    _sink = sink
+
+
+def get_sample_rate():
+    return float(getattr(settings, 'GROUP_PROJECT_V2_API_TRACING_SAMPLE_RATE', 0))
+
+
+def get_current_trace():
+    """
+    :rtype: RequestTrace|None
+    """
+    return getattr(_local, 'trace', None)
+
+
+@contextmanager
+def traced_request(block, view_name):
+    """
+    Traces API calls made within the context, if the request is sampled. Nested contexts (i.e. children views rendered
+    by parent view) are folded into the outermost one.
+
+    :param xblock.core.XBlock block: XBlock serving the request
+    :param str view_name: view or handler name
+    """
+    if get_current_trace() is not None:
+        yield
+        return
+
+    sample_rate = get_sample_rate()
+    if sample_rate <= 0 or random.random() >= sample_rate:
+        yield
+        return
+
+    trace = RequestTrace("{}.{}".format(type(block).__name__, view_name))
+    _local.trace = trace
+    try:
+        yield
+    finally:
+        _local.trace = None
+        trace.finish()
+        _emit(trace)
+
+
+def _emit(trace):
+    threshold = int(getattr(
+        settings, 'GROUP_PROJECT_V2_API_TRACING_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD
+    ))
+    try:
+        get_sink()(trace.summary(threshold))
+    except Exception:  # pylint: disable=broad-except
+        # tracing must never break the request it traces
+        log.exception("Failed to emit API trace for %s", trace.view)
+
+
+def propagate_trace(func):
+    """
+    Wraps func so that API calls it makes from another thread (e.g. a worker of bulk API method) are recorded in
+    current trace, and marked as cache misses if func is called to populate cache.
+    """
+    trace = get_current_trace()
+    if trace is None:
+        return func
+    cache_miss_flag = getattr(_local, 'cache_miss', False)
+
+    def wrapper(*args, **kwargs):
+        previous = get_current_trace(), getattr(_local, 'cache_miss', False)
+        _local.trace, _local.cache_miss = trace, cache_miss_flag
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.trace, _local.cache_miss = previous
+
+    return wrapper
+
+
+@contextmanager
+def trace_api_call(method, url):
+    """
+    Records API call in current trace, if any. Yields ApiCall, so that caller can fill in response size.
+
+    :param str method: HTTP method
+    :param str url: full URL
+    """
+    trace = get_current_trace()
+    if trace is None:
+        yield ApiCall(method, url)
+        return
+
+    call = ApiCall(method, get_endpoint_template(url), CACHE_MISS if getattr(_local, 'cache_miss', False) else None)
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as exc:
+        call.error = type(exc).__name__
+        raise
+    finally:
+        call.latency = time.perf_counter() - started
+        trace.add_call(call)
+
+
+def record_cache_hit(name):
+    """
+    Records call to memoized API method served from cache
+
+    :param str name: memoized function name
+    """
+    trace = get_current_trace()
+    if trace is not None:
+        trace.add_call(ApiCall(None, name, CACHE_HIT))
+
+
+@contextmanager
+def cache_miss():
+    """
+    Marks API calls made within the context as made to populate cache
+    """
+    if get_current_trace() is None:
+        yield
+        return
+
+    previous = getattr(_local, 'cache_miss', False)
+    _local.cache_miss = True
+    try:
+        yield
+    finally:
+        _local.cache_miss = previous
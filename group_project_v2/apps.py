@@ -0,0 +1,14 @@
+"""
+Django application configuration for Group Project XBlock v2
+"""
+from django.apps import AppConfig
+
+
+class GroupProjectV2Config(AppConfig):
+    name = 'group_project_v2'
+    verbose_name = "Group Project XBlock v2"
+
+    def ready(self):
+        # XBlock modules are not safe to import before app registry is populated
+        from group_project_v2.project_navigator import warm_up_translations  # pylint: disable=import-outside-toplevel
+        warm_up_translations()
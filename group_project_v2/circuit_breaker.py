@@ -0,0 +1,184 @@
+"""
+Circuit breaker for project API calls.
+
+Outcomes of API calls are tracked per endpoint template (see ``api_tracing.get_endpoint_template``) over a window of
+recent calls. When enough of them fail (server errors, timeouts, connection errors) the circuit for the endpoint
+opens, and calls to it fail fast with ``CircuitOpenError`` instead of waiting for the timeout; cached results are
+served stale meanwhile (see ``memoize_with_expiration``). After the reset timeout the circuit is half-open: a single
+probe call is let through, and it either closes the circuit or opens it again.
+
+Circuit breaker is configured with ``GROUP_PROJECT_V2_API_CIRCUIT_BREAKER`` Django setting - a dict with any of:
+
+* ``enabled`` - default True
+* ``window`` - number of recent calls failure rate is calculated over, default 20
+* ``min_calls`` - minimal number of calls in the window before circuit can open, default 5
+* ``failure_rate`` - fraction of failed calls in the window that opens the circuit, default 0.5
+* ``reset_timeout`` - seconds circuit stays open before a probe call is let through, default 30
+
+State is kept per process.
+"""
+import logging
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from urllib.error import HTTPError, URLError
+
+from django.conf import settings
+
+from group_project_v2 import metrics
+from group_project_v2.api_tracing import get_endpoint_template
+
+log = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_CONFIG = {
+    'enabled': True,
+    'window': 20,
+    'min_calls': 5,
+    'failure_rate': 0.5,
+    'reset_timeout': 30,
+}
+
+# Circuit breakers by endpoint template, shared by all requests in the process
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an endpoint while its circuit is open. See ``api_error.ApiCircuitOpenError``.
+    """
+    def __init__(self, endpoint, retry_after):
+        super(CircuitOpenError, self).__init__()
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+def get_config():
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'GROUP_PROJECT_V2_API_CIRCUIT_BREAKER', {}))
+    return config
+
+
+def is_failure(exception):
+    """
+    Only errors signalling that API server is unavailable or overloaded count as failures - client errors (4xx)
+    mean the server is healthy.
+    """
+    if isinstance(exception, HTTPError):
+        return exception.code >= 500
+    return isinstance(exception, (URLError, socket.timeout, ConnectionError))
+
+
+class CircuitBreaker(object):  # pylint: disable=too-many-instance-attributes
+    def __init__(self, endpoint, window, min_calls, failure_rate, reset_timeout):
+        self.endpoint = endpoint
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        if state != self.state:
+            log.warning("Circuit for project API endpoint %s changed from %s to %s", self.endpoint, self.state, state)
+            metrics.API_CIRCUIT_TRANSITIONS.inc(endpoint=self.endpoint, state=state)
+        self.state = state
+
+    def before_call(self):
+        """
+        :raises CircuitOpenError: if the circuit is open, or a probe call is already in flight
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == OPEN and retry_after <= 0:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        metrics.API_CIRCUIT_REJECTIONS.inc(endpoint=self.endpoint)
+        raise CircuitOpenError(self.endpoint, max(retry_after, 0))
+
+    def record_success(self):
+        with self._lock:
+            self._outcomes.append(True)
+            if self.state == HALF_OPEN:
+                self._outcomes.clear()
+                self._probe_in_flight = False
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._outcomes.append(False)
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._open()
+            elif self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures >= self.failure_rate * len(self._outcomes):
+                    self._open()
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._set_state(OPEN)
+
+
+def get_breaker(url):
+    """
+    :param str url: API URL
+    :rtype: CircuitBreaker|None
+    :return: circuit breaker of the URL endpoint template, None if circuit breaker is disabled
+    """
+    config = get_config()
+    if not config['enabled']:
+        return None
+    endpoint = get_endpoint_template(url)
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(endpoint, CircuitBreaker(
+                endpoint, config['window'], config['min_calls'], config['failure_rate'], config['reset_timeout']
+            ))
+    return breaker
+
+
+@contextmanager
+def protected_call(url):
+    """
+    Records outcome of the API call made within the context with circuit breaker of the URL endpoint template
+
+    :raises CircuitOpenError: without entering the context, if the circuit is open
+    """
+    breaker = get_breaker(url)
+    if breaker is None:
+        yield
+        return
+
+    breaker.before_call()
+    try:
+        yield
+    except Exception as exception:
+        if is_failure(exception):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise
+    breaker.record_success()
+
+
+def reset():
+    """
+    Closes all circuits and forgets recorded outcomes
+    """
+    with _breakers_lock:
+        _breakers.clear()
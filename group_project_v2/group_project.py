@@ -14,7 +14,7 @@ from xblock.fields import DateTime, Float, Integer, Scope, String
 from xblock.validation import ValidationMessage
 from xblockutils.studio_editable import NestedXBlockSpec, XBlockWithPreviewMixin
 
-from group_project_v2 import messages
+from group_project_v2 import messages, metrics
 from group_project_v2.mixins import (
     AuthXBlockMixin,
     CommonMixinCollection,
@@ -105,8 +105,7 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
 
     @lazy
     def activities(self):
-        all_children = [self.runtime.get_block(child_id) for child_id in self.children]
-        return [child for child in all_children if isinstance(child, GroupActivityXBlock)]
+        return [child for child in self._children if isinstance(child, GroupActivityXBlock)]
 
     @lazy
     def navigator(self):
@@ -261,6 +260,19 @@ class GroupProjectXBlock(CommonMixinCollection, DashboardXBlockMixin, DashboardR
 
         return self.export_users(users_to_export, filename)
 
+    @XBlock.handler
+    def export_metrics(self, _request, _suffix=''):
+        """
+        Exports metrics collected by this process in Prometheus text exposition format. Available to users that can
+        access dashboard.
+        """
+        if not self.can_access_dashboard(self.user_id):
+            return webob.response.Response(self._(messages.USER_NOT_ACCESS_DASHBOARD), status=403)
+
+        response = webob.response.Response(body=metrics.REGISTRY.render().encode('utf-8'))
+        response.headers['Content-Type'] = metrics.CONTENT_TYPE
+        return response
+
     @classmethod
     def export_users(cls, users_to_export, filename):
         response = webob.response.Response(charset='UTF-8', content_type="text/csv")
@@ -434,20 +446,20 @@ class GroupActivityXBlock(
             return def_stage
         return self.stages[0] if self.stages else None
 
-    @property
+    @lazy
     def questions(self):
         return list(self._chain_questions(self.stages, 'questions'))
 
-    @property
+    @lazy
     def grade_questions(self):
         return list(self._chain_questions(self.stages, 'grade_questions'))
 
-    @property
+    @lazy
     def team_evaluation_questions(self):
         stages = self.get_children_by_category(TeamEvaluationStage.CATEGORY)
         return list(self._chain_questions(stages, 'questions'))
 
-    @property
+    @lazy
     def peer_review_questions(self):
         stages = self.get_children_by_category(PeerReviewStage.CATEGORY)
         return list(self._chain_questions(stages, 'questions'))
@@ -757,6 +769,8 @@ class GroupActivityXBlock(
     @classmethod
     def _get_group_statuses(cls, stage, target_workgroups, user_stats):
         internal_group_status, external_group_status, external_group_status_label = {}, {}, {}
+        target_workgroups = list(target_workgroups)
+        external_statuses = stage.get_external_group_statuses(target_workgroups)
         for group in target_workgroups:
             user_completions = [user_stats.get(user.id, StageState.UNKNOWN) for user in group.users]
             student_review_state = StageState.NOT_STARTED
@@ -768,7 +782,7 @@ class GroupActivityXBlock(
                 student_review_state = StageState.UNKNOWN
             internal_group_status[group.id] = student_review_state
 
-            external_status = stage.get_external_group_status(group)
+            external_status = external_statuses[group.id]
             external_group_status[group.id] = external_status
             external_group_status_label[group.id] = stage.get_external_status_label(external_status)
         return external_group_status, external_group_status_label, internal_group_status
@@ -826,6 +840,7 @@ class GroupActivityXBlock(
         if notifications_service and grade_display_stage:
             grade_display_stage.fire_grades_posted_notification(group_id, notifications_service)
 
+    @metrics.GRADE_CALCULATION_DURATION.timed()
     def calculate_grade(self, group_id):
         # pylint:disable=too-many-locals,too-many-branches,consider-using-set-comprehension
         review_item_data = self.project_api.get_workgroup_review_items_for_group(group_id, self.content_id)
@@ -1,10 +1,20 @@
 """ GET, POST, DELETE, PUT requests for json client """
+import codecs
+import functools
 import json
 import logging
+import re
+import zlib
 from urllib.request import HTTPHandler, Request, build_opener, urlopen
 
 from django.conf import settings
 
+try:
+    import orjson  # pylint: disable=import-error
+except ImportError:
+    # orjson is optional - it parses responses faster, standard library json parser is used when it's not installed
+    orjson = None
+
 # nice to have capitalised names for familiar GET, POST, DELETE, PUT
 # pylint: disable=invalid-name
 
@@ -22,11 +32,32 @@ if settings and hasattr(settings, "EDX_API_KEY"):
 
 TIMEOUT = 20
 
+# Bytes read from response at once when decoding it incrementally - see JSONObjectStream
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Content encodings of responses accepted from the API, with zlib wbits decoding them
+COMPRESSED_ENCODINGS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+def get_timeout(method_name):
+    """
+    Returns timeout of requests with given HTTP method, in seconds: ``GROUP_PROJECT_V2_API_TIMEOUTS`` setting maps
+    method names to timeouts, e.g. ``{"GET": 5}``; TIMEOUT is used for methods not listed there.
+    """
+    return getattr(settings, 'GROUP_PROJECT_V2_API_TIMEOUTS', {}).get(method_name, TIMEOUT)
+
 
 def trace_request_information(func):
     """
     Decorator which will trace information
     """
+    @functools.wraps(func)
     def make_request(*args, **kwargs):
         """
         Logs information about request and response
@@ -49,18 +80,27 @@ def json_headers():
     return JSON_HEADERS
 
 
+def accept_encoding_headers():
+    """
+    Asks for compressed responses, unless ``GROUP_PROJECT_V2_API_COMPRESSION`` setting is False - see ResponseBody
+    """
+    if not getattr(settings, 'GROUP_PROJECT_V2_API_COMPRESSION', True):
+        return {}
+    return {"Accept-Encoding": ", ".join(sorted(COMPRESSED_ENCODINGS))}
+
+
 @trace_request_information
-def GET(url_path):
+def GET(url_path, headers=None):
     """ GET request wrapper to json web server """
-    url_request = Request(url=url_path, headers=json_headers())
-    return urlopen(url=url_request, timeout=TIMEOUT)
+    url_request = Request(url=url_path, headers=dict(json_headers(), **accept_encoding_headers(), **(headers or {})))
+    return urlopen(url=url_request, timeout=get_timeout('GET'))
 
 
 @trace_request_information
 def POST(url_path, data):
     """ POST request wrapper to json web server """
     url_request = Request(url=url_path, headers=json_headers())
-    return urlopen(url_request, json.dumps(data).encode('utf-8'), TIMEOUT)
+    return urlopen(url_request, json.dumps(data).encode('utf-8'), get_timeout('POST'))
 
 
 @trace_request_information
@@ -69,7 +109,7 @@ def DELETE(url_path):
     opener = build_opener(HTTPHandler)
     request = Request(url=url_path, headers=json_headers())
     request.get_method = lambda: 'DELETE'
-    return opener.open(request, None, TIMEOUT)
+    return opener.open(request, None, get_timeout('DELETE'))
 
 
 @trace_request_information
@@ -78,4 +118,179 @@ def PUT(url_path, data):
     opener = build_opener(HTTPHandler)
     request = Request(url=url_path, headers=json_headers(), data=json.dumps(data).encode('utf-8'))
     request.get_method = lambda: 'PUT'
-    return opener.open(request, None, TIMEOUT)
+    return opener.open(request, None, get_timeout('PUT'))
+
+
+def loads(content):
+    """
+    Parses JSON response body directly from bytes, without decoding it to str first - with orjson if it's installed.
+
+    :param bytes content: response body
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class ResponseBody(object):
+    """
+    File-like object reading response body, decompressed incrementally according to its ``Content-Encoding`` header -
+    compressed body is never held in memory as a whole.
+
+    ``bytes_read`` is the number of bytes read from the response so far, i.e. transferred over the network.
+    """
+    def __init__(self, response):
+        self._response = response
+        self._pending = bytearray()
+        self._eof = False
+        self._started = False
+        self.bytes_read = 0
+
+        headers = getattr(response, 'headers', None) or {}
+        encoding = headers.get('Content-Encoding')
+        self._encoding = encoding.strip().lower() if isinstance(encoding, str) else 'identity'
+        if self._encoding in COMPRESSED_ENCODINGS:
+            self._decompressor = zlib.decompressobj(COMPRESSED_ENCODINGS[self._encoding])
+        elif self._encoding in ('identity', ''):
+            self._decompressor = None
+        else:
+            raise ValueError("Unsupported response Content-Encoding: {}".format(encoding))
+
+    def read(self, size=-1):
+        if self._decompressor is None:
+            data = self._response.read() if size < 0 else self._response.read(size)
+            self.bytes_read += len(data)
+            return data
+
+        while not self._eof and (size < 0 or len(self._pending) < size):
+            chunk = self._response.read(STREAM_CHUNK_SIZE)
+            self.bytes_read += len(chunk)
+            if chunk:
+                self._pending += self._decompress(chunk)
+            else:
+                self._pending += self._decompressor.flush()
+                self._eof = True
+
+        size = len(self._pending) if size < 0 else size
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        return data
+
+    def _decompress(self, chunk):
+        try:
+            data = self._decompressor.decompress(chunk)
+        except zlib.error:
+            # "deflate" is meant to be zlib-wrapped, but some servers send raw deflate stream
+            if self._encoding != 'deflate' or self._started:
+                raise
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            data = self._decompressor.decompress(chunk)
+        self._started = True
+        return data
+
+
+class _StreamBuffer(object):
+    """
+    Text decoded from a binary stream chunk by chunk; only the part that is not parsed yet is kept in memory
+    """
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.position = 0
+        self.exhausted = False
+        self.bytes_read = 0
+
+    def read_more(self):
+        """
+        :return: False if the stream is exhausted
+        """
+        if self.exhausted:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        self.exhausted = not chunk
+        self.text = self.text[self.position:] + self.decoder.decode(chunk, final=self.exhausted)
+        self.position = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace and returns next character
+        """
+        while True:
+            self.position = _WHITESPACE.match(self.text, self.position).end()
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if not self.read_more():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, characters):
+        """
+        Skips whitespace and consumes next character, which must be one of ``characters``
+        """
+        character = self.peek()
+        if character not in characters:
+            raise ValueError("Expected one of {!r} at {!r} in JSON document".format(characters, character))
+        self.position += 1
+        return character
+
+    def decode_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.position)
+            except ValueError:
+                # value might be cut off at the end of the buffer - retry with the next chunk
+                if not self.read_more():
+                    raise
+                continue
+            # numbers ending at the end of the buffer might continue in the next chunk
+            if end < len(self.text) or not self.read_more():
+                self.position = end
+                return value
+
+
+class JSONObjectStream(object):
+    """
+    Decodes JSON object from a binary stream (e.g. HTTP response) incrementally. Iterating over it yields
+    ``(key, value)`` pairs of object members, except for ``list_key`` list: its items are decoded and yielded one
+    by one, as ``(list_key, item)`` pairs - so neither the whole response nor the whole list is held in memory.
+
+    ``bytes_read`` is the number of bytes read from the stream so far.
+    """
+    def __init__(self, stream, list_key, chunk_size=STREAM_CHUNK_SIZE):
+        self._buffer = _StreamBuffer(stream, chunk_size)
+        self.list_key = list_key
+
+    @property
+    def bytes_read(self):
+        return self._buffer.bytes_read
+
+    def __iter__(self):
+        buffer = self._buffer
+        buffer.expect('{')
+        if buffer.peek() == '}':
+            return
+        while True:
+            key = buffer.decode_value()
+            buffer.expect(':')
+            if key == self.list_key and buffer.peek() == '[':
+                for item in self._iter_list_items():
+                    yield key, item
+            else:
+                yield key, buffer.decode_value()
+            if buffer.expect(',}') == '}':
+                return
+
+    def _iter_list_items(self):
+        buffer = self._buffer
+        buffer.expect('[')
+        if buffer.peek() == ']':
+            buffer.position += 1
+            return
+        while True:
+            yield buffer.decode_value()
+            if buffer.expect(',]') == ']':
+                return
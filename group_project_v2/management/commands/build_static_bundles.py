@@ -0,0 +1,23 @@
+"""
+Builds minified, content-hashed bundles of CSS and JS resources referenced by add_resource.
+"""
+import logging
+
+from django.core.management.base import BaseCommand
+
+from group_project_v2.static_bundles import MANIFEST_PATH, build_bundles
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Builds minified, content-hashed bundles of static resources and their manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-minify', action='store_true', help="Copy resources to bundles without minifying")
+
+    def handle(self, *args, **options):
+        manifest = build_bundles(minify=not options['no_minify'])
+        for source_path, bundle_path in sorted(manifest.items()):
+            self.stdout.write("{} -> {}".format(source_path, bundle_path))
+        log.info("Built %s static bundles, manifest written to %s", len(manifest), MANIFEST_PATH)
@@ -0,0 +1,112 @@
+"""
+Removes content-addressed submission blobs that are not referenced by any latest submission.
+"""
+import json
+import logging
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from group_project_v2.utils import SUBMISSION_BLOBS_ROOT, SUBMISSION_LEASES_ROOT, SUBMISSION_REFS_ROOT, get_storage
+
+log = logging.getLogger(__name__)
+
+
+def _walk_files(storage, root):
+    """
+    Yields paths of all files two levels below root (i.e. root/<directory>/<file>)
+    """
+    try:
+        directories, _files = storage.listdir(root)
+    except OSError:  # local file system storage raises if nothing has been stored yet
+        return
+    for directory in directories:
+        _subdirectories, files = storage.listdir("{}/{}".format(root, directory))
+        for file_name in files:
+            yield "{}/{}/{}".format(root, directory, file_name)
+
+
+def get_referenced_blobs(storage):
+    """
+    Returns set of blob paths referenced by latest submissions
+    """
+    referenced = set()
+    for ref_path in _walk_files(storage, SUBMISSION_REFS_ROOT):
+        with storage.open(ref_path) as ref_file:
+            referenced.add(json.loads(ref_file.read().decode('utf-8'))['blob'])
+    return referenced
+
+
+def _get_modified_time(storage, path):
+    modified = storage.get_modified_time(path)
+    if timezone.is_naive(modified):
+        modified = timezone.make_aware(modified, timezone.utc)
+    return modified
+
+
+def _is_leased(storage, sha1, cutoff):
+    """
+    Checks if an upload took a lease on blob with given sha1 after cutoff, i.e. it is storing or reusing the blob and
+    might not have written the ref yet.
+    """
+    lease_directory = "{}/{}".format(SUBMISSION_LEASES_ROOT, sha1)
+    try:
+        _directories, leases = storage.listdir(lease_directory)
+    except OSError:
+        return False
+    return any(
+        _get_modified_time(storage, "{}/{}".format(lease_directory, lease)) > cutoff for lease in leases
+    )
+
+
+def _collect_expired_leases(storage, cutoff, dry_run):
+    for lease_path in _walk_files(storage, SUBMISSION_LEASES_ROOT):
+        if _get_modified_time(storage, lease_path) <= cutoff and not dry_run:
+            storage.delete(lease_path)
+
+
+def collect_garbage(storage, grace_period, dry_run=False):
+    """
+    Deletes unreferenced blobs modified more than `grace_period` ago and not leased within `grace_period`. Grace
+    period protects blobs of uploads that are still in progress, i.e. stored or reused, but not yet referenced.
+    Expired leases are removed as well.
+
+    :param storage: Django file storage
+    :param timedelta grace_period: minimal age of blob to be deleted
+    :param bool dry_run: if True, nothing is deleted
+    :return: list of deleted (or to be deleted in dry run mode) blob paths
+    :rtype: list[str]
+    """
+    referenced = get_referenced_blobs(storage)
+    cutoff = timezone.now() - grace_period
+    deleted = []
+    for blob_path in _walk_files(storage, SUBMISSION_BLOBS_ROOT):
+        if blob_path in referenced or _get_modified_time(storage, blob_path) > cutoff:
+            continue
+        # leases are checked right before deletion, as uploads reusing the blob might have started after refs were read
+        if _is_leased(storage, blob_path.split('/')[-2], cutoff):
+            continue
+        if not dry_run:
+            storage.delete(blob_path)
+        deleted.append(blob_path)
+    _collect_expired_leases(storage, cutoff, dry_run)
+    return deleted
+
+
+class Command(BaseCommand):
+    help = "Removes submission blobs not referenced by any latest submission"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=int, default=24,
+            help="Only remove blobs older than this many hours (default: 24)"
+        )
+        parser.add_argument('--dry-run', action='store_true', help="List blobs to be removed without removing them")
+
+    def handle(self, *args, **options):
+        storage = get_storage()
+        deleted = collect_garbage(storage, timedelta(hours=options['grace_hours']), dry_run=options['dry_run'])
+        for blob_path in deleted:
+            self.stdout.write(blob_path)
+        log.info("Removed %s unreferenced submission blobs (dry run: %s)", len(deleted), options['dry_run'])
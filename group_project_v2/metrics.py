@@ -0,0 +1,389 @@
+"""
+Lightweight in-process metrics: counters and histograms of project API calls, caches, uploads and grade calculation,
+exported in Prometheus text exposition format (see ``GroupProjectXBlock.export_metrics`` handler).
+
+Metrics are kept per process and reset on restart - a scraper is expected to collect them from each worker.
+"""
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+
+from group_project_v2.api_tracing import get_endpoint_template
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# seconds - from in-process cache hits to slow API calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2)
+
+_local = threading.local()
+
+
+def _escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_pairs):
+    if not label_pairs:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(name, _escape_label_value(value)) for name, value in label_pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric(object):
+    """
+    Base class for metrics - holds values by label values
+    """
+    type_name = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _get_label_values(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError("{} expects labels {}, got {}".format(self.name, self.label_names, sorted(labels)))
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        """
+        :return: (sample name suffix, label pairs, value) tuples
+        :rtype: list[tuple]
+        """
+        raise NotImplementedError()
+
+    def render(self):
+        lines = [
+            "# HELP {} {}".format(self.name, self.documentation.replace('\\', '\\\\').replace('\n', '\\n')),
+            "# TYPE {} {}".format(self.name, self.type_name),
+        ]
+        for suffix, label_pairs, value in self.samples():
+            lines.append("{}{}{} {}".format(self.name, suffix, _format_labels(label_pairs), _format_value(value)))
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._get_label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._get_label_values(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [('', list(zip(self.label_names, key)), value) for key, value in values]
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._get_label_values(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    entry['buckets'][index] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observes duration of the context, in seconds
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def timed(self, **labels):
+        """
+        Decorator observing duration of function calls, in seconds. For generator functions, observes time spent
+        producing items while the generator is iterated over (time the caller spends between items is not included).
+        """
+        def decorator(func):
+            if inspect.isgeneratorfunction(func):
+                return self._timed_generator(func, labels)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _timed_generator(self, func, labels):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            generator = func(*args, **kwargs)
+            elapsed = 0.0
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - started
+                    yield item
+            finally:
+                generator.close()
+                self.observe(elapsed, **labels)
+        return wrapper
+
+    def get(self, **labels):
+        """
+        :return: count and sum of observations
+        :rtype: tuple[int, float]
+        """
+        entry = self._values.get(self._get_label_values(labels))
+        return (entry['count'], entry['sum']) if entry else (0, 0.0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(
+                (key, {'buckets': list(entry['buckets']), 'sum': entry['sum'], 'count': entry['count']})
+                for key, entry in self._values.items()
+            )
+        result = []
+        for key, entry in values:
+            label_pairs = list(zip(self.label_names, key))
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets, entry['buckets']):
+                cumulative += count
+                result.append(('_bucket', label_pairs + [('le', _format_value(upper_bound))], cumulative))
+            result.append(('_sum', label_pairs, entry['sum']))
+            result.append(('_count', label_pairs, entry['count']))
+        return result
+
+
+class Registry(object):
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError("Metric {} is already registered".format(metric.name))
+            self._metrics[metric.name] = metric
+        return metric
+
+    def clear(self):
+        """
+        Resets values of all registered metrics
+        """
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def render(self):
+        """
+        :return: all registered metrics in Prometheus text exposition format
+        :rtype: str
+        """
+        metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return ''.join(metric.render() + '\n' for metric in metrics)
+
+
+REGISTRY = Registry()
+
+API_METHOD_DURATION = REGISTRY.register(Histogram(
+    'group_project_v2_api_method_duration_seconds', "Duration of project API methods, including cache hits",
+    ('method',)
+))
+API_REQUEST_DURATION = REGISTRY.register(Histogram(
+    'group_project_v2_api_request_duration_seconds', "Duration of HTTP requests to project API",
+    ('http_method', 'endpoint')
+))
+API_REQUEST_ERRORS = REGISTRY.register(Counter(
+    'group_project_v2_api_request_errors_total', "Failed HTTP requests to project API", ('http_method', 'endpoint')
+))
+VIEW_API_REQUESTS = REGISTRY.register(Histogram(
+    'group_project_v2_view_api_requests', "Number of HTTP requests to project API per XBlock view or handler",
+    ('view',), buckets=COUNT_BUCKETS
+))
+API_CIRCUIT_TRANSITIONS = REGISTRY.register(Counter(
+    'group_project_v2_api_circuit_transitions_total', "Project API circuit breaker state changes, by new state",
+    ('endpoint', 'state')
+))
+API_CIRCUIT_REJECTIONS = REGISTRY.register(Counter(
+    'group_project_v2_api_circuit_rejections_total', "Project API calls not made because circuit was open",
+    ('endpoint',)
+))
+API_CIRCUIT_STALE_RESULTS = REGISTRY.register(Counter(
+    'group_project_v2_api_circuit_stale_results_total', "Expired cached results served because circuit was open",
+    ('cache',)
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    'group_project_v2_cache_requests_total', "Cache lookups by cache and result (hit or miss)", ('cache', 'result')
+))
+CACHE_BACKGROUND_REFRESHES = REGISTRY.register(Counter(
+    'group_project_v2_cache_background_refreshes_total', "Background refreshes of cached values served stale",
+    ('cache', 'result')
+))
+CACHE_REVALIDATIONS = REGISTRY.register(Counter(
+    'group_project_v2_cache_revalidations_total', "Conditional API requests revalidating expired cached values",
+    ('cache', 'result')
+))
+UPLOAD_DURATION = REGISTRY.register(Histogram(
+    'group_project_v2_upload_duration_seconds', "Duration of storing and submitting uploaded files", ('result',)
+))
+UPLOAD_SIZE = REGISTRY.register(Histogram(
+    'group_project_v2_upload_size_bytes', "Size of uploaded files", buckets=SIZE_BUCKETS
+))
+GRADE_CALCULATION_DURATION = REGISTRY.register(Histogram(
+    'group_project_v2_grade_calculation_duration_seconds', "Duration of group grade calculation"
+))
+
+
+def observe_cache_lookup(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def observe_api_request(http_method, endpoint, duration, failed=False):
+    """
+    :param str http_method:
+    :param str endpoint: endpoint template - see api_tracing.get_endpoint_template
+    :param float duration: seconds
+    :param bool failed:
+    """
+    API_REQUEST_DURATION.observe(duration, http_method=http_method, endpoint=endpoint)
+    if failed:
+        API_REQUEST_ERRORS.inc(http_method=http_method, endpoint=endpoint)
+    counter = getattr(_local, 'api_requests', None)
+    if counter is not None:
+        counter.increment()
+
+
+@contextmanager
+def measured_api_request(http_method, url):
+    """
+    Observes duration and outcome of HTTP request to project API made within the context
+    """
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        observe_api_request(http_method, get_endpoint_template(url), time.perf_counter() - started, failed)
+
+
+@contextmanager
+def measured_upload(file_stream):
+    """
+    Observes duration and outcome of storing and submitting uploaded file within the context, and file size
+    """
+    size = getattr(file_stream, 'size', None)
+    if size is not None:
+        UPLOAD_SIZE.observe(size)
+    started = time.perf_counter()
+    result = 'success'
+    try:
+        yield
+    except Exception:
+        result = 'failure'
+        raise
+    finally:
+        UPLOAD_DURATION.observe(time.perf_counter() - started, result=result)
+
+
+class RequestCounter(object):
+    """
+    Number of API requests made while serving single XBlock view or handler
+    """
+    def __init__(self):
+        self.count = 0
+        # bulk API methods issue requests from worker threads
+        self._lock = threading.Lock()
+
+    def increment(self):
+        with self._lock:
+            self.count += 1
+
+
+@contextmanager
+def measured_request(block, view_name):
+    """
+    Counts API requests made within the context. Nested contexts are folded into the outermost one.
+
+    :param xblock.core.XBlock block: XBlock serving the request
+    :param str view_name: view or handler name
+    """
+    if getattr(_local, 'api_requests', None) is not None:
+        yield
+        return
+
+    counter = RequestCounter()
+    _local.api_requests = counter
+    try:
+        yield
+    finally:
+        _local.api_requests = None
+        VIEW_API_REQUESTS.observe(counter.count, view="{}.{}".format(type(block).__name__, view_name))
+
+
+def propagate_request_counter(func):
+    """
+    Wraps func so that API requests it makes from another thread (e.g. a worker of bulk API method) are counted for
+    current view or handler - see api_tracing.propagate_trace
+    """
+    counter = getattr(_local, 'api_requests', None)
+    if counter is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, 'api_requests', None)
+        _local.api_requests = counter
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.api_requests = previous
+
+    return wrapper
+
+
+def instrument_methods(histogram):
+    """
+    Class decorator - observes duration of all public methods defined in the class, labeled with method name.
+    Generator methods are timed while they are iterated over - see Histogram.timed
+    """
+    def decorator(cls):
+        for name, member in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.isfunction(member):
+                continue
+            setattr(cls, name, histogram.timed(method=name)(member))
+        return cls
+    return decorator
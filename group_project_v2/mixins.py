@@ -1,4 +1,5 @@
 import functools
+import hashlib
 import itertools
 import logging
 import os
@@ -9,13 +10,14 @@ from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import BlockUsageLocator
 from web_fragments.fragment import Fragment
 from xblock.completable import XBlockCompletionMode
+from xblock.fields import Scope
 from xblockutils.studio_editable import (
     StudioContainerWithNestedXBlocksMixin,
     StudioContainerXBlockMixin,
     StudioEditableXBlockMixin,
 )
 
-from group_project_v2 import messages
+from group_project_v2 import api_tracing, messages, metrics
 from group_project_v2.api_error import ApiError
 from group_project_v2.project_api import ProjectAPIXBlockMixin
 from group_project_v2.project_api.dtos import WorkgroupDetails
@@ -43,9 +45,21 @@ class XBlockWithTranslationServiceMixin(object):
 
 
 class ChildrenNavigationXBlockMixin(object):
+    @lazy
+    def _loaded_children(self):
+        return {}
+
+    def _load_child(self, child_id):
+        """
+        Loads child block, at most once per block instance
+        """
+        if child_id not in self._loaded_children:
+            self._loaded_children[child_id] = self.runtime.get_block(child_id)
+        return self._loaded_children[child_id]
+
     @lazy
     def _children(self):
-        children = (self.runtime.get_block(child_id) for child_id in self.children)
+        children = (self._load_child(child_id) for child_id in self.children)
         return [child for child in children if child is not None]
 
     @staticmethod
@@ -63,14 +77,20 @@ class ChildrenNavigationXBlockMixin(object):
         except AttributeError:  # workbench support
             return child_id.split(".")[1]
 
+    def _get_child_ids_by_category(self, child_categories):
+        # category of a child is its block type, which is part of its usage id - no need to load the child to get it
+        return [child_id for child_id in self.children if self.get_child_id_block_type(child_id) in child_categories]
+
     def get_children_by_category(self, *child_categories):
-        return [child for child in self._children if self.get_child_category(child) in child_categories]
+        children = (self._load_child(child_id) for child_id in self._get_child_ids_by_category(child_categories))
+        return [child for child in children if child is not None]
 
     def get_child_of_category(self, child_category):
-        try:
-            return next(child for child in self._children if self.get_child_category(child) == child_category)
-        except StopIteration:
-            return None
+        for child_id in self._get_child_ids_by_category((child_category,)):
+            child = self._load_child(child_id)
+            if child is not None:
+                return child
+        return None
 
     def has_child_of_category(self, child_category):
         return any(self.get_child_id_block_type(child) == child_category for child in self.children)
@@ -471,6 +491,24 @@ class NoStudioEditableSettingsMixin(object):
         return fragment
 
 
+class UserIndependentXBlockMixin(object):
+    """
+    Marks XBlock's student_view as depending only on content and settings scoped fields, language and view context,
+    so that parents can cache its fragments (see BaseGroupActivityStage.render_children_fragments). Only worth using
+    for blocks whose rendering costs more than computing the version.
+    """
+    def get_fragment_cache_version(self):
+        """
+        Returns string that changes whenever student_view output might change. Blocks rendering data of other blocks
+        should add it to the version.
+        """
+        values = [
+            (name, field.read_from(self)) for name, field in sorted(self.fields.items())
+            if field.scope in (Scope.content, Scope.settings)
+        ]
+        return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+
 class DashboardXBlockMixin(object):
     """ Mixin for an XBlock that has dashboard views """
     DASHBOARD_PROGRAM_ID_KEY = "DASHBOARD_PROGRAM_ID"
@@ -555,6 +593,20 @@ class TemplateManagerMixin(I18NService):
         return loader.render_django_template(template_path, context, i18n_service=self.i18n_service)
 
 
+class ApiTracingXBlockMixin(object):
+    """
+    Traces and counts project API calls made while rendering views and running handlers of the block - see
+    api_tracing and metrics modules
+    """
+    def render(self, view, context=None):
+        with api_tracing.traced_request(self, view), metrics.measured_request(self, view):
+            return super(ApiTracingXBlockMixin, self).render(view, context)
+
+    def handle(self, handler_name, request, suffix=''):
+        with api_tracing.traced_request(self, handler_name), metrics.measured_request(self, handler_name):
+            return super(ApiTracingXBlockMixin, self).handle(handler_name, request, suffix)
+
+
 class CompletionMixin(XBlockWithTranslationServiceMixin):
     completion_mode = XBlockCompletionMode.EXCLUDED
 
@@ -563,6 +615,6 @@ class CommonMixinCollection(
         ChildrenNavigationXBlockMixin, XBlockWithComponentsMixin,
         StudioEditableXBlockMixin, StudioContainerXBlockMixin,
         WorkgroupAwareXBlockMixin, TemplateManagerMixin, SettingsMixin,
-        CompletionMixin,
+        ApiTracingXBlockMixin, CompletionMixin,
 ):
     block_settings_key = 'group_project_v2'
@@ -1,7 +1,10 @@
 import itertools
-import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.error import HTTPError
 from urllib.parse import urlencode
 
+from group_project_v2 import api_cache, api_tracing, circuit_breaker, json_requests, metrics
 from group_project_v2.api_error import api_error_protect
 from group_project_v2.json_requests import DELETE, GET, POST, PUT
 from group_project_v2.project_api.dtos import (
@@ -25,6 +28,14 @@ COURSES_API = '/'.join([API_PREFIX, 'courses'])
 PROJECTS_API = '/'.join([API_PREFIX, 'projects'])
 ORGANIZATIONS_API = '/'.join([API_PREFIX, 'organizations'])
 
+# Max number of concurrent requests issued by bulk methods fanning out to per-object endpoints
+BULK_REQUEST_WORKERS = 8
+
+# Memoized reads of display-only data that rarely change (user details and preferences) keep returning cached values
+# for this long after expiration, while refreshing them in background - so they are at most a minute old. Not used for
+# data access checks depend on (roles, workgroup membership), so that revoked access is not served stale.
+STALE_WHILE_REVALIDATE = timedelta(seconds=50)
+
 
 # TODO: this class crosses service boundary, but some methods post-process responses, while other do not
 # There're two things to improve:
@@ -32,6 +43,7 @@ ORGANIZATIONS_API = '/'.join([API_PREFIX, 'organizations'])
 # * Service isolation - it should be used only through some other (not existent yet) class that would ALWAYS do
 # post-processing in order to isolate clients from response format changes. As of now, if format changes
 # virtually every method in group_project might be affected.
+@metrics.instrument_methods(metrics.API_METHOD_DURATION)
 class ProjectAPI(object):
     """
     Deprecated - do not extend or modify. Add new methods and move existing ones to TypedProjectAPI.
@@ -40,6 +52,12 @@ class ProjectAPI(object):
         self._api_server_address = address
         self.dry_run = dry_run
 
+    def get_cache_key(self):
+        """
+        Identifies API server in keys of shared cache of memoized methods - see api_cache.make_key
+        """
+        return "{}:{}".format(self._api_server_address, self.dry_run)
+
     def build_url(self, url_parts, query_params=None, no_trailing_slash=False):
         url = "/".join([str(url_part) for url_part in url_parts])
         if not is_absolute(url):
@@ -56,16 +74,81 @@ class ProjectAPI(object):
         if self.dry_run:
             return {}
 
-        if data is not None:
-            response = method(url, data)
-        else:
-            response = method(url)
-
+        http_method = getattr(method, '__name__', None)
         # pylint: disable=comparison-with-callable
-        if method == DELETE:
-            return None
+        conditional_headers = api_cache.get_conditional_headers(url) if method == GET else None
+        with circuit_breaker.protected_call(url), api_tracing.trace_api_call(http_method, url) as call, \
+                metrics.measured_api_request(http_method, url):
+            if data is not None:
+                response = method(url, data)
+            elif conditional_headers:
+                response = self._send_conditional_request(method, url, conditional_headers)
+            else:
+                response = method(url)
 
-        return json.loads(response.read().decode('utf8'))
+            if method == DELETE:
+                return None
+
+            content = None
+            if response is not None:
+                body = json_requests.ResponseBody(response)
+                content = body.read()
+                call.bytes = body.bytes_read
+                api_cache.record_response(url, *self._get_validators(response))
+
+        if content is None:
+            raise api_cache.NotModified()
+        return json_requests.loads(content)
+
+    @api_error_protect
+    def _stream_request(self, method, url, data=None, list_key='results'):
+        """
+        Like _do_send_request, but decodes response incrementally while it's being iterated over - yields
+        ``(key, value)`` pairs of response members, with items of ``list_key`` list yielded one by one
+        (see json_requests.JSONObjectStream). The request stays open until the response is consumed.
+
+        Circuit breaker, tracing and metrics only cover the request until response headers arrive - time the caller
+        takes to consume the response is not API latency, and the caller might never finish consuming it.
+        """
+        if self.dry_run:
+            return
+
+        http_method = getattr(method, '__name__', None)
+        with circuit_breaker.protected_call(url), api_tracing.trace_api_call(http_method, url) as call, \
+                metrics.measured_api_request(http_method, url):
+            response = method(url, data) if data is not None else method(url)
+
+        api_cache.record_response(url, *self._get_validators(response))
+        body = json_requests.ResponseBody(response)
+        try:
+            for member in json_requests.JSONObjectStream(body, list_key):
+                yield member
+        finally:
+            # call is already recorded in the trace - response size is filled in once it's known
+            call.bytes = body.bytes_read
+            response.close()
+
+    @staticmethod
+    def _send_conditional_request(method, url, headers):
+        """
+        :return: response, or None if requested resource was not modified
+        """
+        try:
+            return method(url, headers=headers)
+        except HTTPError as http_error:
+            if http_error.code == 304:
+                return None
+            raise
+
+    @staticmethod
+    def _get_validators(response):
+        """
+        :return: ETag and Last-Modified response headers, None for missing ones
+        """
+        headers = getattr(response, 'headers', None) or {}
+        return tuple(
+            value if isinstance(value, str) else None for value in (headers.get('ETag'), headers.get('Last-Modified'))
+        )
 
     def send_request(self, method, url_parts, data=None, query_params=None, no_trailing_slash=False):
         url = self.build_url(url_parts, query_params, no_trailing_slash)
@@ -76,7 +159,7 @@ class ProjectAPI(object):
         qs_params = {'page_size': 0}
         return self.send_request(GET, (USERS_API, user_id, 'organizations'), query_params=qs_params)
 
-    @memoize_with_expiration()
+    @memoize_with_expiration(stale_while_revalidate=STALE_WHILE_REVALIDATE)
     def get_user_preferences(self, user_id):
         """ gets users preferences information """
         return self.send_request(GET, (USERS_API, user_id, 'preferences'), no_trailing_slash=True)
@@ -240,6 +323,7 @@ class ProjectAPI(object):
                 self.create_workgroup_review_assessment(question_data)
 
 
+@metrics.instrument_methods(metrics.API_METHOD_DURATION)
 class TypedProjectAPI(ProjectAPI):
     """
     This class is intended to contain methods that return typed responses.
@@ -247,16 +331,20 @@ class TypedProjectAPI(ProjectAPI):
     convert them to reentrant collection if need more than one pass over the response
     """
     def _consume_paged_response(self, method, entry_url, data=None):
+        """
+        Yields results from all pages, decoding them as they are consumed - a page is never held in memory as a whole
+        """
         next_page_url = entry_url
 
         while next_page_url:
-            response = self._do_send_request(method, next_page_url, data)
-            for item in response['results']:
-                yield item
-
-            next_page_url = response.get('next')
-
-    @memoize_with_expiration()
+            page_url, next_page_url = next_page_url, None
+            for key, value in self._stream_request(method, page_url, data):
+                if key == 'results':
+                    yield value
+                elif key == 'next':
+                    next_page_url = value
+
+    @memoize_with_expiration(stale_while_revalidate=STALE_WHILE_REVALIDATE)
     def get_user_details(self, user_id):
         """
         :param int user_id: User ID
@@ -359,37 +447,108 @@ class TypedProjectAPI(ProjectAPI):
             )
         )
 
-    # TODO: make typed + add tests
-    def get_latest_workgroup_submissions_by_id(self, group_id):
+    @staticmethod
+    def _get_latest_submissions_by_id(submission_list):
         """
-        :param int group_id: Group ID
+        Picks latest submission for each document_id
+        :param list[dict] submission_list: submissions
         :rtype: dict[dict]
         """
-        submission_list = self.get_workgroup_submissions(group_id)
-
         submissions_by_id = {}
         for submission in submission_list:
             submission_id = submission['document_id']
-            if submission['user']:
-                submission[u'user_details'] = self.get_user_details(submission['user'])
             if submission_id in submissions_by_id:
                 last_modified = build_date_field(submissions_by_id[submission_id]["modified"])
                 this_modified = build_date_field(submission["modified"])
                 if this_modified > last_modified:
-                    submissions_by_id[submission["document_id"]] = submission
+                    submissions_by_id[submission_id] = submission
             else:
-                submissions_by_id[submission["document_id"]] = submission
+                submissions_by_id[submission_id] = submission
 
         return submissions_by_id
 
-    # TODO: add tests + do something about different type of user_details.organization attribute
+    # TODO: make typed + add tests
+    def get_latest_workgroup_submissions_by_id(self, group_id):
+        """
+        :param int group_id: Group ID
+        :rtype: dict[dict]
+        """
+        submissions_by_id = self._get_latest_submissions_by_id(self.get_workgroup_submissions(group_id))
+
+        for submission in submissions_by_id.values():
+            if submission['user']:
+                submission[u'user_details'] = self.get_user_details(submission['user'])
+
+        return submissions_by_id
+
+    def get_latest_submissions_by_workgroup(self, group_ids, upload_ids=None):
+        """
+        Bulk version of get_latest_workgroup_submissions_by_id for dashboards: fetches submissions for all the groups
+        concurrently (at most BULK_REQUEST_WORKERS requests in flight) and skips submitter details lookup.
+
+        :param collections.Iterable[int] group_ids: Group IDs
+        :param collections.Iterable[str] upload_ids: if given, only submissions for these upload ids are returned
+        :rtype: dict[int, dict[str, dict]]
+        :returns: latest submissions by document_id, by group_id
+        """
+        group_ids = list(set(group_ids))
+        upload_ids = set(upload_ids) if upload_ids is not None else None
+
+        def _get_group_submissions(group_id):
+            submissions = self._get_latest_submissions_by_id(self.get_workgroup_submissions(group_id))
+            if upload_ids is not None:
+                submissions = {
+                    upload_id: submission for upload_id, submission in submissions.items() if upload_id in upload_ids
+                }
+            return group_id, submissions
+
+        if len(group_ids) <= 1:
+            return dict(_get_group_submissions(group_id) for group_id in group_ids)
+
+        with ThreadPoolExecutor(max_workers=min(BULK_REQUEST_WORKERS, len(group_ids))) as executor:
+            return dict(executor.map(
+                api_tracing.propagate_trace(metrics.propagate_request_counter(_get_group_submissions)), group_ids
+            ))
+
+    # TODO: do something about different type of user_details.organization attribute
     def get_member_data(self, user_id):
         """
         :param int user_id:
         :rtype: UserDetails
         """
-        user_details = self.get_user_details(user_id)  # user_details.organization is an int here
-        user_organizations = self.get_user_organizations(user_id)
+        return self._make_member_data(self.get_user_details(user_id), self.get_user_organizations(user_id))
+
+    def get_members_data(self, user_ids):
+        """
+        Parallel version of get_member_data. API has no endpoint returning several users or their organizations, so
+        this still sends two requests per user (details and organizations), but fans them out concurrently, with at
+        most BULK_REQUEST_WORKERS requests in flight. Both are cached the same as in get_member_data.
+
+        :param collections.Iterable[int] user_ids: User IDs
+        :rtype: list[UserDetails]
+        :returns: user details, in order of user_ids
+        """
+        user_ids = list(user_ids)
+        if len(user_ids) <= 1:
+            return [self.get_member_data(user_id) for user_id in user_ids]
+
+        requests = [(self.get_user_details, user_id) for user_id in user_ids]
+        requests.extend((self.get_user_organizations, user_id) for user_id in user_ids)
+        send_request = api_tracing.propagate_trace(
+            metrics.propagate_request_counter(lambda request: request[0](request[1]))
+        )
+        with ThreadPoolExecutor(max_workers=min(BULK_REQUEST_WORKERS, len(requests))) as executor:
+            responses = list(executor.map(send_request, requests))
+
+        users_details, users_organizations = responses[:len(user_ids)], responses[len(user_ids):]
+        return [
+            self._make_member_data(user_details, user_organizations)
+            for user_details, user_organizations in zip(users_details, users_organizations)
+        ]
+
+    @staticmethod
+    def _make_member_data(user_details, user_organizations):
+        # user_details.organization is an int here
         if user_organizations:
             user_details.organization = user_organizations[0]['display_name']  # and a string here
         return user_details
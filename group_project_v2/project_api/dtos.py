@@ -1,7 +1,9 @@
 """ Contains DTOs used in Typed API. DTOs mostly follow structure of API responses """
+from group_project_v2.api_cache import register_dto
 from group_project_v2.utils import make_user_caption
 
 
+@register_dto
 class ReducedUserDetails(object):
     """ User data embedded in a workgroup detail response """
     def __init__(self, **kwargs):
@@ -21,6 +23,7 @@ class ReducedUserDetails(object):
 
 
 # pylint:disable=too-many-instance-attributes
+@register_dto
 class UserDetails(ReducedUserDetails):
     def __init__(self, **kwargs):
         super(UserDetails, self).__init__(**kwargs)
@@ -37,6 +40,7 @@ class UserDetails(ReducedUserDetails):
         return make_user_caption(self)
 
 
+@register_dto
 class ProjectDetails(object):
     def __init__(self, **kwargs):
         self.id = kwargs.get('id')
@@ -49,6 +53,7 @@ class ProjectDetails(object):
         self.workgroups = kwargs.get('workgroups')
 
 
+@register_dto
 class WorkgroupDetails(object):
     """
     :type users: list[ReducedUserDetails]
@@ -71,6 +76,7 @@ class WorkgroupDetails(object):
         self.peer_reviews = kwargs.get('peer_reviews')
 
 
+@register_dto
 class CompletionDetails(object):
     def __init__(self, **kwargs):
         self.id = kwargs.get('id')
@@ -82,6 +88,7 @@ class CompletionDetails(object):
         self.modified = kwargs.get('modified')
 
 
+@register_dto
 class OrganisationDetails(object):
     def __init__(self, **kwargs):
         self.name = kwargs.get('name')
@@ -89,6 +96,7 @@ class OrganisationDetails(object):
         self.user_ids = set(kwargs.get('users'))
 
 
+@register_dto
 class UserGroupDetails(object):
     def __init__(self, **kwargs):
         self.id = kwargs.get('id')
@@ -2,6 +2,7 @@
 This module contains Project Navigator XBlock and it's children view XBlocks
 """
 import logging
+from collections import OrderedDict
 
 import pkg_resources
 from django import utils
@@ -21,18 +22,62 @@ from xblockutils.studio_editable import (
 from group_project_v2 import messages
 from group_project_v2.mixins import (
     AdminAccessControlXBlockMixin,
+    ApiTracingXBlockMixin,
     ChildrenNavigationXBlockMixin,
     CompletionMixin,
     NoStudioEditableSettingsMixin,
+    SettingsMixin,
     XBlockWithComponentsMixin,
     XBlockWithUrlNameDisplayMixin,
 )
-from group_project_v2.utils import DiscussionXBlockShim, I18NService, add_resource
+from group_project_v2.static_bundles import get_bundled_path
+from group_project_v2.utils import (
+    Constants,
+    DiscussionXBlockShim,
+    GroupworkAccessDeniedError,
+    I18NService,
+    add_resource,
+)
 from group_project_v2.utils import gettext as _
 from group_project_v2.utils import loader
 
 log = logging.getLogger(__name__)
 
+TRANSLATIONS_DIR = 'public/js/translations'
+TRANSLATIONS_PATH_TEMPLATE = TRANSLATIONS_DIR + '/{locale}/textjs.js'
+DEFAULT_TRANSLATIONS_LOCALE = 'en'
+
+# Translations JS by locale. Files never change while the process runs, so all of them are loaded at once - at startup
+# by the app config if group_project_v2 is in INSTALLED_APPS, otherwise on first use
+_translations = {}  # pylint: disable=invalid-name
+
+
+def warm_up_translations():
+    """
+    Loads translations JS for all available locales.
+
+    :returns: number of loaded locales
+    :rtype: int
+    """
+    loaded = {}
+    for locale in pkg_resources.resource_listdir(__name__, TRANSLATIONS_DIR):
+        path = TRANSLATIONS_PATH_TEMPLATE.format(locale=locale)
+        if pkg_resources.resource_exists(__name__, path):
+            loaded[locale] = pkg_resources.resource_string(__name__, path).decode("utf8")
+    _translations.update(loaded)
+    return len(loaded)
+
+
+def get_translations_locale():
+    """
+    Returns locale of translations JS to be used for current language - falls back to English if there are no
+    translations for current language.
+    """
+    if not _translations:
+        warm_up_translations()
+    locale = utils.translation.to_locale(utils.translation.get_language())
+    return locale if locale in _translations else DEFAULT_TRANSLATIONS_LOCALE
+
 
 class ViewTypes(object):
     """
@@ -46,13 +91,16 @@ class ViewTypes(object):
 
 
 @XBlock.needs("i18n")
+@XBlock.wants("settings")
 class GroupProjectNavigatorXBlock(
     ChildrenNavigationXBlockMixin,
     XBlockWithComponentsMixin,
     XBlockWithPreviewMixin,
     NoStudioEditableSettingsMixin,
     StudioContainerXBlockMixin,
+    ApiTracingXBlockMixin,
     CompletionMixin,
+    SettingsMixin,
     XBlock,
     I18NService
 ):
@@ -64,6 +112,13 @@ class GroupProjectNavigatorXBlock(
     STUDIO_LABEL = _(u"Group Project Navigator")
     INITIAL_VIEW = ViewTypes.NAVIGATION
 
+    # XBlock setting: if True, only the activated view is rendered with the page, others are loaded on demand
+    LAZY_VIEWS_SETTING_KEY = "lazy_navigator_views"
+    # Context keys passed to views rendered on demand
+    LAZY_VIEW_CONTEXT_KEYS = (Constants.CURRENT_STAGE_ID_PARAMETER_NAME, )
+
+    block_settings_key = 'group_project_v2'
+
     display_name_with_default = _(u"Group Project Navigator")
 
     editable = False
@@ -118,45 +173,70 @@ class GroupProjectNavigatorXBlock(
         """
         Returns JS content containing translations for user's language.
         """
-        try:
-            return self.resource_string('public/js/translations/{lang}/textjs.js'.format(
-                lang=utils.translation.to_locale(utils.translation.get_language()),
-            ))
-        except IOError:
-            return self.resource_string('public/js/translations/en/textjs.js')
+        return _translations[get_translations_locale()]
+
+    def add_translations(self, fragment):
+        """
+        Adds translations for user's language to the fragment - by URL if static bundles are built, inline otherwise.
+        """
+        translations_path = TRANSLATIONS_PATH_TEMPLATE.format(locale=get_translations_locale())
+        if get_bundled_path(translations_path):
+            add_resource(self, 'javascript', translations_path, fragment)
+        else:
+            fragment.add_javascript(self.get_translation_content())
+
+    @property
+    def lazy_views(self):
+        return bool(self._get_setting(self.LAZY_VIEWS_SETTING_KEY, False))
+
+    def _render_view_item(self, view, context, fragment, render_content=True):
+        item = {
+            'id': str(view.scope_ids.usage_id).replace("/", ";_"),
+            'type': view.type,
+            'lazy': False,
+        }
+
+        if view.skip_content:
+            item['content'] = ''
+        elif render_content:
+            child_fragment = view.render('student_view', context)
+            item['content'] = child_fragment.content
+            fragment.add_fragment_resources(child_fragment)
+        else:
+            item['content'] = ''
+            item['lazy'] = True
+
+        if not view.skip_selector:
+            child_selector_fragment = view.render('selector_view', context)
+            item['selector'] = child_selector_fragment.content
+            fragment.add_fragment_resources(child_selector_fragment)
+        else:
+            item['selector'] = ''
+
+        return item
 
     def student_view(self, context):
         """
         Student view
         """
         fragment = Fragment()
-        children_items = []
-        for view in self._sorted_child_views():
-            item = {
-                'id': str(view.scope_ids.usage_id).replace("/", ";_"),
-                'type': view.type,
-            }
-
-            if not view.skip_content:
-                child_fragment = view.render('student_view', context)
-                item['content'] = child_fragment.content
-                fragment.add_fragment_resources(child_fragment)
-            else:
-                item['content'] = ''
-
-            if not view.skip_selector:
-                child_selector_fragment = view.render('selector_view', context)
-                item['selector'] = child_selector_fragment.content
-                fragment.add_fragment_resources(child_selector_fragment)
-            else:
-                item['selector'] = ''
-
-            children_items.append(item)
 
         activate_block_id = self.get_block_id_from_string(context.get('activate_block_id', None))
+        selected_view = self._get_activated_view_type(activate_block_id)
+        lazy_views = self.lazy_views
+
+        children_items = [
+            self._render_view_item(
+                view, context, fragment, render_content=not lazy_views or view.type == selected_view
+            )
+            for view in self._sorted_child_views()
+        ]
 
         js_parameters = {
-            'selected_view': self._get_activated_view_type(activate_block_id)
+            'selected_view': selected_view,
+            'view_context': {
+                key: str(context[key]) for key in self.LAZY_VIEW_CONTEXT_KEYS if context.get(key) is not None
+            },
         }
 
         fragment.add_content(
@@ -168,11 +248,28 @@ class GroupProjectNavigatorXBlock(
         )
         add_resource(self, 'css', 'public/css/project_navigator/project_navigator.css', fragment)
         add_resource(self, 'javascript', 'public/js/project_navigator/project_navigator.js', fragment)
-        fragment.add_javascript(self.get_translation_content())
+        self.add_translations(fragment)
         fragment.initialize_js("GroupProjectNavigatorBlock", js_parameters)
 
         return fragment
 
+    @XBlock.json_handler
+    def render_view(self, data, _suffix=''):
+        """
+        Renders single view's student_view - used to load views on demand when lazy views are enabled.
+        Returns fragment content along with resources it requires.
+        """
+        view_type = data.get('view_type')
+        context = {
+            key: data['context'][key]
+            for key in self.LAZY_VIEW_CONTEXT_KEYS if key in data.get('context', {})
+        }
+        for view in self._sorted_child_views():
+            if view.type == view_type and not view.skip_content:
+                return view.render('student_view', context).to_dict()
+
+        return {'result': 'error', 'message': self._(messages.UNKNOWN_NAVIGATOR_VIEW).format(view_type=view_type)}
+
     def author_preview_view(self, context):
         fragment = Fragment()
         children_contents = []
@@ -200,6 +297,7 @@ class GroupProjectNavigatorXBlock(
 
 @XBlock.needs("i18n")
 class ProjectNavigatorViewXBlockBase(
+    ApiTracingXBlockMixin,
     CompletionMixin,
     XBlockWithPreviewMixin,
     StudioEditableXBlockMixin,
@@ -346,18 +444,68 @@ class NavigationViewXBlock(ProjectNavigatorViewXBlockBase):
     js_file = "navigation_view.js"
     initialize_js_function = "GroupProjectNavigatorNavigationView"
 
+    @lazy
+    def available_stages(self):
+        """
+        Stages available to current user across all activities
+        """
+        return [
+            stage for activity in self.navigator.group_project.activities for stage in activity.available_stages
+        ]
+
+    @lazy
+    def stage_states(self):
+        """
+        Current user's states of all available stages by stage id. Computed in one pass - stages of the same type are
+        handled together, so they can share API calls - and kept for the rest of the request.
+        """
+        stages_by_type = OrderedDict()
+        for stage in self.available_stages:
+            stages_by_type.setdefault(type(stage), []).append(stage)
+
+        stage_states = {}
+        for stage_type, stages in stages_by_type.items():
+            try:
+                stage_states.update(stage_type.get_stage_states(stages))
+            except GroupworkAccessDeniedError:
+                # left to stages' navigation_view to handle
+                log.warning("Access denied when calculating stage states for %s", stage_type.__name__)
+        return stage_states
+
     def student_view(self, context):
         """
         Student view
         """
+        activity_context = dict(context)
+        activity_context[Constants.STAGE_STATES] = self.stage_states
+
         activity_fragments = []
         for activity in self.navigator.group_project.activities:
-            activity_fragment = activity.render("navigation_view", context)
+            activity_fragment = activity.render("navigation_view", activity_context)
             activity_fragments.append(activity_fragment)
 
         context = {'view': self, 'activity_contents': [frag.content for frag in activity_fragments]}
         return self.render_student_view(context, activity_fragments)
 
+    @XBlock.json_handler
+    def refresh_stage_states(self, _data, _suffix=''):
+        """
+        Returns current user's states of all available stages, so that navigation view can be updated without
+        re-rendering it.
+        """
+        stage_states = self.stage_states
+        return {
+            'result': 'success',
+            'stage_states': [
+                {
+                    'activity_id': str(stage.activity.id),
+                    'stage_id': str(stage.id),
+                    'state': stage_states[str(stage.id)],
+                }
+                for stage in self.available_stages if str(stage.id) in stage_states
+            ]
+        }
+
 
 class ResourcesViewXBlock(ProjectNavigatorViewXBlockBase):
     """
@@ -2,19 +2,48 @@
 /* exported GroupProjectNavigatorNavigationView */
 function GroupProjectNavigatorNavigationView(runtime, element) {
     "use strict";
+    var refresh_timeout = null;
+
+    function set_stage_state(activity_id, stage_id, new_state) {
+        var activity_wrapper = $(".group-project-activity-wrapper[data-activity-id='"+activity_id+"']", element),
+            stage_item = $(".group-project-stage[data-stage-id='"+stage_id+"']", activity_wrapper);
+
+        if (!stage_item) {
+            return;
+        }
+
+        var status_icon = $(".group-project-stage-state", stage_item);
+        status_icon.removeClass("not-started incomplete completed");
+        status_icon.addClass(new_state);
+    }
+
+    function refresh_stage_states() {
+        // fetch states of all stages, without re-rendering the view
+        $.ajax({
+            type: 'POST',
+            url: runtime.handlerUrl(element, 'refresh_stage_states'),
+            data: JSON.stringify({}),
+            dataType: 'json'
+        }).done(function(data) {
+            var stage_states = data.stage_states || [];
+            for (var i = 0; i < stage_states.length; i++) {
+                set_stage_state(stage_states[i].activity_id, stage_states[i].stage_id, stage_states[i].state);
+            }
+        });
+    }
+
     $(document).on(
         GroupProjectCommon.ProjectNavigator.events.stage_status_update,
         function(target, activity_id, stage_id, new_state) {
-            var activity_wrapper = $(".group-project-activity-wrapper[data-activity-id='"+activity_id+"']", element),
-                stage_item = $(".group-project-stage[data-stage-id='"+stage_id+"']", activity_wrapper);
-
-            if (!stage_item) {
+            if (new_state) {
+                // submit responses already carry new states of the affected stages
+                set_stage_state(activity_id, stage_id, new_state);
                 return;
             }
 
-            var status_icon = $(".group-project-stage-state", stage_item);
-            status_icon.removeClass("not-started incomplete completed");
-            status_icon.addClass(new_state);
+            // state is unknown - fetch all of them, once per burst of updates
+            clearTimeout(refresh_timeout);
+            refresh_timeout = setTimeout(refresh_stage_states, 0);
         }
     );
 }
@@ -1,5 +1,82 @@
-/* global GroupProjectCommon */
+/* global GroupProjectCommon, XBlock */
 /* exported GroupProjectNavigatorBlock */
+var GroupProjectNavigatorLazyViews = (function () {
+    "use strict";
+    // Resources already added to the page, shared by all navigator instances: {resource key: promise}
+    var loaded_resources = {};
+
+    function resource_key(resource) {
+        return resource.kind + ':' + resource.mimetype + ':' + resource.data;
+    }
+
+    function load_resource(resource) {
+        var key = resource_key(resource);
+        if (loaded_resources.hasOwnProperty(key)) {
+            return loaded_resources[key];
+        }
+
+        var deferred = $.Deferred();
+        if (resource.mimetype === 'text/css') {
+            if (resource.kind === 'url') {
+                $('<link rel="stylesheet" type="text/css">').attr('href', resource.data).appendTo('head');
+            } else {
+                $('<style type="text/css">').text(resource.data).appendTo('head');
+            }
+            deferred.resolve();
+        } else if (resource.mimetype === 'application/javascript') {
+            if (resource.kind === 'url') {
+                $.ajax({url: resource.data, dataType: 'script', cache: true}).always(deferred.resolve);
+            } else {
+                $.globalEval(resource.data);
+                deferred.resolve();
+            }
+        } else if (resource.kind === 'text' && resource.mimetype === 'text/html') {
+            $(resource.placement === 'head' ? 'head' : 'body').append(resource.data);
+            deferred.resolve();
+        } else {
+            deferred.resolve();
+        }
+
+        loaded_resources[key] = deferred.promise();
+        return loaded_resources[key];
+    }
+
+    function load_resources(resources) {
+        // scripts might depend on each other, so they are loaded one by one, in order
+        return resources.reduce(function (previous, resource) {
+            return previous.then(function () { return load_resource(resource); });
+        }, $.Deferred().resolve().promise());
+    }
+
+    function load_view(runtime, element, view_data, view_type, view_context) {
+        if (!view_data.loading) {
+            view_data.loading = $.ajax({
+                type: 'POST',
+                url: runtime.handlerUrl(element, 'render_view'),
+                data: JSON.stringify({view_type: view_type, context: view_context}),
+                dataType: 'json'
+            }).then(function (data) {
+                if (data.result === 'error') {
+                    return $.Deferred().reject().promise();
+                }
+                return load_resources(data.resources || []).then(function () {
+                    view_data.view.html(data.content).removeAttr('data-lazy');
+                    if (typeof XBlock !== 'undefined' && XBlock.initializeBlocks) {
+                        XBlock.initializeBlocks(view_data.view);
+                    }
+                });
+            });
+            view_data.loading.fail(function () {
+                // allow retrying on next switch
+                view_data.loading = null;
+            });
+        }
+        return view_data.loading;
+    }
+
+    return {load_view: load_view};
+}());
+
 function GroupProjectNavigatorBlock(runtime, element, initialization_args) {
     "use strict";
     var initial_view = 'navigation';
@@ -7,7 +84,8 @@ function GroupProjectNavigatorBlock(runtime, element, initialization_args) {
     var view_elements = $(".group-project-navigator-view", element),
         views = {},
         selected_view = null,
-        initial_selected_view = initialization_args.selected_view;
+        initial_selected_view = initialization_args.selected_view,
+        view_context = initialization_args.view_context || {};
 
     function switch_to_view(target_view, skip_content_switching) {
         var view_data = views[target_view];
@@ -23,6 +101,9 @@ function GroupProjectNavigatorBlock(runtime, element, initialization_args) {
         if (!skip_content_switching) {
             $(".group-project-navigator-view", element).hide();
             view_data.view.show();
+            if (view_data.view.data('lazy')) {
+                GroupProjectNavigatorLazyViews.load_view(runtime, element, view_data, target_view, view_context);
+            }
         }
     }
 
@@ -12,6 +12,9 @@ function GroupProjectReviewStage(runtime, element) {
     var messages = GroupProjectCommon.Review.messages;
     var show_message = GroupProjectCommon.Messages.show_message;
 
+    // answers loaded into the form - only changed answers are submitted
+    var loaded_answers = {};
+
     function validate_form_answers() {
         var answers = $form.find('.required .answer');
         var submitButton = $form.find('button.submit');
@@ -72,6 +75,7 @@ function GroupProjectReviewStage(runtime, element) {
         $form.find('.editable').attr('disabled', 'disabled');
         $form.find('.answer').val(null);
         $form.find('button.submit').html(NO_DATA_PRESENT_SUBMIT).attr('disabled', 'disabled');
+        loaded_answers = {};
         $.ajax({
             url: runtime.handlerUrl(element, handler_name),
             data: args,
@@ -86,6 +90,7 @@ function GroupProjectReviewStage(runtime, element) {
                     }
                 }
                 else {
+                    loaded_answers = data;
                     load_data_into_form(data);
                 }
             },
@@ -128,9 +133,13 @@ function GroupProjectReviewStage(runtime, element) {
 
         $form.find(':submit').prop('disabled', true);
         var items = $form.find('input, select, textarea').serializeArray();
-        var data = {};
+        var answers = {}, data = {};
         $.each(items, function (i, v) {
-            data[v.name] = v.value;
+            answers[v.name] = v.value;
+            var loaded_value = loaded_answers.hasOwnProperty(v.name) ? String(loaded_answers[v.name]) : '';
+            if (v.value !== loaded_value) {
+                data[v.name] = v.value;
+            }
         });
         data.review_subject_id = $("ul.review_subjects li.selected", $form).data('id');
 
@@ -148,6 +157,10 @@ function GroupProjectReviewStage(runtime, element) {
                 var msg = (data.msg) ? data.msg : messages.THANKS_FOR_FEEDBACK;
                 show_message(msg);
 
+                if (data.result !== 'error') {
+                    loaded_answers = answers;
+                }
+
                 if (data.new_stage_states) {
                     for (var i=0; i<data.new_stage_states.length; i++) {
                         var new_state = data.new_stage_states[i];
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from urllib.parse import urlencode
 
 import pytz
+from django.utils import translation
 from lazy.lazy import lazy
 from web_fragments.fragment import Fragment
 from xblock.core import XBlock
@@ -17,6 +18,7 @@ from group_project_v2.mixins import (
     AuthXBlockMixin,
     CommonMixinCollection,
     DashboardXBlockMixin,
+    UserIndependentXBlockMixin,
     XBlockWithUrlNameDisplayMixin,
 )
 from group_project_v2.notifications import StageNotificationsMixin
@@ -32,14 +34,18 @@ from group_project_v2.utils import (
     HtmlXBlockShim,
     add_resource,
     format_date,
+    fragment_cache,
     get_block_content_id,
     get_link_to_block,
 )
 from group_project_v2.utils import gettext as _
-from group_project_v2.utils import groupwork_protected_view, loader
+from group_project_v2.utils import groupwork_protected_view, loader, make_key
 
 log = logging.getLogger(__name__)
 
+# context values that identify themselves by value, so fragments rendered with such contexts can be cached
+FRAGMENT_CACHE_CONTEXT_TYPES = (str, int, float, bool, type(None))
+
 STAGE_STATS_LOG_TPL = (
     "Calculating stage stats for stage %(stage)s "
     "all - %(target_users)s, completed - %(completed)s, partially completed - %(partially_completed)s"
@@ -140,18 +146,27 @@ class BaseGroupActivityStage(
         """
         Returns teammates to review. May throw `class`: OutsiderDisallowedError
         """
+        return self.get_team_members_data()
+
+    def get_team_members_data(self, include_current_user=False):
+        """
+        Returns details of current user's teammates, fetched in parallel. May throw `class`: OutsiderDisallowedError
+        :param bool include_current_user: If True, current user's details are returned first, followed by teammates.
+            Failure to load teammates is ignored, but failure to load current user's details is raised.
+        :rtype: list[group_project_v2.project_api.dtos.UserDetails]
+        """
         if not self.is_group_member:
             return []
 
+        user_ids = [user.id for user in self.workgroup.users if self.user_id != int(user.id)]
+        if include_current_user:
+            user_ids.insert(0, self.user_id)
         try:
-            result = []
-            for team_member in self.workgroup.users:
-                team_member_id = team_member.id
-                if self.user_id == int(team_member_id):
-                    continue
-                result.append(self.project_api.get_member_data(team_member_id))
-            return result
+            return self.project_api.get_members_data(user_ids)
         except ApiError:
+            if include_current_user:
+                # details loaded before the failure are cached, so this only repeats the requests that failed
+                return [self.project_api.get_member_data(self.user_id)]
             return []
 
     @property
@@ -183,7 +198,7 @@ class BaseGroupActivityStage(
 
     @property
     def completed(self):
-        return self.get_stage_state() == StageState.COMPLETED
+        return self.stage_state == StageState.COMPLETED
 
     @property
     def available_now(self):
@@ -266,10 +281,43 @@ class BaseGroupActivityStage(
         fragment.add_fragment_resources(url_name_fragment)
         return fragment
 
+    @staticmethod
+    def _get_fragment_cache_context_key(context):
+        """
+        Returns part of fragment cache key identifying view context, which child views merge into their templates, or
+        None if context can't be identified by value (i.e. contains objects) and rendered fragment should not be cached.
+        """
+        items = sorted(context.items())
+        if not all(isinstance(value, FRAGMENT_CACHE_CONTEXT_TYPES) for _key, value in items):
+            return None
+        return repr(items)
+
+    def _render_child_fragment_cached(self, child, context, view):
+        """
+        Renders child, reusing view output of user-independent children rendered before with the same context. Only the
+        raw view output is cached - runtime wraps it into request- and user-specific markup, so it is wrapped on each
+        render.
+        """
+        context_key = None
+        if view == 'student_view' and isinstance(child, UserIndependentXBlockMixin):
+            context_key = self._get_fragment_cache_context_key(context)
+        if context_key is None:
+            return self._render_child_fragment(child, context, view)
+
+        cache_key = make_key(
+            child.scope_ids.usage_id, view, child.get_fragment_cache_version(), translation.get_language(), context_key
+        )
+        child_fragment = fragment_cache.get(cache_key)
+        if child_fragment is None:
+            child_fragment = getattr(child, view)(context)
+            fragment_cache.set(cache_key, child_fragment)
+        child_fragment = self.runtime.wrap_xblock(child, view, child_fragment, context)
+        return self.runtime.render_asides(child, view, child_fragment, context)
+
     def render_children_fragments(self, context, view='student_view'):
         children_fragments = []
         for child in self._children:
-            child_fragment = self._render_child_fragment(child, context, view)
+            child_fragment = self._render_child_fragment_cached(child, context, view)
             children_fragments.append(child_fragment)
 
         return children_fragments
@@ -307,6 +355,29 @@ class BaseGroupActivityStage(
     def get_stage_state(self):
         raise NotImplementedError(MUST_BE_OVERRIDDEN)
 
+    @lazy
+    def stage_state(self):
+        """
+        Current user's stage state, memoized for the rest of the request as calculating it might take several API
+        calls. Use get_stage_state to get up-to-date state after stage data was changed.
+        """
+        return self.get_stage_state()
+
+    @property
+    def is_stage_state_memoized(self):
+        return 'stage_state' in self.__dict__
+
+    @classmethod
+    def get_stage_states(cls, stages):
+        """
+        Calculates current user's states for multiple stages of this type, reusing memoized states. Stages able to
+        fetch data for multiple stages at once should override it to avoid calculating state per stage.
+        :param collections.Iterable[BaseGroupActivityStage] stages: stages of this type
+        :rtype: dict[str, StageState]
+        :returns: stage states by stage id
+        """
+        return {str(stage.id): stage.stage_state for stage in stages}
+
     def get_dashboard_stage_state(self, target_workgroups, target_students):
         """
         :param collections.Iterable[group_project_v2.project_api.dtos.WorkgroupDetails] target_workgroups:
@@ -377,6 +448,15 @@ class BaseGroupActivityStage(
         """
         return StageState.NOT_AVAILABLE
 
+    def get_external_group_statuses(self, groups):
+        """
+        Calculates external group statuses for multiple groups. Stages able to fetch data for multiple groups at once
+        should override it to avoid calling get_external_group_status per group.
+        :param collections.Iterable[group_project_v2.project_api.dtos.WorkgroupDetails] groups: workgroups
+        :rtype: dict[int, StageState]
+        """
+        return {group.id: self.get_external_group_status(group) for group in groups}
+
     def get_external_status_label(self, status):
         """
         Gets human-friendly label for external status.
@@ -388,15 +468,17 @@ class BaseGroupActivityStage(
 
     def navigation_view(self, context):
         """
-        Renders stage content for navigation view
+        Renders stage content for navigation view. Uses stage state from context's Constants.STAGE_STATES, if present.
         :param dict context:
         :rtype: Fragment
         """
         fragment = Fragment()
+        stage_states = context.get(Constants.STAGE_STATES) or {}
+        stage_state = stage_states.get(str(self.id))
         rendering_context = {
             'stage': self,
             'activity_id': self.activity.id,
-            'stage_state': self.get_stage_state(),
+            'stage_state': stage_state if stage_state is not None else self.stage_state,
             'block_link': get_link_to_block(self),
             'is_current_stage': self.is_current_stage(context)
         }
@@ -456,7 +538,8 @@ class BaseGroupActivityStage(
         fragment = Fragment()
         render_context = {
             'stage': self, 'ta_graded': self.activity.is_ta_graded,
-            'download_incomplete_emails_handler_url': self.get_incomplete_emails_handler_url()
+            'download_incomplete_emails_handler_url': self.get_incomplete_emails_handler_url(),
+            'download_submissions_archive_url': self.get_submissions_archive_url(),
         }
         fragment.add_content(self.render_template('dashboard_detail_view', render_context))
         return fragment
@@ -468,9 +551,17 @@ class BaseGroupActivityStage(
         }
         return base_url + '?' + urlencode(query_params)
 
+    def get_submissions_archive_url(self):  # pylint: disable=no-self-use
+        """
+        URL to download archive of all submissions for the stage, or None if stage has no submissions
+        """
+        return None
+
     def get_new_stage_state_data(self):
+        # called after stage data was changed, so memoized state is stale
+        lazy.invalidate(self, 'stage_state')
         return {
             "activity_id": str(self.activity.id),
             "stage_id": str(self.id),
-            "state": self.get_stage_state()
+            "state": self.stage_state
         }
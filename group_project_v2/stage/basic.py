@@ -1,5 +1,9 @@
 import logging
+import os
+from datetime import datetime
 
+import webob
+from django.utils.text import get_valid_filename
 from web_fragments.fragment import Fragment
 from xblock.core import XBlock
 from xblock.fields import Scope, String
@@ -11,8 +15,9 @@ from group_project_v2.stage.base import BaseGroupActivityStage
 from group_project_v2.stage.mixins import SimpleCompletionStageMixin
 from group_project_v2.stage.utils import DISPLAY_NAME_HELP, DISPLAY_NAME_NAME, StageState
 from group_project_v2.stage_components import GroupProjectSubmissionXBlock, SubmissionsStaticContentXBlock
+from group_project_v2.utils import Constants, build_date_field, get_storage, get_submission_storage_key
 from group_project_v2.utils import gettext as _
-from group_project_v2.utils import groupwork_protected_handler, loader
+from group_project_v2.utils import groupwork_protected_handler, loader, make_content_disposition, stream_zip_archive
 
 log = logging.getLogger(__name__)
 
@@ -119,6 +124,8 @@ class SubmissionStage(BaseGroupActivityStage):
 
     STAGE_ACTION = _(u"upload submission")
 
+    SUBMISSIONS_ARCHIVE_FILENAME = u"{activity_name} - {stage_name} - submissions.zip"
+
     @property
     def allowed_nested_blocks(self):
         blocks = super(SubmissionStage, self).allowed_nested_blocks
@@ -175,13 +182,46 @@ class SubmissionStage(BaseGroupActivityStage):
                 self.mark_complete(user.id)
 
     def get_stage_state(self):
-        # pylint: disable=no-else-return
-        if self.has_all_submissions:
-            return StageState.COMPLETED
-        elif self.has_some_submissions:
-            return StageState.INCOMPLETE
-        else:
-            return StageState.NOT_STARTED
+        return self._calculate_stage_states([self])[str(self.id)]
+
+    @classmethod
+    def get_stage_states(cls, stages):
+        """
+        Calculates stage states for multiple submission stages, fetching workgroup submissions once for all of them
+        that do not have their state memoized yet. Calculated states are memoized.
+        :param collections.Iterable[SubmissionStage] stages: stages
+        :rtype: dict[str, StageState]
+        """
+        stages = list(stages)
+        pending_stages = [stage for stage in stages if not stage.is_stage_state_memoized]
+        pending_states = cls._calculate_stage_states(pending_stages)
+        for stage in pending_stages:
+            stage.stage_state = pending_states[str(stage.id)]
+        return {str(stage.id): stage.stage_state for stage in stages}
+
+    @classmethod
+    def _calculate_stage_states(cls, stages):
+        """
+        Only checks presence of submissions, so does not need submitter details or signed links.
+        :param list[SubmissionStage] stages: stages
+        :rtype: dict[str, StageState]
+        """
+        if not stages:
+            return {}
+        upload_ids_by_stage, group_id_by_stage = {}, {}
+        for stage in stages:
+            upload_ids_by_stage[str(stage.id)] = set(submission.upload_id for submission in stage.submissions)
+            group_id_by_stage[str(stage.id)] = stage.workgroup.id
+
+        submissions = stages[0].project_api.get_latest_submissions_by_workgroup(
+            group_id_by_stage.values(), set().union(*upload_ids_by_stage.values())
+        )
+        return {
+            stage_id: cls._get_submissions_state(
+                upload_ids, set(submissions.get(group_id_by_stage[stage_id], {}).keys())
+            )
+            for stage_id, upload_ids in upload_ids_by_stage.items()
+        }
 
     def _render_view(self, child_view, template, context):
         fragment = Fragment()
@@ -203,6 +243,97 @@ class SubmissionStage(BaseGroupActivityStage):
             'submission_review_view', "templates/html/stages/submissions_review_view.html", context
         )
 
+    def get_submissions_archive_url(self):
+        return self.runtime.handler_url(self, 'download_submissions_archive')
+
+    def _get_submissions_archive_entries(self, group_ids):
+        """
+        Fetches latest submissions of the workgroups and returns archive entries for them (see stream_zip_archive).
+        Files are only opened when archived.
+
+        :rtype: list[(str, callable, datetime)]
+        """
+        upload_ids = set(submission.upload_id for submission in self.submissions)
+        submissions = self.project_api.get_latest_submissions_by_workgroup(group_ids, upload_ids)
+        storage = get_storage()
+
+        entries = []
+        for group_id in sorted(submissions):
+            for upload_id, submission_data in sorted(submissions[group_id].items()):
+                name = u"group_work/{group_id}/{upload_id}/{file_name}".format(
+                    group_id=group_id, upload_id=get_valid_filename(upload_id),
+                    file_name=os.path.basename(submission_data['document_filename'])
+                )
+                storage_key = get_submission_storage_key(submission_data)
+                modified = build_date_field(submission_data.get('modified')) or datetime.utcnow()
+                entries.append((name, (lambda key=storage_key: storage.open(key, 'rb')), modified))
+        return entries
+
+    def _filter_accessible_group_ids(self, group_ids, filter_org_ids=None):
+        """
+        Applies the same organization filtering as the dashboard: only keeps workgroups with members from the
+        organizations current user can see (and has filtered for).
+
+        :param set[int] group_ids: workgroup ids
+        :param list[int] filter_org_ids: organization ids explicitly filtered for, or None
+        :rtype: set[int]
+        """
+        org_filter = self.get_organization_filter_for_user(self.user_id, filter_org_ids)
+        if org_filter.allowed_org_ids is None and org_filter.filter_org_ids is None:
+            return group_ids
+        return set(
+            group_id for group_id in group_ids
+            if any(
+                org_filter.can_access_other_user(user.id)
+                for user in self.project_api.get_workgroup_by_id(group_id).users
+            )
+        )
+
+    @XBlock.handler
+    def download_submissions_archive(self, request, _suffix=''):
+        """
+        Streams ZIP archive of latest submissions of all the project's workgroups, or only workgroups passed via
+        `group_id` query parameters. Submissions are fetched up front; archive is then built on the fly from file
+        storage, one file at a time.
+
+        Workgroups are filtered by organization the same way as on the dashboard; `client_filter_id` query parameter
+        limits archive to a single organization.
+        """
+        if not self.can_access_dashboard(self.user_id):
+            return webob.response.Response(self._(messages.USER_NOT_ACCESS_DASHBOARD), status=403)
+
+        group_ids = set(self.activity.project.project_details.workgroups)
+        requested_group_ids = request.GET.getall('group_id')
+        if requested_group_ids:
+            try:
+                group_ids &= set(int(group_id) for group_id in requested_group_ids)
+            except ValueError:
+                return webob.response.Response(u"Invalid group_id", status=400)
+
+        filter_org_ids = None
+        client_filter_id = request.GET.get(Constants.CURRENT_CLIENT_FILTER_ID_PARAMETER_NAME, '').strip()
+        if client_filter_id:
+            try:
+                filter_org_ids = [int(client_filter_id)]
+            except ValueError:
+                return webob.response.Response(u"Invalid client_filter_id", status=400)
+        group_ids = self._filter_accessible_group_ids(group_ids, filter_org_ids)
+
+        # submissions are fetched before the response starts, so API errors are not reported as a truncated archive
+        try:
+            entries = self._get_submissions_archive_entries(group_ids)
+        except ApiError as exception:
+            log.exception(exception.message)
+            return webob.response.Response(exception.message, status=502)
+
+        filename = self.SUBMISSIONS_ARCHIVE_FILENAME.format(
+            activity_name=self.activity.display_name, stage_name=self.display_name
+        )
+        response = webob.response.Response(content_type='application/zip')
+        response.headers['Content-Disposition'] = make_content_disposition(filename)
+        response.app_iter = stream_zip_archive(entries)
+        return response
+
     def get_users_completion(self, target_workgroups, target_users):
         """
         Returns sets of completed user ids and partially completed user ids
@@ -210,10 +341,13 @@ class SubmissionStage(BaseGroupActivityStage):
         :param collections.Iterable[group_project_v2.project_api.dtos.ReducedUserDetails] target_users:
         :rtype: (set[int], set[int])
         """
+        target_workgroups = list(target_workgroups)
+        group_stage_states = self.get_external_group_statuses(target_workgroups)
+
         completed_users = []
         partially_completed_users = []
         for group in target_workgroups:
-            group_stage_state = self.get_external_group_status(group)
+            group_stage_state = group_stage_states[group.id]
             workgroup_user_ids = [user.id for user in group.users]
 
             if group_stage_state == StageState.COMPLETED:
@@ -223,6 +357,18 @@ class SubmissionStage(BaseGroupActivityStage):
 
         return set(completed_users), set(partially_completed_users)  # removing duplicates - just in case
 
+    @staticmethod
+    def _get_submissions_state(upload_ids, uploaded_submissions):
+        has_all = uploaded_submissions >= upload_ids
+        has_some = bool(uploaded_submissions & upload_ids)
+        # pylint: disable=no-else-return
+        if has_all:
+            return StageState.COMPLETED
+        elif has_some:
+            return StageState.INCOMPLETE
+        else:
+            return StageState.NOT_STARTED
+
     def get_external_group_status(self, group):
         """
         Calculates external group status for the Stage.
@@ -232,14 +378,18 @@ class SubmissionStage(BaseGroupActivityStage):
         """
         upload_ids = set(submission.upload_id for submission in self.submissions)
         group_submissions = self.project_api.get_latest_workgroup_submissions_by_id(group.id)
-        uploaded_submissions = set(group_submissions.keys())
+        return self._get_submissions_state(upload_ids, set(group_submissions.keys()))
 
-        has_all = uploaded_submissions >= upload_ids
-        has_some = bool(uploaded_submissions & upload_ids)
-        # pylint: disable=no-else-return
-        if has_all:
-            return StageState.COMPLETED
-        elif has_some:
-            return StageState.INCOMPLETE
-        else:
-            return StageState.NOT_STARTED
+    def get_external_group_statuses(self, groups):
+        """
+        Calculates external group statuses for multiple groups, fetching all groups' submissions in one bulk call.
+        :param collections.Iterable[group_project_v2.project_api.dtos.WorkgroupDetails] groups: workgroups
+        :rtype: dict[int, StageState]
+        """
+        upload_ids = set(submission.upload_id for submission in self.submissions)
+        group_ids = [group.id for group in groups]
+        submissions = self.project_api.get_latest_submissions_by_workgroup(group_ids, upload_ids)
+        return {
+            group_id: self._get_submissions_state(upload_ids, set(submissions.get(group_id, {}).keys()))
+            for group_id in group_ids
+        }
@@ -1,7 +1,8 @@
 import itertools
 import json
 import logging
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 import webob
 from lazy.lazy import lazy
@@ -9,8 +10,9 @@ from xblock.core import XBlock
 from xblock.fields import Boolean, Scope, String
 from xblock.validation import ValidationMessage
 
-from group_project_v2 import messages
+from group_project_v2 import api_tracing, messages, metrics
 from group_project_v2.api_error import ApiError
+from group_project_v2.project_api.api_implementation import BULK_REQUEST_WORKERS
 from group_project_v2.stage.base import BaseGroupActivityStage
 from group_project_v2.stage.utils import DISPLAY_NAME_HELP, DISPLAY_NAME_NAME, ReviewState, StageState
 from group_project_v2.stage_components import (
@@ -116,13 +118,44 @@ class ReviewBaseStage(BaseGroupActivityStage):
         :param collections.Iterable[dict] review_items: Review feedback items
         :rtype: ReviewState
         """
+        return self._calculate_review_status_from_keys(
+            review_subject_ids, self._convert_review_items_to_keys(review_items)
+        )
+
+    def _calculate_review_status_from_keys(self, review_subject_ids, review_item_keys):
         required_keys = self._make_required_keys(review_subject_ids)
-        review_item_keys = self._convert_review_items_to_keys(review_items)
         has_all = bool(required_keys) and review_item_keys >= required_keys
         has_some = bool(review_item_keys & required_keys)
 
         return self.REVIEW_STATE_CONDITIONS.get((has_some, has_all))
 
+    def _get_current_user_review_items(self, review_subject_ids):
+        """
+        Returns current user's review items for all the review subjects
+        :param list[int] review_subject_ids: Ids of review subjects (teammates or other groups)
+        :rtype: collections.Iterable[dict]
+        """
+        raise NotImplementedError(MUST_BE_OVERRIDDEN)
+
+    def get_review_states(self, review_subject_ids):
+        """
+        Calculates current user's review states for multiple review subjects, loading their review items once.
+        :param collections.Iterable[int] review_subject_ids: Ids of review subjects (teammates or other groups)
+        :rtype: dict[int, ReviewState]
+        """
+        review_subject_ids = list(review_subject_ids)
+        if not review_subject_ids:
+            return {}
+        # review item keys include review subject id, so each subject's status only depends on its own items
+        review_item_keys = self._convert_review_items_to_keys(self._get_current_user_review_items(review_subject_ids))
+        return {
+            review_subject_id: self._calculate_review_status_from_keys([review_subject_id], review_item_keys)
+            for review_subject_id in review_subject_ids
+        }
+
+    def get_review_state(self, review_subject_id):
+        return self.get_review_states([review_subject_id])[review_subject_id]
+
     def get_stage_state(self):
         review_status = self.review_status()
 
@@ -131,6 +164,58 @@ class ReviewBaseStage(BaseGroupActivityStage):
 
         return self.STAGE_STATE_REVIEW_STATE_MAPPING[review_status]
 
+    def _get_review_items_key(self, review_subject_ids):
+        """
+        Identifies current user's review items returned by _get_current_user_review_items, so that review stages of
+        the same activity load them once.
+        """
+        return self.activity_content_id, self.anonymous_student_id, tuple(sorted(review_subject_ids))
+
+    def _get_review_item_keys(self, review_subject_ids):
+        return self._convert_review_items_to_keys(self._get_current_user_review_items(review_subject_ids))
+
+    @classmethod
+    def get_stage_states(cls, stages):
+        """
+        Calculates current user's states for multiple review stages. Stages not visited yet or with nothing to review
+        are not started, and need no API calls. Review items are loaded once per activity; review items API works
+        per activity, so items of different activities are loaded concurrently (at most BULK_REQUEST_WORKERS requests
+        in flight). Calculated states are memoized.
+        :param collections.Iterable[ReviewBaseStage] stages: stages
+        :rtype: dict[str, StageState]
+        """
+        # pylint: disable=protected-access
+        stages = list(stages)
+        review_subject_ids, requests = [], OrderedDict()
+        for stage in stages:
+            if stage.is_stage_state_memoized:
+                continue
+            if not stage.visited or not stage.review_subjects:
+                stage.stage_state = StageState.NOT_STARTED
+                continue
+            subject_ids = [review_subject.id for review_subject in stage.review_subjects]
+            review_subject_ids.append((stage, subject_ids))
+            requests.setdefault(stage._get_review_items_key(subject_ids), (stage, subject_ids))
+
+        def load_keys(request):
+            stage, subject_ids = request
+            return stage._get_review_item_keys(subject_ids)
+
+        if len(requests) <= 1:
+            review_item_keys = [load_keys(request) for request in requests.values()]
+        else:
+            with ThreadPoolExecutor(max_workers=min(BULK_REQUEST_WORKERS, len(requests))) as executor:
+                load_keys = api_tracing.propagate_trace(metrics.propagate_request_counter(load_keys))
+                review_item_keys = list(executor.map(load_keys, requests.values()))
+        review_item_keys = dict(zip(requests.keys(), review_item_keys))
+
+        for stage, subject_ids in review_subject_ids:
+            review_status = stage._calculate_review_status_from_keys(
+                subject_ids, review_item_keys[stage._get_review_items_key(subject_ids)]
+            )
+            stage.stage_state = stage.STAGE_STATE_REVIEW_STATE_MAPPING[review_status]
+        return {str(stage.id): stage.stage_state for stage in stages}
+
     def _pivot_feedback(self, feedback):  # pylint: disable=no-self-use
         """
         Pivots the feedback to show question -> answer
@@ -257,11 +342,10 @@ class TeamEvaluationStage(ReviewBaseStage):
         review_items_by_user = self._get_reviews_by_user(review_items, user_id)
         return review_subjects_ids, review_items_by_user
 
-    def get_review_state(self, review_subject_id):
-        review_items = self.project_api.get_peer_review_items(
-            self.anonymous_student_id, review_subject_id, self.group_id, self.activity_content_id
-        )
-        return self._calculate_review_status([review_subject_id], review_items)
+    def _get_current_user_review_items(self, review_subject_ids):
+        # all teammates' review items come in one response, no matter how many teammates are reviewed
+        review_items = self.project_api.get_peer_review_items_for_group(self.group_id, self.activity_content_id)
+        return [item for item in review_items if item['reviewer'] == self.anonymous_student_id]
 
     @staticmethod
     @memoize_with_expiration()
@@ -428,11 +512,14 @@ class PeerReviewStage(ReviewBaseStage):
 
         return self._calculate_review_status(review_subjects_ids, review_items)
 
-    def get_review_state(self, review_subject_id):
-        review_items = self.project_api.get_workgroup_review_items(
-            self.anonymous_student_id, review_subject_id, self.activity_content_id
+    def _get_current_user_review_items(self, review_subject_ids):
+        # review items are only available per reviewed group
+        return itertools.chain.from_iterable(
+            self.project_api.get_workgroup_review_items(
+                self.anonymous_student_id, review_subject_id, self.activity_content_id
+            )
+            for review_subject_id in review_subject_ids
         )
-        return self._calculate_review_status([review_subject_id], review_items)
 
     def _get_ta_reviews(self, target_workgroup):
         review_items = self._get_review_items([target_workgroup], with_caching=True)
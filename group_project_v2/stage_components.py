@@ -1,3 +1,4 @@
+import functools
 import json
 import logging
 from collections import namedtuple
@@ -16,17 +17,20 @@ from xblock.fields import UNIQUE_ID, Boolean, Scope, String
 from xblock.validation import ValidationMessage
 from xblockutils.studio_editable import StudioEditableXBlockMixin, XBlockWithPreviewMixin
 
-from group_project_v2 import messages
+from group_project_v2 import messages, metrics
 from group_project_v2.api_error import ApiError
 from group_project_v2.mixins import (
+    ApiTracingXBlockMixin,
     CompletionMixin,
     NoStudioEditableSettingsMixin,
     UserAwareXBlockMixin,
+    UserIndependentXBlockMixin,
     WorkgroupAwareXBlockMixin,
     XBlockWithTranslationServiceMixin,
 )
 from group_project_v2.project_api import ProjectAPIXBlockMixin
 from group_project_v2.project_navigator import ResourcesViewXBlock, SubmissionsViewXBlock
+from group_project_v2.tasks import get_task_executor
 from group_project_v2.upload_file import UploadFile
 from group_project_v2.utils import (
     MUST_BE_OVERRIDDEN,
@@ -41,6 +45,7 @@ from group_project_v2.utils import gettext as _
 from group_project_v2.utils import (
     groupwork_protected_view,
     loader,
+    make_key,
     make_s3_link_temporary,
     make_user_caption,
     mean,
@@ -49,9 +54,52 @@ from group_project_v2.utils import (
 
 log = logging.getLogger(__name__)
 
+QUESTION_MARKUP_CACHE_SIZE = 2048
+
+
+@functools.lru_cache(maxsize=QUESTION_MARKUP_CACHE_SIZE)
+def render_question_markup(question_id, question_content, closed, single_line):
+    """
+    Compiles review question content XML into answer control HTML.
+
+    Output depends only on the arguments, so it is cached: review pages render each question once per review
+    subject, and the same questions are rendered for all reviewers.
+
+    :param str question_id: question id
+    :param str question_content: question content XML
+    :param bool closed: if True, answer control is disabled
+    :param bool single_line: if True, answer control is displayed next to question label
+    :rtype: str
+    """
+    try:
+        answer_node = ElementTree.fromstring(question_content)
+    except ElementTree.ParseError:
+        log.exception(
+            "Exception when parsing question content for question %s. Content is [%s].", question_id, question_content
+        )
+        return ""
+
+    answer_node.set('name', question_id)
+    answer_node.set('id', question_id)
+    current_class = answer_node.get('class')
+    answer_classes = ['answer']
+    if current_class:
+        answer_classes.append(current_class)
+    if single_line:
+        answer_classes.append('side')
+    if closed:
+        answer_node.set('disabled', 'disabled')
+    else:
+        answer_classes.append('editable')
+    answer_node.set('class', ' '.join(answer_classes))
+
+    return outer_html(answer_node)
+
 
 @XBlock.needs("i18n")
-class BaseStageComponentXBlock(CompletionMixin, XBlock, XBlockWithTranslationServiceMixin, I18NService):
+class BaseStageComponentXBlock(
+        ApiTracingXBlockMixin, CompletionMixin, XBlock, XBlockWithTranslationServiceMixin, I18NService
+):
     @lazy
     def stage(self):
         """
@@ -404,7 +452,11 @@ class GroupProjectSubmissionXBlock(
                     )
                 }
 
-                self.stage.check_submissions_and_mark_complete()
+                # stage state is computed from submissions, so marking completion can happen in background
+                get_task_executor().apply_async(
+                    self.stage.check_submissions_and_mark_complete,
+                    task_id=self._get_task_id('mark_complete', uploaded_file),
+                )
                 response_data["new_stage_states"] = [self.stage.get_new_stage_state_data()]
 
                 response_data['user_label'] = self.project_api.get_user_details(target_activity.user_id).user_label
@@ -430,41 +482,58 @@ class GroupProjectSubmissionXBlock(
 
         return response
 
+    def _get_task_id(self, task_name, uploaded_file):
+        return u"{task}:{usage_id}:{submission_id}".format(
+            task=task_name, usage_id=self.scope_ids.usage_id, submission_id=uploaded_file.submission_id,
+        )
+
+    def _publish_submission_received(self, activity, uploaded_file):
+        self.runtime.publish(
+            self,
+            self.SUBMISSION_RECEIVED_EVENT,
+            {
+                "submission_id": uploaded_file.submission_id,
+                "filename": uploaded_file.file.name,
+                "content_id": activity.content_id,
+                "group_id": activity.workgroup.id,
+                "user_id": activity.user_id,
+            }
+        )
+
     def persist_and_submit_file(self, activity, context, file_stream):
         """
-        Saves uploaded files to their permanent location, sends them to submissions backend and emits submission events
+        Saves uploaded files to their permanent location and sends them to submissions backend. Submission events and
+        notifications are emitted by background task executor.
         """
         uploaded_file = UploadFile(file_stream, self.upload_id, context)
 
-        # Save the files first
-        try:
-            uploaded_file.save_file()
-        except Exception as save_file_error:  # pylint: disable=broad-except
-            original_message = save_file_error.message if hasattr(save_file_error, "message") else ""
-            save_file_error.message = _("Error storing file {} - {}").format(uploaded_file.file.name, original_message)
-            raise
+        with metrics.measured_upload(file_stream):
+            # Save the files first
+            try:
+                uploaded_file.save_file()
+            except Exception as save_file_error:  # pylint: disable=broad-except
+                original_message = save_file_error.message if hasattr(save_file_error, "message") else ""
+                save_file_error.message = _("Error storing file {} - {}").format(
+                    uploaded_file.file.name, original_message
+                )
+                raise
 
-        # It have been saved... note the submission
-        try:
-            uploaded_file.submit()
-            # Emit analytics event...
-            self.runtime.publish(
-                self,
-                self.SUBMISSION_RECEIVED_EVENT,
-                {
-                    "submission_id": uploaded_file.submission_id,
-                    "filename": uploaded_file.file.name,
-                    "content_id": activity.content_id,
-                    "group_id": activity.workgroup.id,
-                    "user_id": activity.user_id,
-                }
-            )
-        except Exception as save_record_error:  # pylint: disable=broad-except
-            original_message = save_record_error.message if hasattr(save_record_error, "message") else ""
-            save_record_error.message = _("Error recording file information {} - {}").format(
-                uploaded_file.file.name, original_message
-            )
-            raise
+            # It have been saved... note the submission
+            try:
+                uploaded_file.submit()
+            except Exception as save_record_error:  # pylint: disable=broad-except
+                original_message = save_record_error.message if hasattr(save_record_error, "message") else ""
+                save_record_error.message = _("Error recording file information {} - {}").format(
+                    uploaded_file.file.name, original_message
+                )
+                raise
+
+        executor = get_task_executor()
+        # Emit analytics event...
+        executor.apply_async(
+            self._publish_submission_received, args=(activity, uploaded_file),
+            task_id=self._get_task_id(self.SUBMISSION_RECEIVED_EVENT, uploaded_file),
+        )
 
         # See if the xBlock Notification Service is available, and - if so -
         # dispatch a notification to the entire workgroup that a file has been uploaded
@@ -472,7 +541,10 @@ class GroupProjectSubmissionXBlock(
         # in the list of services
         notifications_service = self.runtime.service(self, 'notifications')
         if notifications_service:
-            self.stage.fire_file_upload_notification(notifications_service)
+            executor.apply_async(
+                self.stage.fire_file_upload_notification, args=(notifications_service,),
+                task_id=self._get_task_id('file_upload_notification', uploaded_file),
+            )
 
         return uploaded_file
 
@@ -487,10 +559,7 @@ class ReviewSubjectSeletorXBlockBase(BaseStageComponentXBlock, XBlockWithPreview
 
     @XBlock.handler
     def get_statuses(self, _request, _suffix=''):
-        response_data = {
-            review_subject.id: self.stage.get_review_state(review_subject.id)
-            for review_subject in self.review_subjects
-        }
+        response_data = self.stage.get_review_states([review_subject.id for review_subject in self.review_subjects])
         return webob.response.Response(body=json.dumps(response_data))
 
     def student_view(self, context):
@@ -568,7 +637,9 @@ class GroupSelectorXBlock(ReviewSubjectSeletorXBlockBase):
         return self.student_view(render_context)
 
 
-class GroupProjectReviewQuestionXBlock(BaseStageComponentXBlock, StudioEditableXBlockMixin, XBlockWithPreviewMixin):
+class GroupProjectReviewQuestionXBlock(
+        BaseStageComponentXBlock, StudioEditableXBlockMixin, XBlockWithPreviewMixin, UserIndependentXBlockMixin
+):
     CATEGORY = "gp-v2-review-question"
     STUDIO_LABEL = _(u"Review Question")
 
@@ -642,30 +713,16 @@ class GroupProjectReviewQuestionXBlock(BaseStageComponentXBlock, StudioEditableX
     def stage(self):
         return self.get_parent()
 
+    def get_fragment_cache_version(self):
+        # answer controls are disabled once the stage is closed
+        return make_key(
+            super(GroupProjectReviewQuestionXBlock, self).get_fragment_cache_version(), bool(self.stage.is_closed)
+        )
+
     def render_content(self):
-        try:
-            answer_node = ElementTree.fromstring(self.question_content)
-        except ElementTree.ParseError:
-            message_tpl = "Exception when parsing question content for question {question_id}. Content is [{content}]."
-            message_tpl.format(question_id=self.question_id, content=self.question_content)
-            log.exception(message_tpl)
-            return ""
-
-        answer_node.set('name', self.question_id)
-        answer_node.set('id', self.question_id)
-        current_class = answer_node.get('class')
-        answer_classes = ['answer']
-        if current_class:
-            answer_classes.append(current_class)
-        if self.single_line:
-            answer_classes.append('side')
-        if self.stage.is_closed:
-            answer_node.set('disabled', 'disabled')
-        else:
-            answer_classes.append('editable')
-        answer_node.set('class', ' '.join(answer_classes))
-
-        return outer_html(answer_node)
+        return render_question_markup(
+            self.question_id, self.question_content, bool(self.stage.is_closed), bool(self.single_line)
+        )
 
     def student_view(self, context):
         question_classes = ["question"]
@@ -865,13 +922,9 @@ class ProjectTeamXBlock(
 
     def student_view(self, context):
         fragment = Fragment()
-        # Could be a TA not in the group.
-        if self.stage.is_group_member:
-            user_details = [self.stage.project_api.get_member_data(self.stage.user_id)]
-        else:
-            user_details = []
         render_context = {
-            'team_members': user_details + self.stage.team_members,
+            # Could be a TA not in the group - then there are no team members to show
+            'team_members': self.stage.get_team_members_data(include_current_user=True),
             'course_id': self.stage.course_id,
             'group_id': self.stage.workgroup.id
         }
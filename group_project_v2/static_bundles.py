@@ -0,0 +1,162 @@
+"""
+Build-time pipeline for static resources (CSS and JS under ``public``) and render-time lookup of its output.
+
+``build_bundles`` writes a minified copy of each resource to ``public/bundles``, with a hash of its content in the
+file name, and a manifest mapping resource paths to bundle paths. When the manifest is present, ``add_resource``
+references bundles by URL instead of inlining resources into fragments. Bundle names change whenever their content
+changes, so bundles can be served with far-future cache headers.
+"""
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+
+import pkg_resources
+from django.conf import settings
+
+try:
+    import rcssmin  # pylint: disable=import-error
+except ImportError:
+    # minifiers are optional - a simple built-in CSS minifier is used and JS is bundled as is without them
+    rcssmin = None
+
+try:
+    import rjsmin  # pylint: disable=import-error
+except ImportError:
+    rjsmin = None
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIRS = ('public/css', 'public/js')
+BUNDLES_DIR = 'public/bundles'
+MANIFEST_PATH = BUNDLES_DIR + '/manifest.json'
+HASH_LENGTH = 12
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_WHITESPACE_RE = re.compile(r'\s+')
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+_manifest = None  # pylint: disable=invalid-name
+
+
+def minify_css(content):
+    if rcssmin is not None:
+        return rcssmin.cssmin(content)
+    content = CSS_COMMENT_RE.sub('', content)
+    content = CSS_WHITESPACE_RE.sub(' ', content)
+    return CSS_PUNCTUATION_RE.sub(r'\1', content).replace(';}', '}').strip()
+
+
+def minify_js(content):
+    if rjsmin is not None:
+        return rjsmin.jsmin(content)
+    return content
+
+
+def rebase_css_urls(content, source_path, bundle_path):
+    """
+    Rewrites relative url(...) references in CSS so that they keep pointing to the same files from bundle location
+    """
+    source_dir, bundle_dir = posixpath.dirname(source_path), posixpath.dirname(bundle_path)
+
+    def rebase(match):
+        quote, url = match.groups()
+        if url.startswith(('/', '#', 'data:')) or '://' in url:
+            return match.group(0)
+        rebased = posixpath.relpath(posixpath.join(source_dir, url), bundle_dir)
+        return 'url({quote}{url}{quote})'.format(quote=quote, url=rebased)
+
+    return CSS_URL_RE.sub(rebase, content)
+
+
+def get_bundle_path(source_path, content):
+    """
+    :param str source_path: resource path relative to package, e.g. public/js/group_project.js
+    :param str content: bundle content
+    :return: bundle path relative to package, e.g. public/bundles/js/group_project.0123456789ab.js
+    :rtype: str
+    """
+    content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+    name, extension = posixpath.splitext(posixpath.relpath(source_path, 'public'))
+    return posixpath.join(BUNDLES_DIR, "{}.{}{}".format(name, content_hash, extension))
+
+
+def find_sources(package_dir=PACKAGE_DIR):
+    """
+    Yields paths (relative to package) of all CSS and JS resources
+    """
+    for source_dir in SOURCE_DIRS:
+        for dirname, _subdirs, files in os.walk(os.path.join(package_dir, source_dir)):
+            for file_name in sorted(files):
+                if file_name.endswith(('.css', '.js')):
+                    yield posixpath.relpath(
+                        os.path.join(dirname, file_name).replace(os.sep, '/'), package_dir.replace(os.sep, '/')
+                    )
+
+
+def build_bundles(package_dir=PACKAGE_DIR, minify=True):
+    """
+    Replaces contents of bundles directory with bundles of all CSS and JS resources and writes the manifest.
+
+    :param str package_dir: package root
+    :param bool minify: minify bundles
+    :return: manifest - bundle paths by resource paths
+    :rtype: dict[str, str]
+    """
+    bundles_dir = os.path.join(package_dir, BUNDLES_DIR)
+    if os.path.isdir(bundles_dir):
+        shutil.rmtree(bundles_dir)
+
+    manifest = {}
+    for source_path in sorted(find_sources(package_dir)):
+        with open(os.path.join(package_dir, source_path), encoding='utf-8') as source_file:
+            content = source_file.read()
+        if source_path.endswith('.css'):
+            content = minify_css(content) if minify else content
+            # rebased urls are stable regardless of content hash, as bundle directory mirrors resource directory
+            content = rebase_css_urls(content, source_path, get_bundle_path(source_path, ''))
+        elif minify:
+            content = minify_js(content)
+
+        bundle_path = get_bundle_path(source_path, content)
+        target = os.path.join(package_dir, bundle_path)
+        if not os.path.isdir(os.path.dirname(target)):
+            os.makedirs(os.path.dirname(target))
+        with open(target, 'w', encoding='utf-8') as bundle_file:
+            bundle_file.write(content)
+        manifest[source_path] = bundle_path
+
+    with open(os.path.join(package_dir, MANIFEST_PATH), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    return manifest
+
+
+def get_bundle_manifest():
+    """
+    Returns manifest written by ``build_bundles``, or empty dict if bundles have not been built. Loaded once per
+    process.
+
+    :rtype: dict[str, str]
+    """
+    global _manifest  # pylint: disable=global-statement
+    if _manifest is None:
+        try:
+            _manifest = json.loads(pkg_resources.resource_string(__name__, MANIFEST_PATH).decode('utf-8'))
+        except (IOError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def get_bundled_path(path):
+    """
+    Returns path of bundle built from the resource, or None if there is no bundle or bundles are disabled with
+    ``GROUP_PROJECT_V2_STATIC_BUNDLES`` Django setting.
+
+    :param str path: resource path relative to package
+    :rtype: str|None
+    """
+    if not getattr(settings, 'GROUP_PROJECT_V2_STATIC_BUNDLES', True):
+        return None
+    return get_bundle_manifest().get(path)
@@ -0,0 +1,150 @@
+"""
+Background execution of side effects that do not need to block the user-facing request.
+
+Executors expose a Celery-compatible ``apply_async(func, args=(), kwargs=None, task_id=None)`` method, so a
+deployment can route tasks to Celery (or any other queue) by pointing ``GROUP_PROJECT_V2_TASK_EXECUTOR`` at an
+object implementing the same interface. ``task_id`` doubles as an idempotency key: a task submitted with a
+``task_id`` that has already been accepted is dropped.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from group_project_v2.utils import MUST_BE_OVERRIDDEN
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 0.5  # seconds, doubled after each attempt
+IDEMPOTENCY_KEYS_LIMIT = 10000
+
+
+class BaseTaskExecutor(object):
+    """
+    Runs callables, dropping duplicate submissions of the same ``task_id``.
+    """
+    def __init__(self):
+        self._seen_task_ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _claim_task_id(self, task_id):
+        """
+        Records task_id as accepted. Returns False if a task with the same id has already been accepted.
+        """
+        if task_id is None:
+            return True
+
+        with self._lock:
+            if task_id in self._seen_task_ids:
+                return False
+            self._seen_task_ids[task_id] = True
+            while len(self._seen_task_ids) > IDEMPOTENCY_KEYS_LIMIT:
+                self._seen_task_ids.popitem(last=False)
+        return True
+
+    @staticmethod
+    def _run_once(func, args, kwargs, task_id):
+        try:
+            return func(*args, **kwargs)
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Task %s (%s) failed", task_id, func)
+            return None
+
+    def apply_async(self, func, args=(), kwargs=None, task_id=None):
+        """
+        Schedules func(*args, **kwargs) for execution.
+
+        :param callable func: task to run
+        :param tuple args: positional arguments
+        :param dict kwargs: keyword arguments
+        :param str task_id: optional idempotency key
+        :returns: True if task was accepted, False if it was dropped as a duplicate
+        :rtype: bool
+        """
+        if not self._claim_task_id(task_id):
+            log.debug("Task %s has already been scheduled, skipping", task_id)
+            return False
+        self._dispatch(func, tuple(args), dict(kwargs or {}), task_id)
+        return True
+
+    def _dispatch(self, func, args, kwargs, task_id):
+        raise NotImplementedError(MUST_BE_OVERRIDDEN)
+
+
+class ImmediateTaskExecutor(BaseTaskExecutor):
+    """
+    Runs tasks synchronously in the calling thread, so tasks still have access to request-bound runtime services
+    (event tracker, notifications). This is the default executor.
+
+    Failed tasks are logged and not retried - retry backoff would block the user-facing request.
+    """
+    def _dispatch(self, func, args, kwargs, task_id):
+        self._run_once(func, args, kwargs, task_id)
+
+
+class ThreadPoolTaskExecutor(BaseTaskExecutor):
+    """
+    Runs tasks in an in-process thread pool, retrying failed tasks with exponential backoff.
+
+    Tasks run after the request has returned, so this executor is only suitable for runtimes whose services do not
+    depend on request context.
+    """
+    def __init__(
+            self, max_workers=DEFAULT_MAX_WORKERS, max_retries=DEFAULT_MAX_RETRIES, retry_backoff=DEFAULT_RETRY_BACKOFF
+    ):
+        super(ThreadPoolTaskExecutor, self).__init__()
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='group_project_v2_task')
+
+    def _run_with_retries(self, func, args, kwargs, task_id):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except Exception:  # pylint: disable=broad-except
+                if attempt >= self.max_retries:
+                    log.exception("Task %s (%s) failed after %s attempts", task_id, func, attempt + 1)
+                    return None
+                log.warning("Task %s (%s) failed, retrying", task_id, func, exc_info=True)
+                if self.retry_backoff:
+                    time.sleep(self.retry_backoff * (2 ** attempt))
+        return None
+
+    def _run_in_worker(self, func, args, kwargs, task_id):
+        try:
+            return self._run_with_retries(func, args, kwargs, task_id)
+        finally:
+            # worker threads hold their own DB connections - make sure they don't go stale or leak
+            close_old_connections()
+
+    def _dispatch(self, func, args, kwargs, task_id):
+        self._pool.submit(self._run_in_worker, func, args, kwargs, task_id)
+
+
+_executor = None  # pylint: disable=invalid-name
+_executor_lock = threading.Lock()
+
+
+def get_task_executor():
+    """
+    Returns task executor configured via ``GROUP_PROJECT_V2_TASK_EXECUTOR`` Django setting (dotted path to executor
+    class), defaulting to running tasks synchronously.
+
+    :rtype: BaseTaskExecutor
+    """
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                executor_path = getattr(
+                    settings, 'GROUP_PROJECT_V2_TASK_EXECUTOR', 'group_project_v2.tasks.ImmediateTaskExecutor'
+                )
+                _executor = import_string(executor_path)()
+    return _executor
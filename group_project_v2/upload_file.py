@@ -1,13 +1,23 @@
 import hashlib
+import json
 import logging
 import mimetypes
+import uuid
 
 from django.conf import settings
 from django.core.files import File
+from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
+from django.utils.text import get_valid_filename
 from lazy.lazy import lazy
 
-from group_project_v2.utils import get_storage
+from group_project_v2.utils import (
+    SUBMISSION_BLOB_NAME,
+    SUBMISSION_BLOBS_ROOT,
+    SUBMISSION_LEASES_ROOT,
+    SUBMISSION_REFS_ROOT,
+    get_storage,
+)
 
 log = logging.getLogger(__name__)
 
@@ -70,13 +80,35 @@ class UploadFile(object):
 
         return location
 
-    @property
+    @staticmethod
+    def blob_directory(sha1):
+        return "{}/{}".format(SUBMISSION_BLOBS_ROOT, sha1)
+
+    @staticmethod
+    def ref_path(group_id, submission_id):
+        return "{}/{}/{}".format(SUBMISSION_REFS_ROOT, group_id, get_valid_filename(str(submission_id)))
+
+    @staticmethod
+    def lease_directory(sha1):
+        return "{}/{}".format(SUBMISSION_LEASES_ROOT, sha1)
+
+    @lazy
     def file_storage_path(self):
-        return "group_work/{}/{}/{}".format(self.group_id, self.sha1, self.file.name)
+        return "{}/{}".format(self.blob_directory(self.sha1), SUBMISSION_BLOB_NAME)
+
+    def take_lease(self):
+        """
+        Marks blob of this file as in use, so that garbage collection does not remove it (even if it was stored long
+        ago by other upload and is not referenced anymore) before the ref to it is written. Leases are removed by
+        garbage collection once they are older than its grace period.
+        """
+        lease_path = "{}/{}".format(self.lease_directory(self.sha1), uuid.uuid4().hex)
+        self.storage.save(lease_path, ContentFile(self.ref_path(self.group_id, self.submission_id).encode('utf-8')))
 
     def save_file(self):
         path = self.file_storage_path
 
+        self.take_lease()
         if not self.storage.exists(path):
             log.debug("Storing to %s", path)
             self.storage.save(path, File(self.file))
@@ -84,6 +116,17 @@ class UploadFile(object):
         else:
             log.debug("File already stored at %s", path)
 
+    def update_ref(self):
+        """
+        Points (workgroup, upload id) reference to the blob of this file, marking it as in use by latest submission.
+        Ref also records the name the file was submitted with, as blob is shared between all uploads of its contents.
+        """
+        ref_path = self.ref_path(self.group_id, self.submission_id)
+        if self.storage.exists(ref_path):
+            self.storage.delete(ref_path)
+        ref = {'blob': self.file_storage_path, 'filename': self.file.name}
+        self.storage.save(ref_path, ContentFile(json.dumps(ref).encode('utf-8')))
+
     def submit(self):
         submit_hash = {
             "document_id": self.submission_id,
@@ -94,3 +137,4 @@ class UploadFile(object):
             "workgroup": self.group_id,
         }
         self.project_api.create_submission(submit_hash)
+        self.update_ref()
@@ -2,9 +2,15 @@
 import csv
 import functools
 import logging
+import mimetypes
+import re
+import threading
+import unicodedata
 import urllib.parse
 import xml.etree.ElementTree as ET
-from collections import namedtuple
+import zipfile
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 
 import boto3
@@ -18,14 +24,35 @@ from storages.backends.s3boto import S3BotoStorage
 from web_fragments.fragment import Fragment
 from xblockutils.resources import ResourceLoader
 
+from group_project_v2 import api_cache, api_tracing, metrics
+from group_project_v2.circuit_breaker import CircuitOpenError
+from group_project_v2.static_bundles import get_bundled_path
+
 DEFAULT_EXPIRATION_TIME = timedelta(seconds=10)
 
+# Max number of concurrent background refreshes of memoized values served stale - see memoize_with_expiration
+REFRESH_WORKERS = 4
+
 S3_FILE_URL_TIMEOUT = 60 * 30
 
+# Content-addressed submission storage: file contents are stored once per sha1 under SUBMISSION_BLOBS_ROOT, and
+# SUBMISSION_REFS_ROOT holds a small file per (workgroup, upload id) pointing to the blob of the latest submission.
+# Uploads take a lease on the blob under SUBMISSION_LEASES_ROOT before storing or reusing it, so that garbage
+# collection does not remove it before the ref is written.
+SUBMISSION_BLOBS_ROOT = "group_work/blobs"
+SUBMISSION_REFS_ROOT = "group_work/refs"
+SUBMISSION_LEASES_ROOT = "group_work/leases"
+# Blobs are shared between uploads under different names, so they are stored under a fixed name; submitted file name
+# is recorded in the ref and in the submission itself
+SUBMISSION_BLOB_NAME = "content"
+
 
 log = logging.getLogger(__name__)
 loader = ResourceLoader(__name__)
 
+_refresh_executor = None  # pylint: disable=invalid-name
+_refresh_executor_lock = threading.Lock()
+
 
 # Make '_' a no-op so we can scrape strings
 def gettext(text):
@@ -73,6 +100,7 @@ class Constants(object):
     TARGET_STUDENTS = 'target_students'
     TARGET_WORKGROUPS = 'target_workgroups'
     FILTERED_STUDENTS = "filtered_students"
+    STAGE_STATES = "stage_states"
 
 
 class HtmlXBlockShim(object):
@@ -240,19 +268,24 @@ def get_default_stage(stages):
     if not stages:
         return None
 
-    if all(not stage.is_open for stage in stages):
+    # single pass in stage order - completion is only calculated for available stages up to the first incomplete one
+    any_open, all_closed, last_available = False, True, None
+    for stage in stages:
+        is_open, is_closed = stage.is_open, stage.is_closed
+        any_open = any_open or is_open
+        all_closed = all_closed and is_closed
+        if is_open and not is_closed:
+            if not stage.completed:
+                return stage
+            last_available = stage
+
+    if not any_open:
         return stages[0]
 
-    if all(stage.is_closed for stage in stages):
+    if all_closed:
         return stages[-1]
 
-    available_stages = [stage for stage in stages if stage.available_now]
-    try:
-        return next(stage for stage in available_stages if not stage.completed)
-    except StopIteration:
-        pass
-
-    return available_stages[-1]
+    return last_available
 
 
 def get_link_to_block(block):
@@ -262,15 +295,39 @@ def get_link_to_block(block):
     )
 
 
-def memoize_with_expiration(expires_after=DEFAULT_EXPIRATION_TIME):
+def _get_refresh_executor():
+    global _refresh_executor  # pylint: disable=global-statement
+    if _refresh_executor is None:
+        with _refresh_executor_lock:
+            if _refresh_executor is None:
+                _refresh_executor = ThreadPoolExecutor(
+                    max_workers=REFRESH_WORKERS, thread_name_prefix='group-project-v2-cache-refresh'
+                )
+    return _refresh_executor
+
+
+def memoize_with_expiration(expires_after=DEFAULT_EXPIRATION_TIME, stale_while_revalidate=None):
     """
-    This memoization decorator provides lightweight caching mechanism. It is not thread-safe and contain
-    no cache invalidation features except cache expiration - use only on data that are unlikely to be changed
-    within single request (i.e. workgroup and user data, assigned reviews, etc.)
+    This memoization decorator provides lightweight caching mechanism. It can be called from several threads (bulk API
+    methods and background refreshes do so): cache entries are only ever replaced as a whole, but concurrent calls
+    missing the same key might each call the function. It contains no cache invalidation features except cache
+    expiration - use only on data that are unlikely to be changed within single request (i.e. workgroup and user data,
+    assigned reviews, etc.)
+    Expired values are served while project API circuit is open (see circuit_breaker).
+    Values are shared between processes if shared cache backend is configured (see api_cache).
+    Expired values built from a single API response with ETag or Last-Modified header are revalidated with a
+    conditional request (see api_cache) - functions using them must not make API requests in other threads.
     :param timedelta expires_after: Caching period
+    :param timedelta stale_while_revalidate: For how long after expiration cached value is still returned, while it is
+        refreshed in background (at most one refresh per key at a time). Values older than
+        ``expires_after + stale_while_revalidate`` are refreshed before being returned. Defaults to None - expired
+        values are always refreshed before being returned. Do not use for data access checks depend on.
     """
+    shared_timeout = expires_after + (stale_while_revalidate or timedelta(0))
+
     def decorator(func):
-        cache = func.cache = {}
+        entries = api_cache.MemoizedEntries(func, expires_after, shared_timeout)
+        func.cache = entries.cache
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
@@ -280,21 +337,78 @@ def memoize_with_expiration(expires_after=DEFAULT_EXPIRATION_TIME):
                 )
             )
             key = make_key(key_list)
-            if key not in cache or cache[key]['timestamp'] + expires_after <= datetime.now():
-                result = func(*args, **kwargs)
-                log.info("Updating cached value for key %s", key)
-                cache[key] = {
-                    'timestamp': datetime.now(),
-                    'result': result
-                }
-
-            return cache[key]['result']
+            api_cache.record_memoized_call()
+            entry = entries.cache.get(key)
+            now = datetime.now()
+            if entry is not None and entry['timestamp'] + expires_after > now:
+                metrics.observe_cache_lookup(func.__name__, hit=True)
+                api_tracing.record_cache_hit(func.__name__)
+            elif entry is not None and stale_while_revalidate is not None and \
+                    entry['timestamp'] + expires_after + stale_while_revalidate > now:
+                metrics.observe_cache_lookup(func.__name__, hit=True)
+                api_tracing.record_cache_hit(func.__name__)
+                if entries.start_refresh(key):
+                    _get_refresh_executor().submit(entries.refresh, key, args, kwargs)
+            else:
+                metrics.observe_cache_lookup(func.__name__, hit=False)
+                try:
+                    entry = entries.load(key, args, kwargs, entry)
+                except CircuitOpenError:
+                    if entry is None:
+                        raise
+                    log.warning("API circuit is open, serving stale cached value for key %s", key)
+                    metrics.API_CIRCUIT_STALE_RESULTS.inc(cache=func.__name__)
+
+            return entry['result']
 
         return wrapper
 
     return decorator
 
 
+class FragmentCache(object):
+    """
+    Thread-safe in-process LRU cache of rendered fragments with expiration. Fragments are stored serialized, so each
+    `get` returns a new Fragment instance that can be modified (e.g. have resources added) without affecting the cache.
+    """
+    def __init__(self, max_size=1000, expires_after=timedelta(minutes=5), name='fragments'):
+        self.name = name
+        self.max_size = max_size
+        self.expires_after = expires_after
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :rtype: Fragment|None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['timestamp'] + self.expires_after <= datetime.now():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                metrics.observe_cache_lookup(self.name, hit=False)
+                return None
+            self._entries.move_to_end(key)
+        metrics.observe_cache_lookup(self.name, hit=True)
+        return Fragment.from_dict(entry['fragment'])
+
+    def set(self, key, fragment):
+        with self._lock:
+            self._entries[key] = {'timestamp': datetime.now(), 'fragment': fragment.to_dict()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fragment_cache = FragmentCache()  # pylint: disable=invalid-name
+
+
 def make_user_caption(user_details):
     context = {
         'id': user_details.id,
@@ -330,6 +444,10 @@ class FieldValuesContextManager(object):
 
 
 def add_resource(block, resource_type, path, fragment, via_url=False):
+    bundled_path = get_bundled_path(path)
+    if bundled_path:
+        path, via_url = bundled_path, True
+
     if via_url:
         action = fragment.add_javascript_url if resource_type == 'javascript' else fragment.add_css_url
         action_parameter = block.runtime.local_resource_url(block, path)
@@ -375,6 +493,80 @@ def export_to_csv(data, target, headers=None):
         writer.writerow(row)
 
 
+class _ZipStreamBuffer(object):
+    """
+    Write-only, non-seekable file-like object collecting bytes written by ZipFile until they are drained
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+ZIP_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def stream_zip_archive(entries, chunk_size=ZIP_STREAM_CHUNK_SIZE):
+    """
+    Builds ZIP archive on the fly, yielding archive bytes as soon as they are produced, so that memory use does not
+    depend on number or size of archived files.
+
+    :param collections.Iterable[(str, callable, datetime)] entries:
+        (name in archive, callable returning opened binary file-like object, modification time) tuples.
+        Files are opened one at a time, only when they are archived.
+        Files that can't be opened are logged and skipped.
+    :param int chunk_size: size of chunks read from source files
+    :rtype: collections.Iterator[bytes]
+    """
+    buffer = _ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        for name, open_file, modified in entries:
+            try:
+                source = open_file()
+            except Exception as exc:  # pylint: disable=broad-except
+                log.exception(exc)
+                continue
+
+            info = zipfile.ZipInfo(name, date_time=modified.timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with source, archive.open(info, mode='w', force_zip64=True) as target:
+                for chunk in iter(lambda: source.read(chunk_size), b''):  # pylint: disable=cell-var-from-loop
+                    target.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            data = buffer.drain()
+            if data:
+                yield data
+    yield buffer.drain()
+
+
+def make_content_disposition(filename, disposition='attachment'):
+    """
+    Builds Content-Disposition header value for a file name that might contain quotes or non-ASCII characters (RFC
+    6266): ASCII-only `filename` for old clients, followed by UTF-8 `filename*`.
+
+    :param str filename: file name
+    :param str disposition: `attachment` or `inline`
+    :rtype: str
+    """
+    ascii_filename = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+    ascii_filename = re.sub(r'["\\\x00-\x1f\x7f]', '_', ascii_filename)
+    return u"{disposition}; filename=\"{ascii_filename}\"; filename*=UTF-8''{filename}".format(
+        disposition=disposition, ascii_filename=ascii_filename, filename=urllib.parse.quote(filename, safe='')
+    )
+
+
 def named_tuple_with_docstring(type_name, field_names, docstring, rename=False):
     named_tuple_type = namedtuple(type_name + "_", field_names, rename=rename)
 
@@ -410,6 +602,37 @@ class PrivateMediaStorage(S3BotoStorage):
         )
 
 
+def get_blob_key_from_url(file_url):
+    """
+    Extracts storage key of a content-addressed submission blob from its URL.
+
+    :param str file_url: submission document URL
+    :return: storage key, or None if URL does not point to a submission blob (i.e. legacy per-group location)
+    :rtype: str | None
+    """
+    path = urllib.parse.unquote(urllib.parse.urlparse(file_url).path)
+    index = path.find(SUBMISSION_BLOBS_ROOT + "/")
+    if index == -1:
+        return None
+    return path[index:]
+
+
+def get_submission_storage_key(submission_data):
+    """
+    Gets storage key of submitted file
+
+    :param dict submission_data: submission, as returned by Project API
+    :rtype: str
+    """
+    document_url = submission_data['document_url']
+    blob_key = get_blob_key_from_url(document_url)
+    if blob_key is not None:
+        return blob_key
+    return "group_work/{}/{}/{}".format(
+        submission_data.get('workgroup'), document_url.split('/')[-2], submission_data['document_filename']
+    )
+
+
 def make_s3_link_temporary(group_id, file_sha1, file_name, file_url):
     """
     It will pre-sign url so that it can be accessible for limited time period
@@ -428,17 +651,26 @@ def make_s3_link_temporary(group_id, file_sha1, file_name, file_url):
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
         )
+        params = {
+            'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
+            'Key': "group_work/{}/{}/{}".format(
+                group_id,
+                file_sha1,
+                file_name
+            )
+        }
+        blob_key = get_blob_key_from_url(file_url)
+        if blob_key is not None:
+            params['Key'] = blob_key
+            # blobs are stored under a fixed name - make sure it is downloaded under the name it was submitted with
+            params['ResponseContentDisposition'] = "inline; filename*=UTF-8''{}".format(urllib.parse.quote(file_name))
+            content_type = mimetypes.guess_type(file_name)[0]
+            if content_type:
+                params['ResponseContentType'] = content_type
         signed_url = s3_client.generate_presigned_url(
             ClientMethod='get_object',
             ExpiresIn=S3_FILE_URL_TIMEOUT,
-            Params={
-                'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
-                'Key': "group_work/{}/{}/{}".format(
-                    group_id,
-                    file_sha1,
-                    file_name
-                )
-            }
+            Params=params
         )
         return signed_url
     return file_url
@@ -0,0 +1,79 @@
+"""
+Compares storage usage and upload time of content-addressed submission storage against legacy per-group layout.
+
+Run with ``pytest -s tests/benchmarks/bench_content_addressed_storage.py``. Cohort size and file size can be adjusted
+via ``BENCH_GROUPS``, ``BENCH_REUPLOADS`` and ``BENCH_FILE_SIZE`` environment variables.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import mock
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from group_project_v2.upload_file import UploadFile
+
+GROUPS = int(os.environ.get('BENCH_GROUPS', 50))
+REUPLOADS = int(os.environ.get('BENCH_REUPLOADS', 3))
+FILE_SIZE = int(os.environ.get('BENCH_FILE_SIZE', 1024 * 1024))
+
+
+class LegacyUploadFile(UploadFile):
+    """ Per-group storage layout used before content-addressed storage was introduced """
+    @property
+    def file_storage_path(self):
+        return "group_work/{}/{}/{}".format(self.group_id, self.sha1, self.file.name)
+
+    def take_lease(self):
+        pass
+
+    def update_ref(self):
+        pass
+
+
+def _directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(dirname, file_name))
+        for dirname, _, files in os.walk(path)
+        for file_name in files
+    )
+
+
+def _run_scenario(upload_file_class):
+    """
+    Every group uploads the same template file (e.g. a pre-filled form handed out with the course), then re-uploads
+    it a few times without changes.
+    """
+    storage_root = tempfile.mkdtemp()
+    storage = FileSystemStorage(location=storage_root, base_url='/media/')
+    payload = os.urandom(FILE_SIZE)
+    try:
+        with mock.patch('group_project_v2.upload_file.get_storage', mock.Mock(return_value=storage)):
+            started = time.perf_counter()
+            for group_id in range(GROUPS):
+                for _ in range(REUPLOADS + 1):
+                    context = {
+                        'user_id': 'user', 'group_id': group_id, 'course_id': 'course', 'project_api': mock.Mock()
+                    }
+                    upload = upload_file_class(ContentFile(payload, name='template.docx'), 'upload', context)
+                    upload.save_file()
+                    upload.submit()
+            elapsed = time.perf_counter() - started
+        return elapsed, _directory_size(storage_root)
+    finally:
+        shutil.rmtree(storage_root)
+
+
+def test_content_addressed_storage_savings():
+    legacy_time, legacy_bytes = _run_scenario(LegacyUploadFile)
+    blob_time, blob_bytes = _run_scenario(UploadFile)
+    uploads = GROUPS * (REUPLOADS + 1)
+
+    print("\n{} uploads of a {} byte file by {} groups".format(uploads, FILE_SIZE, GROUPS))
+    print("{:<20}{:>16}{:>16}".format("layout", "bytes stored", "ms per upload"))
+    print("{:<20}{:>16}{:>16.2f}".format("per-group", legacy_bytes, legacy_time * 1000 / uploads))
+    print("{:<20}{:>16}{:>16.2f}".format("content-addressed", blob_bytes, blob_time * 1000 / uploads))
+
+    assert blob_bytes < legacy_bytes
@@ -0,0 +1,117 @@
+"""
+Decoding benchmarks for large Project API responses - a paged completions list and a peer review items list - comparing
+the former way of decoding responses (``json.loads`` of response decoded to str) with ``json_requests.loads`` (parses
+bytes, with orjson if it's installed, and with standard library json parser) and incremental decoding of list items
+with ``json_requests.JSONObjectStream``, as done for paged responses.
+
+Timings and peak memory allocated while decoding are recorded for each case; streamed items are consumed and dropped
+one by one, like ``get_completions_by_content_id`` callers do.
+
+Run with ``pytest -s tests/benchmarks/bench_json_decoding.py``. Configuration (environment variables):
+
+* BENCH_JSON_ITEMS - comma-separated numbers of items in response, default ``1000,10000,100000``
+* BENCH_JSON_REPEAT - decodes per case, default 10
+* BENCH_TOLERANCE / BENCH_UPDATE_BASELINE - see tests/benchmarks/utils.py
+"""
+import io
+import json
+import os
+
+import mock
+
+from group_project_v2 import json_requests
+from tests.benchmarks.fake_api_server import COURSE_ID, TIMESTAMP
+from tests.benchmarks.utils import format_bytes, report_baseline, summarize, time_calls, traced_memory
+
+ITEMS = [int(value) for value in os.environ.get('BENCH_JSON_ITEMS', '1000,10000,100000').split(',')]
+REPEAT = int(os.environ.get('BENCH_JSON_REPEAT', 10))
+
+
+def completions_page(items_count):
+    return {
+        'count': items_count, 'next': None, 'previous': None, 'num_pages': 1,
+        'results': [
+            {
+                'id': user_id, 'user_id': user_id, 'course_id': COURSE_ID, 'content_id': 'content-id',
+                'stage': None, 'created': TIMESTAMP, 'modified': TIMESTAMP,
+            }
+            for user_id in range(items_count)
+        ],
+    }
+
+
+def peer_review_items(items_count):
+    return [
+        {
+            'id': item_id, 'question': 'peer_score', 'answer': 'Some feedback on the work of the team ' * 3,
+            'user': item_id % 100, 'reviewer': 'reviewer-{}'.format(item_id % 97), 'workgroup': 1,
+            'content_id': 'content-id', 'created': TIMESTAMP, 'modified': TIMESTAMP,
+        }
+        for item_id in range(items_count)
+    ]
+
+
+def decode_legacy(content):
+    return json.loads(content.decode('utf8'))
+
+
+def decode_stdlib(content):
+    with mock.patch.object(json_requests, 'orjson', None):
+        return json_requests.loads(content)
+
+
+def decode_streamed(content):
+    for _key, _value in json_requests.JSONObjectStream(io.BytesIO(content), 'results'):
+        pass
+
+
+DECODERS = {
+    'legacy': decode_legacy,
+    'loads': json_requests.loads,
+    'loads_stdlib': decode_stdlib,
+}
+PAYLOADS = {
+    'completions': completions_page,
+    'peer_review_items': peer_review_items,
+}
+
+
+def _measure(decode, content):
+    result = summarize(time_calls(lambda: decode(content), REPEAT))
+    with traced_memory() as memory:
+        decode(content)
+    result['peak_traced_memory'] = memory['peak']
+    return result
+
+
+def test_json_decoding():
+    results = {}
+    for items_count in ITEMS:
+        for payload_name in sorted(PAYLOADS):
+            content = json.dumps(PAYLOADS[payload_name](items_count)).encode('utf-8')
+            decoders = dict(DECODERS)
+            if payload_name == 'completions':
+                decoders['streamed'] = decode_streamed
+            for decoder_name in sorted(decoders):
+                case = '{}_{}_{}'.format(payload_name, decoder_name, items_count)
+                results[case] = _measure(decoders[decoder_name], content)
+                results[case]['size'] = len(content)
+
+    print("\nJSON decoding, {} decodes per case, orjson {}".format(
+        REPEAT, 'installed' if json_requests.orjson is not None else 'not installed'
+    ))
+    print("{:>40}{:>12}{:>12}{:>12}{:>14}".format("case", "size", "p50 ms", "p99 ms", "peak alloc"))
+    for case in sorted(results):
+        print("{:>40}{:>12}{:>12.1f}{:>12.1f}{:>14}".format(
+            case, format_bytes(results[case]['size']), results[case]['p50'] * 1e3, results[case]['p99'] * 1e3,
+            format_bytes(results[case]['peak_traced_memory'])
+        ))
+
+    for items_count in ITEMS:
+        legacy = results['completions_legacy_{}'.format(items_count)]['peak_traced_memory']
+        streamed = results['completions_streamed_{}'.format(items_count)]['peak_traced_memory']
+        assert streamed < legacy, "Streamed decoding of {} completions allocated {} - more than json.loads {}".format(
+            items_count, format_bytes(streamed), format_bytes(legacy)
+        )
+
+    report_baseline('json_decoding', results)
@@ -0,0 +1,269 @@
+"""
+End-to-end benchmark of GroupProjectXBlock student_view, dashboard_view and dashboard_detail_view,
+GroupActivityXBlock.calculate_grade and TeamEvaluationStage.submit_review against a simulated Project API server
+(see tests/benchmarks/fake_api_server.py), with real HTTP requests sent by TypedProjectAPI.
+
+Blocks are loaded from XML into an in-memory XBlock runtime and re-instantiated for each call, like they are for each
+request in LMS; in-process API caches (``memoize_with_expiration``) are cleared before each call, so every call
+measures a request with cold caches. Number of HTTP requests per call is recorded alongside timings, so that a change
+introducing extra API calls is reported even if simulated latency is too low to notice it in timings. Bytes of API
+responses transferred per call are recorded too, with responses compressed (the server gzips responses for clients
+accepting it) and uncompressed (``GROUP_PROJECT_V2_API_COMPRESSION`` disabled; ``_uncompressed`` cases).
+
+Run with ``pytest -s tests/benchmarks/bench_project_api.py``. Configuration (environment variables):
+
+* BENCH_API_COHORTS - comma-separated cohort sizes, as <workgroups>x<users per workgroup>, default ``50x6``;
+  e.g. ``50x6,500x8,2000x8``
+* BENCH_API_LATENCY_MS - simulated latency of each API response, in milliseconds, default 2
+* BENCH_API_REPEAT - calls per case, default 5
+* BENCH_API_COMPRESSION - comma-separated compression modes, ``on`` and/or ``off``, default ``on,off``
+* BENCH_TOLERANCE / BENCH_UPDATE_BASELINE - see tests/benchmarks/utils.py
+"""
+import json
+import os
+import time
+
+import mock
+from django.test.utils import override_settings
+from opaque_keys.edx.locator import CourseLocator
+from webob import Request
+from xblock.runtime import DictKeyValueStore, KvsFieldData, MemoryIdManager, Runtime
+
+from group_project_v2.app_config import BLOCKS
+from group_project_v2.mixins import AuthXBlockMixin
+from group_project_v2.project_api import ProjectAPIXBlockMixin, TypedProjectAPI
+from group_project_v2.tasks import ImmediateTaskExecutor
+from tests.benchmarks.fake_api_server import COURSE_ID, DASHBOARD_GROUP, Cohort, FakeProjectAPIServer
+from tests.benchmarks.utils import check_baseline, format_bytes, report_baseline, summarize
+
+COHORTS = [
+    tuple(int(value) for value in cohort.lower().split('x'))
+    for cohort in os.environ.get('BENCH_API_COHORTS', '50x6').split(',')
+]
+LATENCY = float(os.environ.get('BENCH_API_LATENCY_MS', 2)) / 1000
+REPEAT = int(os.environ.get('BENCH_API_REPEAT', 5))
+COMPRESSION = os.environ.get('BENCH_API_COMPRESSION', 'on,off').split(',')
+
+# first user of the first workgroup - member of a workgroup and has dashboard access
+USER_ID = 1
+UPLOAD_IDS = ('issue_tree', 'budget')
+GRADE_QUESTION_IDS = ('group_score',)
+
+SCENARIO = u"""
+<gp-v2-project xmlns:opt="http://code.edx.org/xblock/option">
+  <gp-v2-navigator>
+    <gp-v2-navigator-navigation />
+    <gp-v2-navigator-submissions />
+    <gp-v2-navigator-resources />
+  </gp-v2-navigator>
+  <gp-v2-activity display_name="Activity 1">
+    <gp-v2-stage-basic display_name="Overview">
+      <gp-v2-resource display_name="Instructions" resource_location="http://download/file.doc"/>
+      <gp-v2-project-team/>
+    </gp-v2-stage-basic>
+    <gp-v2-stage-submission display_name="Upload">
+      <gp-v2-submission upload_id="issue_tree" display_name="Issue Tree"/>
+      <gp-v2-submission upload_id="budget" display_name="Budget"/>
+    </gp-v2-stage-submission>
+  </gp-v2-activity>
+  <gp-v2-activity display_name="Activity 2">
+    <gp-v2-stage-team-evaluation display_name="Review Team">
+      <gp-v2-peer-selector/>
+      <gp-v2-review-question question_id="peer_score" title="Score" required="true" single_line="true">
+        <opt:question_content><![CDATA[<input type="text"/>]]></opt:question_content>
+      </gp-v2-review-question>
+      <gp-v2-review-question question_id="peer_comments" title="Comments" required="false">
+        <opt:question_content><![CDATA[<textarea/>]]></opt:question_content>
+      </gp-v2-review-question>
+    </gp-v2-stage-team-evaluation>
+    <gp-v2-stage-peer-review display_name="Review Group">
+      <gp-v2-group-selector/>
+      <gp-v2-review-question question_id="group_score" title="Score" required="true" single_line="true" grade="true">
+        <opt:question_content><![CDATA[<input type="text"/>]]></opt:question_content>
+      </gp-v2-review-question>
+    </gp-v2-stage-peer-review>
+    <gp-v2-stage-grade-display display_name="Grade">
+      <gp-v2-group-assessment question_id="group_score" show_mean="true"/>
+    </gp-v2-stage-grade-display>
+  </gp-v2-activity>
+</gp-v2-project>
+"""
+
+
+class TranslationService(object):
+    def ugettext(self, text):  # pylint: disable=no-self-use
+        return text
+
+    def ngettext(self, text_singular, text_plural, number):  # pylint: disable=no-self-use
+        return text_singular if number == 1 else text_plural
+
+    gettext = ugettext
+
+
+class SettingsService(object):
+    def get_settings_bucket(self, _block):  # pylint: disable=no-self-use
+        return {AuthXBlockMixin.ACCESS_DASHBOARD_FOR_ALL_ORGS_PERMS_KEY: [DASHBOARD_GROUP]}
+
+
+class IdManager(MemoryIdManager):
+    """
+    Generates usage keys in COURSE_ID, like LMS does - some views link to blocks by their course and block id
+    """
+    course_key = CourseLocator.from_string(COURSE_ID)
+
+    def create_usage(self, def_id):
+        usage_id = self.course_key.make_usage_key(self.get_block_type(def_id), self._next_id("u"))
+        self._usages[usage_id] = def_id
+        return usage_id
+
+
+# Runtime.query is not used by any of the blocks, so it is left abstract
+class BenchmarkRuntime(Runtime):  # pylint: disable=abstract-method
+    """
+    In-memory runtime loading blocks from package classes (instead of entry points), acting on behalf of USER_ID
+    """
+    def __init__(self, id_manager, field_data):
+        super(BenchmarkRuntime, self).__init__(
+            id_reader=id_manager, id_generator=id_manager,
+            services={'i18n': TranslationService(), 'settings': SettingsService(), 'field-data': field_data},
+        )
+        self.anonymous_student_id = USER_ID
+        self.course_id = COURSE_ID
+
+    def load_block_type(self, block_type):
+        module_name, class_name = BLOCKS[block_type].split(':')
+        block_class = getattr(__import__(module_name, fromlist=[class_name]), class_name)
+        block_class.plugin_name = block_type  # set by XBlock.load_class when loading from entry points
+        return block_class
+
+    def handler_url(self, block, handler_name, suffix='', query='', thirdparty=False):
+        return '/handler/{}/{}'.format(block.scope_ids.usage_id, handler_name)
+
+    def local_resource_url(self, block, uri):
+        return '/resource/' + uri
+
+    def resource_url(self, resource):
+        return '/static/' + resource
+
+    def publish(self, block, event_type, event_data):
+        pass
+
+
+class Project(object):
+    """
+    Project loaded from SCENARIO; `get_root` returns new block instances on each call, like in a new request
+    """
+    def __init__(self):
+        self.id_manager = IdManager()
+        self.field_data = KvsFieldData(DictKeyValueStore())
+        self.usage_id = BenchmarkRuntime(self.id_manager, self.field_data).parse_xml_string(SCENARIO)
+
+    def get_root(self):
+        return BenchmarkRuntime(self.id_manager, self.field_data).get_block(self.usage_id)
+
+
+def clear_api_caches():
+    for api_class in TypedProjectAPI.__mro__:
+        for attribute in vars(api_class).values():
+            cache = getattr(attribute, 'cache', None)
+            if isinstance(cache, dict):
+                cache.clear()
+
+
+def _get_activity(root, index):
+    return root.activities[index]
+
+
+def _get_stage(root, activity_index, stage_index):
+    return _get_activity(root, activity_index).stages[stage_index]
+
+
+def _submit_review(root):
+    stage = _get_stage(root, 1, 0)
+    body = json.dumps({'review_subject_id': USER_ID + 1, 'peer_score': '5', 'peer_comments': 'Good job'})
+    response = stage.handle('submit_review', Request.blank('/', method='POST', body=body.encode('utf-8')))
+    assert json.loads(response.body.decode('utf-8'))['result'] == 'success', response.body
+
+
+CASES = {
+    'student_view': lambda root: root.render('student_view', {}),
+    'dashboard_view': lambda root: root.render('dashboard_view', {}),
+    'dashboard_detail_view': lambda root: root.render('dashboard_detail_view', {}),
+    'calculate_grade': lambda root: _get_activity(root, 1).calculate_grade(1),
+    'submit_review': _submit_review,
+}
+
+
+def _run_case(server, project, case):
+    """
+    :return: timings, HTTP requests counts and bytes of responses of each call
+    """
+    timings, requests_counts, bytes_sent = [], [], []
+    for _ in range(REPEAT):
+        clear_api_caches()
+        server.reset_counters()
+        root = project.get_root()
+        started = time.perf_counter()
+        CASES[case](root)
+        timings.append(time.perf_counter() - started)
+        requests_counts.append(server.requests_count)
+        bytes_sent.append(server.bytes_sent)
+    return timings, requests_counts, bytes_sent
+
+
+def _print_results(results):
+    print("\nProject API end to end, {} calls per case, {:.1f} ms API latency".format(REPEAT, LATENCY * 1000))
+    print("{:>50}{:>14}{:>14}{:>14}{:>14}".format("case", "p50 ms", "p99 ms", "API calls", "API bytes"))
+    for case in sorted(results):
+        print("{:>50}{:>14.1f}{:>14.1f}{:>14}{:>14}".format(
+            case, results[case]['p50'] * 1e3, results[case]['p99'] * 1e3, results[case]['api_calls'],
+            format_bytes(results[case]['api_bytes'])
+        ))
+
+
+def _make_cohort(groups_count, users_per_group, review_content_ids, grade_content_id):
+    cohort = Cohort(groups_count, users_per_group, UPLOAD_IDS, review_content_ids)
+    cohort.add_workgroup_reviews(grade_content_id, GRADE_QUESTION_IDS)
+    return cohort
+
+
+def _measure_case(case, cohort_size, compression, project, content_ids):
+    """
+    Runs `case` against a newly started server with freshly generated cohort, so each case starts with the same data
+    - some cases (i.e. submit_review) change server data.
+    """
+    groups_count, users_per_group = cohort_size
+    review_content_ids, grade_content_id = content_ids
+    cohort = _make_cohort(groups_count, users_per_group, review_content_ids, grade_content_id)
+    with FakeProjectAPIServer(cohort, LATENCY) as server, \
+            mock.patch.object(ProjectAPIXBlockMixin, '_project_api', TypedProjectAPI(server.address)), \
+            mock.patch('group_project_v2.stage_components.get_task_executor', ImmediateTaskExecutor), \
+            override_settings(GROUP_PROJECT_V2_API_COMPRESSION=compression == 'on'):
+        timings, requests_counts, bytes_sent = _run_case(server, project, case)
+    result = summarize(timings)
+    result['api_calls'] = max(requests_counts)
+    result['api_bytes'] = max(bytes_sent)
+    return result
+
+
+def test_project_api():
+    project = Project()
+    root = project.get_root()
+    review_content_ids = [stage.activity_content_id for stage in _get_activity(root, 1).stages[:2]]
+    content_ids = (review_content_ids, _get_activity(root, 1).content_id)
+
+    results = {}
+    for groups_count, users_per_group in COHORTS:
+        for compression in COMPRESSION:
+            suffix = '' if compression == 'on' else '_uncompressed'
+            for case in sorted(CASES):
+                results['{}_{}x{}{}'.format(case, groups_count, users_per_group, suffix)] = _measure_case(
+                    case, (groups_count, users_per_group), compression, project, content_ids
+                )
+
+    _print_results(results)
+    # timings depend on the machine and are only reported, API traffic does not
+    report_baseline('project_api', results)
+    regressions = check_baseline('project_api', results, metric='api_calls', tolerance=0, min_difference=0)
+    regressions += check_baseline('project_api', results, metric='api_bytes', tolerance=0.1, min_difference=1024)
+    assert not regressions, "\n".join(regressions)
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark of GroupProjectNavigatorXBlock translations: reading translations JS from package resources on every
+render (previous behavior) vs. per-process cache of translations, and full navigator student_view with each.
+
+Run with ``pytest -s tests/benchmarks/bench_translations.py``. Configuration (environment variables):
+
+* BENCH_TRANSLATIONS_REPEAT - calls per case, default 2000
+* BENCH_TOLERANCE / BENCH_UPDATE_BASELINE - see tests/benchmarks/utils.py
+"""
+import os
+
+import mock
+from django.utils import translation
+from web_fragments.fragment import Fragment
+from xblock.field_data import DictFieldData
+from xblock.runtime import Runtime
+
+import group_project_v2.project_navigator
+from group_project_v2.project_navigator import TRANSLATIONS_PATH_TEMPLATE, GroupProjectNavigatorXBlock, ViewTypes
+from tests.benchmarks.utils import report_baseline, summarize, time_calls
+
+REPEAT = int(os.environ.get('BENCH_TRANSLATIONS_REPEAT', 2000))
+LANGUAGES = ('en', 'fr', 'pt-br', 'xx')
+
+
+def uncached_translation_content():
+    """
+    Translations lookup as it was done before translations were cached
+    """
+    try:
+        return GroupProjectNavigatorXBlock.resource_string(TRANSLATIONS_PATH_TEMPLATE.format(
+            locale=translation.to_locale(translation.get_language())
+        ))
+    except IOError:
+        return GroupProjectNavigatorXBlock.resource_string(TRANSLATIONS_PATH_TEMPLATE.format(locale='en'))
+
+
+def _make_view(view_type):
+    view = mock.Mock(type=view_type, skip_content=False, skip_selector=False)
+    view.scope_ids.usage_id = "usage/{}".format(view_type)
+    view.render.side_effect = lambda view_name, context: Fragment(u"<div>{}</div>".format(view_name))
+    return view
+
+
+def _make_navigator():
+    runtime = mock.Mock(spec=Runtime)
+    runtime.service.return_value = None
+    block = GroupProjectNavigatorXBlock(runtime, field_data=DictFieldData({}), scope_ids=mock.Mock())
+    views = [_make_view(view_type) for view_type in (ViewTypes.NAVIGATION, ViewTypes.RESOURCES, ViewTypes.SUBMISSIONS)]
+    block._sorted_child_views = mock.Mock(return_value=views)  # pylint: disable=protected-access
+    return block
+
+
+def _print_results(results):
+    print("\nGroupProjectNavigatorXBlock translations, {} calls per case".format(REPEAT))
+    print("{:>36}{:>14}{:>14}".format("case", "p50 us", "p99 us"))
+    for case in sorted(results):
+        print("{:>36}{:>14.1f}{:>14.1f}".format(case, results[case]['p50'] * 1e6, results[case]['p99'] * 1e6))
+
+
+def test_translations():
+    block = _make_navigator()
+    results = {}
+    for language in LANGUAGES:
+        with translation.override(language):
+            assert block.get_translation_content() == uncached_translation_content()
+            results['uncached_{}'.format(language)] = summarize(time_calls(uncached_translation_content, REPEAT))
+            results['cached_{}'.format(language)] = summarize(time_calls(block.get_translation_content, REPEAT))
+
+    with translation.override('fr'):
+        results['student_view_cached'] = summarize(time_calls(lambda: block.student_view({}), REPEAT // 10))
+        with mock.patch.object(
+            GroupProjectNavigatorXBlock, 'get_translation_content', lambda self: uncached_translation_content()
+        ), mock.patch.object(group_project_v2.project_navigator, 'get_translations_locale', lambda: 'fr'):
+            results['student_view_uncached'] = summarize(time_calls(lambda: block.student_view({}), REPEAT // 10))
+
+    _print_results(results)
+    for language in LANGUAGES:
+        assert results['cached_{}'.format(language)]['p50'] < results['uncached_{}'.format(language)]['p50']
+    report_baseline('translations', results)
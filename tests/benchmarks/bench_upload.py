@@ -0,0 +1,258 @@
+"""
+Upload throughput and latency benchmarks for GroupProjectSubmissionXBlock.persist_and_submit_file, UploadFile and
+make_s3_link_temporary.
+
+Runs offline: files are stored in a temporary local file system storage, Project API is mocked and S3 URLs are
+pre-signed locally by boto3 with dummy credentials (pre-signing does not contact S3).
+
+Run with ``pytest -s tests/benchmarks/bench_upload.py``. Configuration (environment variables):
+
+* BENCH_UPLOAD_SIZES - comma-separated file sizes, default ``1KB,1MB,10MB``; e.g. ``1KB,1MB,10MB,100MB,500MB``
+* BENCH_UPLOAD_REPEAT - uploads per file size, default 20 (reduced automatically for files over 10MB)
+* BENCH_UPLOAD_CONCURRENCY - comma-separated numbers of concurrent uploaders, default ``1,4,8``
+* BENCH_UPLOAD_MEMORY_LIMIT - max Python memory allocated during a single upload, default ``16MB``
+
+Peak memory allocated per upload is checked against the recorded baseline and fails the run on regression; timings
+are machine-dependent and are only reported.
+* BENCH_TOLERANCE / BENCH_UPDATE_BASELINE - see tests/benchmarks/utils.py
+"""
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import mock
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.test.utils import override_settings
+from xblock.field_data import DictFieldData
+
+from group_project_v2.project_api import TypedProjectAPI
+from group_project_v2.project_api.dtos import WorkgroupDetails
+from group_project_v2.stage_components import GroupProjectSubmissionXBlock
+from group_project_v2.tasks import ImmediateTaskExecutor
+from group_project_v2.utils import make_s3_link_temporary
+from tests.benchmarks.utils import (
+    check_baseline,
+    format_bytes,
+    peak_rss_bytes,
+    report_baseline,
+    summarize,
+    time_calls,
+    traced_memory,
+)
+
+SIZE_UNITS = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'B': 1}
+
+
+def parse_size(value):
+    value = value.strip().upper()
+    for unit, multiplier in SIZE_UNITS.items():
+        if value.endswith(unit) and value[:-len(unit)].isdigit():
+            return int(value[:-len(unit)]) * multiplier
+    return int(value)
+
+
+SIZES = [parse_size(size) for size in os.environ.get('BENCH_UPLOAD_SIZES', '1KB,1MB,10MB').split(',')]
+REPEAT = int(os.environ.get('BENCH_UPLOAD_REPEAT', 20))
+CONCURRENCY = [int(value) for value in os.environ.get('BENCH_UPLOAD_CONCURRENCY', '1,4,8').split(',')]
+MEMORY_LIMIT = parse_size(os.environ.get('BENCH_UPLOAD_MEMORY_LIMIT', '16MB'))
+MEMORY_MIN_DIFFERENCE = 64 * 1024  # allocation differences below this are noise (interpreter caches, logging)
+LARGE_FILE_REPEAT_BUDGET = 200 * 1024 * 1024  # bytes uploaded per size, at most, for files over 10MB
+WRITE_CHUNK = 1024 * 1024
+
+S3_SETTINGS = dict(
+    DEFAULT_FILE_STORAGE='storages.backends.s3boto.S3BotoStorage',
+    AWS_ACCESS_KEY_ID='benchmark-key-id',
+    AWS_SECRET_ACCESS_KEY='benchmark-secret-key',
+    AWS_STORAGE_BUCKET_NAME='benchmark-bucket',
+)
+
+
+def _repeat_for_size(size):
+    if size <= 10 * 1024 * 1024:
+        return REPEAT
+    return max(3, min(REPEAT, LARGE_FILE_REPEAT_BUDGET // size))
+
+
+class SourceFile(object):
+    """
+    File of given size on disk. Each `open` makes contents unique, so that content-addressed storage can't
+    de-duplicate repeated uploads.
+    """
+    def __init__(self, directory, size):
+        self.path = os.path.join(directory, 'source-{}.bin'.format(size))
+        self.size = size
+        self._counter = 0
+        block = os.urandom(min(size, WRITE_CHUNK))
+        with open(self.path, 'wb') as source:
+            written = 0
+            while written < size:
+                source.write(block[:size - written])
+                written += len(block)
+
+    def open(self):
+        self._counter += 1
+        with open(self.path, 'r+b') as source:
+            source.write('{:016d}'.format(self._counter).encode('ascii')[:self.size])
+        return File(open(self.path, 'rb'), name='deliverable.pdf')
+
+
+@contextmanager
+def submission_block():
+    """
+    GroupProjectSubmissionXBlock wired to local storage, mocked Project API and synchronous task executor
+    """
+    storage_root = tempfile.mkdtemp()
+    storage = FileSystemStorage(location=storage_root, base_url='/media/')
+    runtime = mock.Mock()
+    runtime.service.return_value = None  # no notifications service
+    block = GroupProjectSubmissionXBlock(
+        runtime, field_data=DictFieldData({'upload_id': 'upload'}), scope_ids=mock.Mock()
+    )
+    stage = mock.Mock()
+    stage.activity.workgroup = WorkgroupDetails(id=1)
+    project_api = mock.Mock(spec=TypedProjectAPI)
+
+    patches = [
+        mock.patch('group_project_v2.upload_file.get_storage', mock.Mock(return_value=storage)),
+        mock.patch.object(GroupProjectSubmissionXBlock, 'stage', mock.PropertyMock(return_value=stage)),
+        mock.patch.object(GroupProjectSubmissionXBlock, 'project_api', mock.PropertyMock(return_value=project_api)),
+        mock.patch(
+            'group_project_v2.stage_components.get_task_executor',
+            mock.Mock(return_value=ImmediateTaskExecutor())
+        ),
+    ]
+    for patcher in patches:
+        patcher.start()
+    try:
+        yield block, stage.activity, project_api
+    finally:
+        for patcher in reversed(patches):
+            patcher.stop()
+        shutil.rmtree(storage_root)
+
+
+def _upload(block, activity, project_api, source, group_id=1):
+    context = {"user_id": 1, "group_id": group_id, "project_api": project_api, "course_id": "course"}
+    stream = source.open()
+    try:
+        return block.persist_and_submit_file(activity, context, stream)
+    finally:
+        stream.close()
+
+
+def _print_table(title, header, rows):
+    print("\n" + title)
+    print("".join("{:>14}".format(column) for column in header))
+    for row in rows:
+        print("".join("{:>14}".format(column) for column in row))
+
+
+def _measure_upload(block, activity, project_api, source):
+    repeat = _repeat_for_size(source.size)
+    stats = summarize(time_calls(lambda: _upload(block, activity, project_api, source), repeat))
+    stats['bytes_per_second'] = source.size / stats['mean']
+
+    with traced_memory() as memory:
+        _upload(block, activity, project_api, source)
+    stats['peak_traced_memory'] = memory['peak']
+    return stats
+
+
+def test_upload_latency_and_throughput():
+    work_dir = tempfile.mkdtemp()
+    results, rows = {}, []
+    try:
+        with submission_block() as (block, activity, project_api):
+            for size in SIZES:
+                source = SourceFile(work_dir, size)
+                stats = _measure_upload(block, activity, project_api, source)
+                results['upload_{}'.format(size)] = stats
+                rows.append((
+                    format_bytes(size), stats['count'], "{:.2f}".format(stats['p50'] * 1000),
+                    "{:.2f}".format(stats['p99'] * 1000), format_bytes(stats['bytes_per_second']) + "/s",
+                    format_bytes(stats['peak_traced_memory'])
+                ))
+                os.remove(source.path)
+    finally:
+        shutil.rmtree(work_dir)
+
+    _print_table(
+        "persist_and_submit_file, local file system storage",
+        ("size", "uploads", "p50 ms", "p99 ms", "throughput", "peak alloc"), rows
+    )
+    print("peak RSS: {}".format(format_bytes(peak_rss_bytes())))
+
+    for size in SIZES:
+        peak = results['upload_{}'.format(size)]['peak_traced_memory']
+        assert peak < MEMORY_LIMIT, "Upload of {} allocated {} - file is not streamed".format(
+            format_bytes(size), format_bytes(peak)
+        )
+    report_baseline('upload', results)
+    # allocations do not depend on the machine, so unlike timings they can fail the run
+    regressions = check_baseline(
+        'upload', results, metric='peak_traced_memory', min_difference=MEMORY_MIN_DIFFERENCE
+    )
+    assert not regressions, "\n".join(regressions)
+
+
+def _measure_concurrent_uploads(block, activity, project_api, sources, size):
+    concurrency = len(sources)
+    uploads_per_worker = max(REPEAT // concurrency, 1)
+
+    def worker(worker_id):
+        return time_calls(
+            lambda source=sources[worker_id]: _upload(block, activity, project_api, source, group_id=worker_id),
+            uploads_per_worker
+        )
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = sum(executor.map(worker, range(concurrency)), [])
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(timings)
+    stats['bytes_per_second'] = size * len(timings) / elapsed
+    return stats
+
+
+def test_concurrent_uploads():
+    work_dir = tempfile.mkdtemp()
+    size = min(SIZES[-1], 1024 * 1024)
+    results, rows = {}, []
+    try:
+        with submission_block() as (block, activity, project_api):
+            for concurrency in CONCURRENCY:
+                sources = [SourceFile(tempfile.mkdtemp(dir=work_dir), size) for _ in range(concurrency)]
+                stats = _measure_concurrent_uploads(block, activity, project_api, sources, size)
+                results['concurrent_{}'.format(concurrency)] = stats
+                rows.append((
+                    concurrency, stats['count'], "{:.2f}".format(stats['p50'] * 1000),
+                    "{:.2f}".format(stats['p99'] * 1000), format_bytes(stats['bytes_per_second']) + "/s"
+                ))
+    finally:
+        shutil.rmtree(work_dir)
+
+    _print_table(
+        "concurrent persist_and_submit_file, {} files".format(format_bytes(size)),
+        ("uploaders", "uploads", "p50 ms", "p99 ms", "throughput"), rows
+    )
+    report_baseline('upload_concurrent', results)
+
+
+def test_make_s3_link_temporary():
+    document_url = 'https://benchmark-bucket.s3.amazonaws.com/group_work/blobs/0123abcd/content'
+    with override_settings(**S3_SETTINGS), mock.patch.dict(os.environ, {'AWS_DEFAULT_REGION': 'us-east-1'}):
+        timings = time_calls(
+            lambda: make_s3_link_temporary(1, '0123abcd', 'deliverable.pdf', document_url), REPEAT * 5
+        )
+    stats = summarize(timings)
+
+    _print_table(
+        "make_s3_link_temporary (stubbed S3)", ("calls", "p50 ms", "p99 ms"),
+        [(stats['count'], "{:.2f}".format(stats['p50'] * 1000), "{:.2f}".format(stats['p99'] * 1000))]
+    )
+    report_baseline('s3_link', {'make_s3_link_temporary': stats})
@@ -0,0 +1,406 @@
+"""
+Local HTTP server simulating the parts of the LMS API used by ProjectAPI: projects, workgroups, peer_reviews,
+workgroup_reviews, submissions, completions, groups, users, organizations and course roles.
+
+Serves a generated cohort of `groups_count` workgroups with `users_per_group` users each. User N belongs to workgroup
+(N - 1) // users_per_group + 1, every user belongs to organization 1 and every workgroup is assigned to be reviewed by
+members of the next workgroup. Reviews, submissions and grades posted to the server are kept in memory, so subsequent
+reads see them. Every response is delayed by `latency` seconds to simulate network and LMS processing time.
+Responses are gzip-compressed for clients accepting it, like behind a compressing proxy, unless `compress` is False.
+"""
+import gzip
+import json
+import re
+import threading
+import time
+from collections import Counter, defaultdict, namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from group_project_v2.api_tracing import get_endpoint_template
+
+API_PREFIX = '/api/server'
+COURSE_ID = 'course-v1:Org+Course+Run'
+PROJECT_ID = 1
+ORGANIZATION_ID = 1
+DASHBOARD_GROUP = 'group_project_dashboard'
+COMPLETIONS_PAGE_SIZE = 100
+# review assignment (group) IDs are offset so that they don't clash with workgroup IDs
+REVIEW_ASSIGNMENT_OFFSET = 1000000
+TIMESTAMP = '2020-01-01T00:00:00Z'
+# nginx gzip_comp_level default
+COMPRESSION_LEVEL = 1
+
+
+class Cohort(object):  # pylint: disable=too-many-instance-attributes
+    """
+    Generated users and workgroups, plus review items, submissions and grades posted to the server
+    """
+    def __init__(self, groups_count, users_per_group, upload_ids=(), review_content_ids=()):
+        self.groups_count = groups_count
+        self.users_per_group = users_per_group
+        self.upload_ids = list(upload_ids)
+        self.review_content_ids = list(review_content_ids)
+        self.peer_reviews = defaultdict(dict)
+        self.workgroup_reviews = defaultdict(dict)
+        self.submissions = defaultdict(list)
+        self.grades = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        for group_id in self.group_ids:
+            # every other group has uploaded all the submissions
+            if group_id % 2:
+                for upload_id in self.upload_ids:
+                    self.add_submission({
+                        'document_id': upload_id, 'document_url': '/media/{}/{}.doc'.format(group_id, upload_id),
+                        'document_filename': '{}.doc'.format(upload_id), 'document_mime_type': 'application/msword',
+                        'user': self.get_group_user_ids(group_id)[0], 'workgroup': group_id,
+                    })
+
+    @property
+    def group_ids(self):
+        return range(1, self.groups_count + 1)
+
+    @property
+    def user_ids(self):
+        return range(1, self.groups_count * self.users_per_group + 1)
+
+    def get_user_group_id(self, user_id):
+        return (user_id - 1) // self.users_per_group + 1
+
+    def get_group_user_ids(self, group_id):
+        first_user_id = (group_id - 1) * self.users_per_group + 1
+        return list(range(first_user_id, first_user_id + self.users_per_group))
+
+    def get_reviewed_group_id(self, group_id):
+        return group_id % self.groups_count + 1
+
+    def get_reviewing_group_id(self, group_id):
+        return (group_id - 2) % self.groups_count + 1
+
+    def make_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def add_submission(self, data):
+        submission = dict(data, id=self.make_id(), created=TIMESTAMP, modified=TIMESTAMP)
+        self.submissions[submission['workgroup']].append(submission)
+        return submission
+
+    def add_workgroup_reviews(self, content_id, question_ids, answer='80'):
+        """
+        Adds reviews of every workgroup by all members of the group assigned to review it
+        """
+        for group_id in self.group_ids:
+            for reviewer_id in self.get_group_user_ids(self.get_reviewing_group_id(group_id)):
+                for question_id in question_ids:
+                    self.save_review_item(self.workgroup_reviews, {
+                        'question': question_id, 'answer': answer, 'workgroup': group_id, 'reviewer': reviewer_id,
+                        'content_id': content_id,
+                    })
+
+    def save_review_item(self, items, data, item_id=None):
+        item = dict(data, id=item_id or self.make_id(), created=TIMESTAMP, modified=TIMESTAMP)
+        items[item['workgroup']][item['id']] = item
+        return item
+
+
+class FakeProjectAPIServer(object):  # pylint: disable=too-many-instance-attributes
+    """
+    Runs the server in a background thread. Use as a context manager, or call `start` and `stop`.
+    """
+    def __init__(self, cohort, latency=0.0, compress=True):
+        self.cohort = cohort
+        self.latency = latency
+        self.compress = compress
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self._requests_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self):
+        return 'http://{}:{}'.format(*self._server.server_address)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_counters(self):
+        with self._requests_lock:
+            self.requests.clear()
+            self.bytes_sent = 0
+
+    @property
+    def requests_count(self):
+        return sum(self.requests.values())
+
+    def _record(self, method, path):
+        with self._requests_lock:
+            self.requests[(method, get_endpoint_template(path))] += 1
+
+    def _record_bytes_sent(self, size):
+        with self._requests_lock:
+            self.bytes_sent += size
+
+    def _make_handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+            def _handle(self, method):
+                url = urlsplit(self.path)
+                server._record(method, url.path)  # pylint: disable=protected-access
+                length = int(self.headers.get('Content-Length') or 0)
+                data = json.loads(self.rfile.read(length).decode('utf-8')) if length else None
+                if server.latency:
+                    time.sleep(server.latency)
+
+                status, response = route(server, method, url.path, parse_qs(url.query), data)
+                body = json.dumps(response).encode('utf-8') if response is not None else b''
+                compress = server.compress and body and 'gzip' in self.headers.get('Accept-Encoding', '')
+                if compress:
+                    body = gzip.compress(body, COMPRESSION_LEVEL)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                if compress:
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server._record_bytes_sent(len(body))  # pylint: disable=protected-access
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                self._handle('GET')
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                self._handle('POST')
+
+            def do_PUT(self):  # pylint: disable=invalid-name
+                self._handle('PUT')
+
+            def do_DELETE(self):  # pylint: disable=invalid-name
+                self._handle('DELETE')
+
+        return Handler
+
+
+def _user(cohort, user_id):
+    return {
+        'id': user_id, 'url': '{}/users/{}'.format(API_PREFIX, user_id), 'username': 'user{}'.format(user_id),
+        'email': 'user{}@example.com'.format(user_id), 'first_name': 'User', 'last_name': str(user_id),
+        'organization': ORGANIZATION_ID, 'is_active': True,
+        'profile_image': {'image_url_medium': '/media/profile/{}.jpg'.format(user_id)},
+        'workgroup': cohort.get_user_group_id(user_id),
+    }
+
+
+def _workgroup(cohort, group_id):
+    return {
+        'id': group_id, 'url': '{}/workgroups/{}/'.format(API_PREFIX, group_id), 'name': 'Group {}'.format(group_id),
+        'project': PROJECT_ID, 'created': TIMESTAMP, 'modified': TIMESTAMP, 'groups': [],
+        'users': [
+            {key: value for key, value in _user(cohort, user_id).items() if key != 'profile_image'}
+            for user_id in cohort.get_group_user_ids(group_id)
+        ],
+    }
+
+
+def _project(cohort, query):
+    return {
+        'id': PROJECT_ID, 'url': '{}/projects/{}/'.format(API_PREFIX, PROJECT_ID),
+        'course_id': query.get('course_id', [COURSE_ID])[0], 'content_id': query.get('content_id', [None])[0],
+        'organization': None, 'created': TIMESTAMP, 'modified': TIMESTAMP, 'workgroups': list(cohort.group_ids),
+    }
+
+
+def _review_assignments(cohort, group_id):
+    """
+    Review assignments of workgroup, i.e. groups of users assigned to review it
+    """
+    return [
+        {
+            'id': REVIEW_ASSIGNMENT_OFFSET + group_id, 'url': '{}/groups/{}/'.format(
+                API_PREFIX, REVIEW_ASSIGNMENT_OFFSET + group_id
+            ), 'name': 'Assignment {}'.format(group_id), 'type': 'reviewassignment',
+            'data': {'xblock_id': content_id, 'assignment_date': TIMESTAMP},
+        }
+        for content_id in cohort.review_content_ids
+    ]
+
+
+def _completions(server, path, query):
+    cohort = server.cohort
+    page = int(query.get('page', [1])[0])
+    content_id = query.get('content_id', [None])[0]
+    # every other user has completed the project
+    completed_user_ids = [user_id for user_id in cohort.user_ids if user_id % 2][
+        (page - 1) * COMPLETIONS_PAGE_SIZE:page * COMPLETIONS_PAGE_SIZE
+    ]
+    has_next = page * COMPLETIONS_PAGE_SIZE < len([user_id for user_id in cohort.user_ids if user_id % 2])
+    next_url = None
+    if has_next:
+        next_url = '{}{}?{}'.format(server.address, path, urlencode({'content_id': content_id, 'page': page + 1}))
+    return {
+        'count': len(completed_user_ids), 'next': next_url, 'previous': None, 'num_pages': None,
+        'results': [
+            {
+                'id': user_id, 'user_id': user_id, 'course_id': COURSE_ID, 'content_id': content_id,
+                'stage': None, 'created': TIMESTAMP, 'modified': TIMESTAMP,
+            }
+            for user_id in completed_user_ids
+        ],
+    }
+
+
+def _user_groups(cohort, user_id, query):
+    group_type = query.get('type', [None])[0]
+    if group_type == 'reviewassignment':
+        reviewed_group_id = cohort.get_reviewed_group_id(cohort.get_user_group_id(user_id))
+        return {'groups': [
+            assignment for assignment in _review_assignments(cohort, reviewed_group_id)
+            if assignment['data']['xblock_id'] in query.get('data__xblock_id', [])
+        ]}
+    # first user of each group can access dashboard
+    if user_id in (cohort.get_group_user_ids(cohort.get_user_group_id(user_id))[0], ):
+        return {'groups': [{'id': 1, 'name': DASHBOARD_GROUP, 'type': 'permission'}]}
+    return {'groups': []}
+
+
+RouteRequest = namedtuple('RouteRequest', 'server cohort object_id query data params')
+
+
+def _organization(cohort):
+    return {'id': ORGANIZATION_ID, 'name': 'org', 'display_name': 'Organization', 'users': list(cohort.user_ids)}
+
+
+def _review_items(cohort, resource):
+    return cohort.peer_reviews if resource == 'peer_reviews' else cohort.workgroup_reviews
+
+
+def _get_review_items(cohort, group_id, resource, query):
+    content_id = query.get('content_id', [None])[0]
+    return [item for item in _review_items(cohort, resource)[group_id].values() if item['content_id'] == content_id]
+
+
+def _delete_review_item(cohort, item_id, resource):
+    for group_items in _review_items(cohort, resource).values():
+        group_items.pop(item_id, None)
+
+
+def _save_grades(cohort, group_id, data):
+    cohort.grades[group_id] = data
+    return data
+
+
+def _reviewers(cohort, assignment_id):
+    group_id = assignment_id - REVIEW_ASSIGNMENT_OFFSET
+    reviewer_ids = cohort.get_group_user_ids(cohort.get_reviewing_group_id(group_id))
+    return {'users': [{'id': user_id} for user_id in reviewer_ids]}
+
+
+def _project_list(cohort, query):
+    return {'count': 1, 'next': None, 'results': [_project(cohort, query)]}
+
+
+# (method, path pattern relative to API_PREFIX, response status, handler). Handlers are called with RouteRequest
+# and return response data; integer `object_id` group of the pattern is passed as RouteRequest.object_id, the rest of
+# named groups - in RouteRequest.params.
+ROUTES = [
+    ('GET', r'users/(?P<object_id>\d+)', 200, lambda request: _user(request.cohort, request.object_id)),
+    ('GET', r'users/(?P<object_id>\d+)/organizations', 200, lambda request: [
+        {'id': ORGANIZATION_ID, 'name': 'org', 'display_name': 'Organization'}
+    ]),
+    ('GET', r'users/(?P<object_id>\d+)/preferences', 200, lambda request: {}),
+    ('GET', r'users/(?P<object_id>\d+)/workgroups', 200, lambda request: {
+        'count': 1, 'results': [{'id': request.cohort.get_user_group_id(request.object_id)}]
+    }),
+    ('GET', r'users/(?P<object_id>\d+)/groups', 200, lambda request: _user_groups(
+        request.cohort, request.object_id, request.query
+    )),
+    ('GET', r'users/(?P<object_id>\d+)/courses(/.*)?', 200, lambda request: {'course_grade': 0}),
+    ('GET', r'workgroups/(?P<object_id>\d+)', 200, lambda request: _workgroup(request.cohort, request.object_id)),
+    ('GET', r'workgroups/(?P<object_id>\d+)/submissions', 200, lambda request: list(
+        request.cohort.submissions[request.object_id]
+    )),
+    (
+        'GET', r'workgroups/(?P<object_id>\d+)/(?P<resource>peer_reviews|workgroup_reviews)', 200,
+        lambda request: _get_review_items(request.cohort, request.object_id, request.params['resource'], request.query)
+    ),
+    ('GET', r'workgroups/(?P<object_id>\d+)/groups', 200, lambda request: _review_assignments(
+        request.cohort, request.object_id
+    )),
+    ('GET', r'groups/(?P<object_id>\d+)', 200, lambda request: _review_assignments(
+        request.cohort, request.object_id - REVIEW_ASSIGNMENT_OFFSET
+    )[0]),
+    ('GET', r'groups/(?P<object_id>\d+)/users', 200, lambda request: _reviewers(request.cohort, request.object_id)),
+    ('GET', r'groups/(?P<object_id>\d+)/workgroups', 200, lambda request: {
+        'count': 1, 'results': [_workgroup(request.cohort, request.object_id - REVIEW_ASSIGNMENT_OFFSET)]
+    }),
+    ('GET', r'projects', 200, lambda request: _project_list(request.cohort, request.query)),
+    ('GET', r'projects/(?P<object_id>\d+)', 200, lambda request: _project(request.cohort, request.query)),
+    ('GET', r'courses/(?P<course_id>.+)/completions', 200, lambda request: _completions(
+        request.server, '{}/courses/{}/completions'.format(API_PREFIX, request.params['course_id']), request.query
+    )),
+    ('GET', r'courses/(?P<course_id>.+)/roles', 200, lambda request: []),
+    ('GET', r'organizations/(?P<object_id>\d+)', 200, lambda request: _organization(request.cohort)),
+    (
+        'POST', r'(?P<resource>peer_reviews|workgroup_reviews)', 200,
+        lambda request: request.cohort.save_review_item(
+            _review_items(request.cohort, request.params['resource']), request.data
+        )
+    ),
+    (
+        'PUT', r'(?P<resource>peer_reviews|workgroup_reviews)/(?P<object_id>\d+)', 200,
+        lambda request: request.cohort.save_review_item(
+            _review_items(request.cohort, request.params['resource']), request.data, request.object_id
+        )
+    ),
+    (
+        'DELETE', r'(?P<resource>peer_reviews|workgroup_reviews)/(?P<object_id>\d+)', 204,
+        lambda request: _delete_review_item(request.cohort, request.object_id, request.params['resource'])
+    ),
+    ('POST', r'submissions', 200, lambda request: request.cohort.add_submission(request.data)),
+    ('POST', r'workgroups/(?P<object_id>\d+)/grades', 200, lambda request: _save_grades(
+        request.cohort, request.object_id, request.data
+    )),
+]
+COMPILED_ROUTES = [(method, re.compile(pattern), status, handler) for method, pattern, status, handler in ROUTES]
+
+
+def route(server, method, path, query, data):
+    """
+    :return: HTTP status and response data
+    :rtype: tuple[int, object]
+    """
+    if path.startswith(API_PREFIX):
+        relative_path = path[len(API_PREFIX):].strip('/')
+        for route_method, pattern, status, handler in COMPILED_ROUTES:
+            match = pattern.fullmatch(relative_path) if route_method == method else None
+            if match:
+                params = match.groupdict()
+                object_id = params.pop('object_id', None)
+                request = RouteRequest(
+                    server, server.cohort, int(object_id) if object_id is not None else None, query, data, params
+                )
+                return status, handler(request)
+    return 404, {'message': 'Not found'}
@@ -0,0 +1,143 @@
+"""
+Helpers shared by benchmark modules: timing statistics, memory measurement and baseline comparison.
+"""
+import json
+import math
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+BASELINES_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+
+# Allowed slowdown relative to recorded baseline before a benchmark is considered (or reported as) a regression
+DEFAULT_TOLERANCE = float(os.environ.get('BENCH_TOLERANCE', 0.5))
+UPDATE_BASELINE = os.environ.get('BENCH_UPDATE_BASELINE', '') == '1'
+# Differences below this (in metric units, i.e. seconds for timings) are treated as noise
+DEFAULT_MIN_DIFFERENCE = float(os.environ.get('BENCH_MIN_DIFFERENCE', 0.001))
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile
+    :param list[float] values:
+    :param float percent: 0..100
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(int(math.ceil(percent / 100.0 * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(timings):
+    """
+    :param list[float] timings: timings in seconds
+    :rtype: dict
+    """
+    return {
+        'count': len(timings),
+        'p50': percentile(timings, 50),
+        'p99': percentile(timings, 99),
+        'mean': sum(timings) / len(timings),
+    }
+
+
+def time_calls(func, repeat):
+    """
+    Calls func `repeat` times and returns list of timings in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of the process so far
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS - bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@contextmanager
+def traced_memory():
+    """
+    Measures peak memory allocated by Python code within the block. Yields dict populated with `peak` on exit.
+    """
+    result = {}
+    tracemalloc.start()
+    try:
+        yield result
+    finally:
+        _current, result['peak'] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+
+def format_bytes(value):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(value) < 1024 or unit == 'GB':
+            return "{:.1f}{}".format(value, unit)
+        value /= 1024.0
+    return None
+
+
+def _baseline_path(name):
+    return os.path.join(BASELINES_DIR, name + '.json')
+
+
+def check_baseline(name, results, metric='p50', tolerance=DEFAULT_TOLERANCE, min_difference=DEFAULT_MIN_DIFFERENCE):
+    """
+    Compares `metric` of each result with recorded baseline.
+
+    Set BENCH_UPDATE_BASELINE=1 to record current results as new baseline instead. Results missing from the baseline
+    are not checked.
+
+    :param str name: baseline name
+    :param dict[str, dict] results: benchmark results by case name
+    :param str metric: metric to compare; lower is better
+    :param float tolerance: allowed relative slowdown
+    :param float min_difference: allowed absolute slowdown
+    :return: list of human-readable regression descriptions
+    :rtype: list[str]
+    """
+    path = _baseline_path(name)
+    if UPDATE_BASELINE:
+        if not os.path.isdir(BASELINES_DIR):
+            os.makedirs(BASELINES_DIR)
+        with open(path, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+        return []
+
+    if not os.path.exists(path):
+        return []
+
+    with open(path) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressions = []
+    for case, case_results in results.items():
+        expected = baseline.get(case, {}).get(metric)
+        actual = case_results.get(metric)
+        if expected is None or actual is None:
+            continue
+        if actual > expected * (1 + tolerance) and actual - expected > min_difference:
+            regressions.append("{case}: {metric} {actual:.6f} > baseline {expected:.6f} (+{tolerance:.0%})".format(
+                case=case, metric=metric, actual=actual, expected=expected, tolerance=tolerance
+            ))
+    return regressions
+
+
+def report_baseline(name, results, metric='p50', tolerance=DEFAULT_TOLERANCE, min_difference=DEFAULT_MIN_DIFFERENCE):
+    """
+    Same as check_baseline, but only prints regressions. Used for machine-dependent metrics, such as timings, so that
+    benchmarks do not fail on machines other than the one baseline was recorded on.
+    """
+    for regression in check_baseline(name, results, metric, tolerance, min_difference):
+        print("WARNING: {} (not checked - timings depend on the machine)".format(regression))
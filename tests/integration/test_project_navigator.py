@@ -40,6 +40,7 @@ from tests.integration.page_elements import (
 )
 from tests.utils import (
     KNOWN_USERS,
+    WORKGROUP,
     TestWithPatchesMixin,
     expect_new_browser_window,
     get_other_windows,
@@ -128,10 +129,11 @@ class TestProjectNavigatorViews(SingleScenarioTestSuite, TestWithPatchesMixin):
         # arrange: setting up mocks influencing stage states
 
         self.project_api_mock.get_latest_workgroup_submissions_by_id.return_value = self.submissions
+        self.project_api_mock.get_latest_submissions_by_workgroup.return_value = {WORKGROUP.id: self.submissions}
         self.make_patch(PeerReviewStage, '_pivot_feedback', mock.Mock(return_value={}))
         self.make_patch(TeamEvaluationStage, '_pivot_feedback', mock.Mock(return_value={}))
-        self.make_patch(PeerReviewStage, 'get_review_state', mock.Mock(return_value={}))
-        self.make_patch(TeamEvaluationStage, 'get_review_state', mock.Mock(return_value={}))
+        self.make_patch(PeerReviewStage, 'get_review_states', mock.Mock(return_value={}))
+        self.make_patch(TeamEvaluationStage, 'get_review_states', mock.Mock(return_value={}))
 
         self._prepare_page()
 
@@ -1,4 +1,5 @@
 import json
+from datetime import datetime, timedelta
 from unittest import TestCase
 from urllib.parse import urlencode
 
@@ -6,9 +7,16 @@ import ddt
 import mock
 
 import tests.unit.project_api.canned_responses as canned_responses  # pylint: disable=useless-import-alias
-from group_project_v2.json_requests import GET
+from group_project_v2.json_requests import DELETE, GET, POST, PUT
 from group_project_v2.project_api import TypedProjectAPI
-from group_project_v2.project_api.api_implementation import COURSES_API, PROJECTS_API, WORKGROUP_API
+from group_project_v2.project_api.api_implementation import (
+    COURSES_API,
+    PEER_REVIEW_API,
+    PROJECTS_API,
+    USERS_API,
+    WORKGROUP_API,
+    WORKGROUP_REVIEW_API,
+)
 from tests.utils import TestWithPatchesMixin, find_url
 from tests.utils import make_review_item as mri
 
@@ -48,6 +56,18 @@ class TestProjectApi(TestCase, TestWithPatchesMixin):
 
         return mock.patch.object(self.project_api, '_do_send_request', mock.Mock(side_effect=side_effect))
 
+    def _patch_stream_request(self, urls_and_results):
+        # pylint: disable=unused-argument
+        def side_effect(method, url, data=None):
+            for key, value in urls_and_results[find_url(url, urls_and_results)].items():
+                if key == 'results':
+                    for item in value:
+                        yield key, item
+                else:
+                    yield key, value
+
+        return mock.patch.object(self.project_api, '_stream_request', mock.Mock(side_effect=side_effect))
+
     @ddt.data(
         (["part1", "part2"], None, False, api_server_address + "/part1/part2/", {'error': True}),
         (["part1", "part2"], None, True, api_server_address + "/part1/part2", {'success': True}),
@@ -246,6 +266,38 @@ class TestProjectApi(TestCase, TestWithPatchesMixin):
             self.assertEqual(result, expected_result)
             patched_get_review_items.assert_called_once_with('group_id', content_id)
 
+    def test_submit_peer_review_items(self):
+        fetched_items = [
+            dict(mri(1, 'q1', peer=2, answer='1'), id=10, created='today', modified='today'),
+            dict(mri(1, 'q2', peer=2, answer='2'), id=11, created='today', modified='today'),
+        ]
+        with mock.patch.object(self.project_api, 'get_peer_review_items') as patched_get_review_items, \
+                mock.patch.object(self.project_api, 'send_request') as patched_send_request:
+            patched_get_review_items.return_value = fetched_items
+            self.project_api.submit_peer_review_items(
+                1, 2, 'group_id', 'content_id', {'q1': '3', 'q2': '', 'q3': '4'}
+            )
+
+        patched_get_review_items.assert_called_once_with(1, 2, 'group_id', 'content_id')
+        self.assertEqual(patched_send_request.call_args_list, [
+            mock.call(PUT, (PEER_REVIEW_API, 10), data=dict(mri(1, 'q1', peer=2, answer='3'), id=10)),
+            mock.call(DELETE, (PEER_REVIEW_API, 11)),
+            mock.call(POST, (PEER_REVIEW_API,), data=mri(
+                1, 'q3', peer=2, content_id='content_id', answer='4', group='group_id'
+            )),
+        ])
+
+    def test_submit_workgroup_review_items(self):
+        with mock.patch.object(self.project_api, 'get_workgroup_review_items') as patched_get_review_items, \
+                mock.patch.object(self.project_api, 'send_request') as patched_send_request:
+            patched_get_review_items.return_value = [dict(mri(1, 'q1', answer='1', group=5), id=10, created='today')]
+            self.project_api.submit_workgroup_review_items(1, 5, 'content_id', {'q1': '1', 'q2': '2'})
+
+        patched_get_review_items.assert_called_once_with(1, 5, 'content_id')
+        patched_send_request.assert_called_once_with(POST, (WORKGROUP_REVIEW_API,), data={
+            'question': 'q2', 'answer': '2', 'workgroup': 5, 'reviewer': 1, 'content_id': 'content_id'
+        })
+
     def assert_project_data(self, project_data, expected_values):
         attrs_to_test = [
             "id", "url", "created", "modified", "course_id", "content_id", "organization", "workgroups"
@@ -346,9 +398,9 @@ class TestProjectApi(TestCase, TestWithPatchesMixin):
         expected_url = build_url(course_id, content_id)
         expected_data = urls_and_results.get(expected_url)
 
-        with self._patch_do_send_request(urls_and_results) as patched_do_send_request:
+        with self._patch_stream_request(urls_and_results) as patched_stream_request:
             completions = list(self.project_api.get_completions_by_content_id(course_id, content_id))
-            patched_do_send_request.assert_called_once_with(GET, expected_url, None)
+            patched_stream_request.assert_called_once_with(GET, expected_url, None)
 
         self.assertEqual(len(completions), len(expected_data['results']))
         self.assertEqual([comp.id for comp in completions], [data['id'] for data in expected_data['results']])
@@ -383,9 +435,9 @@ class TestProjectApi(TestCase, TestWithPatchesMixin):
             mock.call(GET, canned_responses.Completions.paged_page2['next'], None),
         ]
 
-        with self._patch_do_send_request(urls_and_results) as patched_do_send_request:
+        with self._patch_stream_request(urls_and_results) as patched_stream_request:
             completions = list(self.project_api.get_completions_by_content_id(course, content))
-            self.assertEqual(patched_do_send_request.mock_calls, expected_calls)
+            self.assertEqual(patched_stream_request.mock_calls, expected_calls)
 
         self.assertEqual(len(completions), len(all_responses))
         self.assertEqual([comp.id for comp in completions], [data['id'] for data in all_responses])
@@ -407,3 +459,99 @@ class TestProjectApi(TestCase, TestWithPatchesMixin):
         self.project_api.send_request.assert_called_once_with(
             GET, ('api/server/courses', course_id, 'roles'), query_params={'user_id': user_id}
         )
+
+    @ddt.data(
+        ('get_user_roles_for_course', (1, 'course'), []),
+        ('get_workgroup_by_id', (1, ), {'id': 1}),
+        ('get_user_workgroup_for_course', (1, 'course'), {'count': 0}),
+    )
+    @ddt.unpack
+    def test_access_data_not_served_stale(self, method_name, args, response):
+        now = datetime(2020, 1, 1)
+        self.project_api.send_request = mock.Mock(return_value=response)
+        method = getattr(self.project_api, method_name)
+        with mock.patch('group_project_v2.utils.datetime') as utils_datetime, \
+                mock.patch('group_project_v2.api_cache.datetime') as api_cache_datetime, \
+                mock.patch('group_project_v2.utils._get_refresh_executor') as get_refresh_executor:
+            utils_datetime.now.side_effect = api_cache_datetime.now.side_effect = lambda: now
+            method(*args)
+            now += timedelta(seconds=11)
+            method(*args)
+
+        self.assertEqual(self.project_api.send_request.call_count, 2)
+        get_refresh_executor.assert_not_called()
+
+    @staticmethod
+    def _make_submission(document_id, modified, user=None):
+        return {'document_id': document_id, 'modified': modified, 'user': user, 'document_url': document_id + modified}
+
+    def test_get_latest_workgroup_submissions_by_id(self):
+        submissions = [
+            self._make_submission('upload1', '2015-08-01T00:00:00Z', user=1),
+            self._make_submission('upload1', '2015-08-03T00:00:00Z', user=2),
+            self._make_submission('upload1', '2015-08-02T00:00:00Z', user=3),
+            self._make_submission('upload2', '2015-08-01T00:00:00Z'),
+        ]
+        calls_and_results = {(WORKGROUP_API, 1, 'submissions'): submissions}
+
+        with self._patch_send_request(calls_and_results), \
+                mock.patch.object(self.project_api, 'get_user_details') as patched_get_user_details:
+            result = self.project_api.get_latest_workgroup_submissions_by_id(1)
+            patched_get_user_details.assert_called_once_with(2)
+
+        self.assertEqual(set(result.keys()), {'upload1', 'upload2'})
+        self.assertEqual(result['upload1']['modified'], '2015-08-03T00:00:00Z')
+        self.assertEqual(result['upload1']['user_details'], patched_get_user_details.return_value)
+        self.assertNotIn('user_details', result['upload2'])
+
+    @ddt.data(
+        ([1, 2, 3], None, {1: {'upload1', 'upload2'}, 2: {'upload1'}, 3: set()}),
+        ([1, 2, 3], {'upload2'}, {1: {'upload2'}, 2: set(), 3: set()}),
+        ([1, 1], None, {1: {'upload1', 'upload2'}}),
+        ([2], {'upload1'}, {2: {'upload1'}}),
+        ([], None, {}),
+    )
+    @ddt.unpack
+    def test_get_latest_submissions_by_workgroup(self, group_ids, upload_ids, expected_uploads):
+        calls_and_results = {
+            (WORKGROUP_API, 1, 'submissions'): [
+                self._make_submission('upload1', '2015-08-01T00:00:00Z', user=1),
+                self._make_submission('upload1', '2015-08-02T00:00:00Z', user=1),
+                self._make_submission('upload2', '2015-08-01T00:00:00Z', user=2),
+            ],
+            (WORKGROUP_API, 2, 'submissions'): [self._make_submission('upload1', '2015-08-01T00:00:00Z', user=3)],
+            (WORKGROUP_API, 3, 'submissions'): [],
+        }
+
+        with self._patch_send_request(calls_and_results) as patched_send_request, \
+                mock.patch.object(self.project_api, 'get_user_details') as patched_get_user_details:
+            result = self.project_api.get_latest_submissions_by_workgroup(group_ids, upload_ids)
+            self.assertEqual(patched_send_request.call_count, len(set(group_ids)))
+            patched_get_user_details.assert_not_called()
+
+        self.assertEqual({group_id: set(uploads.keys()) for group_id, uploads in result.items()}, expected_uploads)
+        if 1 in result and 'upload1' in result[1]:
+            self.assertEqual(result[1]['upload1']['modified'], '2015-08-02T00:00:00Z')
+
+    @ddt.data([], [1], [3, 1, 2])
+    def test_get_members_data(self, user_ids):
+        calls_and_results = {}
+        for user_id in (1, 2, 3):
+            calls_and_results[(USERS_API, user_id)] = {'id': user_id, 'username': 'user{}'.format(user_id)}
+            organizations = [{'display_name': 'Org{}'.format(user_id)}] if user_id != 2 else []
+            calls_and_results[(USERS_API, user_id, 'organizations')] = organizations
+
+        with self._patch_send_request(calls_and_results) as patched_send_request:
+            result = self.project_api.get_members_data(user_ids)
+            self.assertEqual(patched_send_request.call_count, 2 * len(user_ids))
+
+            self.assertEqual([user.id for user in result], user_ids)
+            self.assertEqual(
+                [user.organization for user in result],
+                ['Org{}'.format(user_id) if user_id != 2 else None for user_id in user_ids]
+            )
+
+            # user details are cached
+            for user_id in user_ids:
+                self.project_api.get_user_details(user_id)
+            self.assertEqual(patched_send_request.call_count, 2 * len(user_ids))
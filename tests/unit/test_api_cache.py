@@ -0,0 +1,235 @@
+import json
+from datetime import datetime, timedelta
+from unittest import TestCase
+from urllib.error import HTTPError
+
+import ddt
+import mock
+from django.core.cache import caches
+from django.test.utils import override_settings
+
+from group_project_v2 import api_cache, metrics
+from group_project_v2.api_cache import DjangoCacheBackend, dumps, loads, make_key
+from group_project_v2.json_requests import GET
+from group_project_v2.project_api.api_implementation import TypedProjectAPI
+from group_project_v2.project_api.dtos import OrganisationDetails, UserDetails, WorkgroupDetails
+from group_project_v2.utils import memoize_with_expiration
+
+
+def _make_response(content, headers=None):
+    response = mock.Mock(headers=headers or {})
+    response.read.return_value = json.dumps(content).encode('utf8')
+    return response
+
+
+@ddt.ddt
+class TestSerialization(TestCase):
+    timestamp = datetime(2020, 1, 1, 12, 30)
+
+    def _round_trip(self, result):
+        return loads(dumps({'timestamp': self.timestamp, 'result': result}))
+
+    @ddt.data(
+        None,
+        [1, 'a', 1.5, True],
+        {'a': [1, {'b': None}]},
+        {'$s': 1},
+        (1, 2),
+        {'roles': {'instructor', 'staff'}},
+    )
+    def test_values(self, value):
+        entry = self._round_trip(value)
+        self.assertEqual(entry, {'timestamp': self.timestamp, 'result': value, 'validators': None})
+
+    def test_dtos(self):
+        workgroup = WorkgroupDetails(id=1, name="Group 1", users=[{'id': 2, 'username': 'user'}])
+        user = UserDetails(id=2, full_name="User Name", profile_image={'image_url_medium': '/image.png'})
+        organization = OrganisationDetails(name="Org", users=[1, 2])
+
+        restored_workgroup, restored_user, restored_organization = self._round_trip(
+            [workgroup, user, organization]
+        )['result']
+
+        self.assertIsInstance(restored_workgroup, WorkgroupDetails)
+        self.assertEqual(restored_workgroup.name, "Group 1")
+        self.assertEqual([(member.id, member.username) for member in restored_workgroup.users], [(2, 'user')])
+        self.assertIsInstance(restored_user, UserDetails)
+        self.assertEqual((restored_user.full_name, restored_user.profile_image_url), ("User Name", '/image.png'))
+        self.assertEqual(restored_organization.user_ids, {1, 2})
+
+    def test_compact(self):
+        data = dumps({'timestamp': self.timestamp, 'result': UserDetails(id=1)})
+        self.assertNotIn(' ', data)
+        self.assertNotIn('group_project_v2', data)
+
+    @ddt.data(object(), {1: 'a'})
+    def test_unsupported_values(self, value):
+        with self.assertRaises(TypeError):
+            dumps({'timestamp': self.timestamp, 'result': value})
+
+
+class TestMakeKey(TestCase):
+    def test_key(self):
+        def get_roles(project_api, user_id, course_id):  # pylint: disable=unused-argument
+            return None
+
+        key = make_key(get_roles, (TypedProjectAPI('http://lms'), 1), {'course_id': 'course-v1:Org+Course+Run'})
+
+        self.assertTrue(key.startswith(
+            'group_project_v2:api:2:tests.unit.test_api_cache.TestMakeKey.test_key.<locals>.get_roles'
+            ':course_id=course-v1:Org+Course+Run:'
+        ))
+        # same in every process - API instance is identified by server address
+        self.assertEqual(
+            key, make_key(get_roles, (TypedProjectAPI('http://lms'), 1, 'course-v1:Org+Course+Run'), {})
+        )
+        for other_args in ((TypedProjectAPI('http://lms2'), 1), (TypedProjectAPI('http://lms'), 2)):
+            self.assertNotEqual(key, make_key(get_roles, other_args, {'course_id': 'course-v1:Org+Course+Run'}))
+
+
+class TestSharedCache(TestCase):
+    def setUp(self):
+        settings_override = override_settings(
+            GROUP_PROJECT_V2_API_CACHE_BACKEND='group_project_v2.api_cache.DjangoCacheBackend',
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        api_cache.set_backend(None)
+        self.addCleanup(api_cache.set_backend, None)
+        caches['default'].clear()
+        metrics.REGISTRY.clear()
+        self.addCleanup(metrics.REGISTRY.clear)
+
+        self.project_api = TypedProjectAPI('http://lms')
+        self.method = mock.Mock(__name__='GET', return_value=_make_response({'id': 1, 'username': 'user'}))
+        self.func = mock.Mock(
+            __name__='get_user', __qualname__='get_user',
+            side_effect=lambda project_api, user_id: project_api.send_request(self.method, ('users', user_id))
+        )
+
+    def test_shared_between_processes(self):
+        # each decorated function has its own process cache, like a separate process would
+        get_user_worker1 = memoize_with_expiration()(self.func)
+        get_user_worker2 = memoize_with_expiration()(self.func)
+
+        self.assertEqual(get_user_worker1(self.project_api, 1), {'id': 1, 'username': 'user'})
+        self.assertEqual(get_user_worker2(self.project_api, 1), {'id': 1, 'username': 'user'})
+
+        self.assertEqual(self.method.call_count, 1)
+        self.assertEqual(metrics.CACHE_REQUESTS.get(cache='shared', result='hit'), 1)
+        self.assertEqual(metrics.CACHE_REQUESTS.get(cache='shared', result='miss'), 1)
+
+    def test_expired_shared_entry_not_used(self):
+        get_user_worker1 = memoize_with_expiration(expires_after=timedelta(0))(self.func)
+        get_user_worker2 = memoize_with_expiration(expires_after=timedelta(0))(self.func)
+
+        get_user_worker1(self.project_api, 1)
+        get_user_worker2(self.project_api, 1)
+
+        self.assertEqual(self.method.call_count, 2)
+
+    def test_backend_errors_ignored(self):
+        get_user = memoize_with_expiration()(self.func)
+        with mock.patch.object(DjangoCacheBackend, 'get', side_effect=IOError()), \
+                mock.patch.object(DjangoCacheBackend, 'set', side_effect=IOError()):
+            self.assertEqual(get_user(self.project_api, 1), {'id': 1, 'username': 'user'})
+
+    def test_unserializable_result_not_shared(self):
+        result = object()
+        func = mock.Mock(__name__='get_value', __qualname__='get_value', return_value=result)
+        get_value = memoize_with_expiration()(func)
+        self.assertIs(get_value(self.project_api, 1), result)
+        self.assertIs(get_value(self.project_api, 1), result)
+
+    def test_disabled(self):
+        api_cache.set_backend(None)
+        with override_settings(GROUP_PROJECT_V2_API_CACHE_BACKEND=None):
+            memoize_with_expiration()(self.func)(self.project_api, 1)
+            memoize_with_expiration()(self.func)(self.project_api, 1)
+        self.assertEqual(self.method.call_count, 2)
+
+
+class TestRevalidation(TestCase):
+    def setUp(self):
+        metrics.REGISTRY.clear()
+        self.addCleanup(metrics.REGISTRY.clear)
+        urlopen_patch = mock.patch('group_project_v2.json_requests.urlopen')
+        self.urlopen = urlopen_patch.start()
+        self.addCleanup(urlopen_patch.stop)
+
+        self.project_api = TypedProjectAPI('http://lms')
+        self.built = []
+
+        @memoize_with_expiration(expires_after=timedelta(0))
+        def get_user(user_id):
+            response = self.project_api.send_request(GET, ('api/server/users', user_id))
+            self.built.append(response)
+            return response
+
+        self.get_user = get_user
+
+    def _get_request_header(self, name):
+        return self.urlopen.call_args[1]['url'].get_header(name)
+
+    def test_not_modified(self):
+        self.urlopen.return_value = _make_response({'id': 1}, {'ETag': '"v1"', 'Last-Modified': 'Wed, 1 Jan 2020'})
+        self.assertEqual(self.get_user(1), {'id': 1})
+        self.assertIsNone(self._get_request_header('If-none-match'))
+
+        self.urlopen.side_effect = HTTPError('http://lms', 304, 'Not Modified', {}, None)
+        self.assertEqual(self.get_user(1), {'id': 1})
+        self.assertEqual(self._get_request_header('If-none-match'), '"v1"')
+        self.assertEqual(self._get_request_header('If-modified-since'), 'Wed, 1 Jan 2020')
+
+        self.assertEqual(len(self.built), 1)
+        self.assertEqual(metrics.CACHE_REVALIDATIONS.get(cache='get_user', result='not_modified'), 1)
+        self.assertEqual(metrics.API_REQUEST_ERRORS.get(http_method='GET', endpoint='/api/server/users/{id}/'), 0)
+
+    def test_modified(self):
+        self.urlopen.return_value = _make_response({'id': 1}, {'ETag': '"v1"'})
+        self.get_user(1)
+        self.urlopen.return_value = _make_response({'id': 1, 'name': 'New'}, {'ETag': '"v2"'})
+        self.assertEqual(self.get_user(1), {'id': 1, 'name': 'New'})
+        self.get_user(1)
+
+        self.assertEqual(self._get_request_header('If-none-match'), '"v2"')
+        self.assertEqual(metrics.CACHE_REVALIDATIONS.get(cache='get_user', result='modified'), 2)
+
+    def test_no_validators(self):
+        self.urlopen.return_value = _make_response({'id': 1})
+        self.get_user(1)
+        self.get_user(1)
+        self.assertIsNone(self._get_request_header('If-none-match'))
+
+    def test_nested_memoized_call_not_revalidated(self):
+        @memoize_with_expiration(expires_after=timedelta(0))
+        def get_user_with_groups(user_id):
+            return dict(self.get_user(user_id), groups=self.project_api.send_request(GET, ('api/server/groups',)))
+
+        self.urlopen.return_value = _make_response({'id': 1}, {'ETag': '"v1"'})
+        get_user_with_groups(1)
+        self.urlopen.reset_mock()
+        get_user_with_groups(1)
+
+        headers = [call[1]['url'].get_header('If-none-match') for call in self.urlopen.call_args_list]
+        self.assertEqual(headers, ['"v1"', None])
+
+
+@ddt.ddt
+class TestGetLatestEntry(TestCase):
+    older = {'timestamp': datetime(2020, 1, 1), 'result': 'older'}
+    newer = {'timestamp': datetime(2020, 1, 2), 'result': 'newer'}
+    same_time = {'timestamp': datetime(2020, 1, 2), 'result': 'same_time'}
+
+    @ddt.data(
+        ((None, None), None),
+        ((older, None), older),
+        ((None, newer), newer),
+        ((older, newer), newer),
+        ((newer, older), newer),
+        ((newer, same_time), newer),
+    )
+    @ddt.unpack
+    def test_get_latest_entry(self, entries, expected_entry):
+        self.assertIs(api_cache._get_latest_entry(*entries), expected_entry)  # pylint: disable=protected-access
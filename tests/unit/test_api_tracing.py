@@ -0,0 +1,183 @@
+import json
+import threading
+from unittest import TestCase
+
+import ddt
+import mock
+from django.test.utils import override_settings
+from xblock.core import XBlock
+from xblock.field_data import DictFieldData
+
+from group_project_v2 import api_tracing
+from group_project_v2.api_tracing import CACHE_HIT, CACHE_MISS, get_endpoint_template, propagate_trace, traced_request
+from group_project_v2.json_requests import GET
+from group_project_v2.mixins import ApiTracingXBlockMixin
+from group_project_v2.project_api.api_implementation import TypedProjectAPI
+from group_project_v2.utils import memoize_with_expiration
+
+
+class TracedXBlock(ApiTracingXBlockMixin, XBlock):
+    pass
+
+
+def _make_response(content):
+    response = mock.Mock()
+    response.read.return_value = json.dumps(content).encode('utf8')
+    return response
+
+
+@ddt.ddt
+class TestApiTracing(TestCase):
+    def setUp(self):
+        settings_override = override_settings(GROUP_PROJECT_V2_API_TRACING_SAMPLE_RATE=1)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.sink = mock.Mock()
+        api_tracing.set_sink(self.sink)
+        self.addCleanup(api_tracing.set_sink, None)
+        self.project_api = TypedProjectAPI('http://lms')
+        self.method = mock.Mock(__name__='GET', return_value=_make_response({'id': 1}))
+
+    def _send(self, *url_parts):
+        return self.project_api.send_request(self.method, url_parts)
+
+    def _get_summary(self):
+        self.assertEqual(self.sink.call_count, 1)
+        return self.sink.call_args[0][0]
+
+    @ddt.data(
+        ('http://lms/api/server/users/12/organizations/?page_size=0', '/api/server/users/{id}/organizations/'),
+        ('http://lms/api/server/workgroups/5', '/api/server/workgroups/{id}'),
+        (
+            'http://lms/api/server/courses/course-v1:Org+Course+Run/completions/',
+            '/api/server/courses/{key}/completions/'
+        ),
+        ('http://lms/api/server/submissions/0123456789abcdef0123/', '/api/server/submissions/{id}/'),
+        ('api/server/projects/', 'api/server/projects/'),
+    )
+    @ddt.unpack
+    def test_get_endpoint_template(self, url, expected_template):
+        self.assertEqual(get_endpoint_template(url), expected_template)
+
+    def test_trace(self):
+        block = mock.Mock()
+        with traced_request(block, 'student_view'):
+            self._send('api/server/users', 1)
+            self._send('api/server/users', 2, 'organizations')
+
+        summary = self._get_summary()
+        self.assertEqual(summary['view'], 'Mock.student_view')
+        self.assertEqual(summary['api_calls'], 2)
+        self.assertEqual(summary['api_bytes'], 2 * len(json.dumps({'id': 1})))
+        self.assertEqual(
+            [(call['method'], call['endpoint'], call['cache']) for call in summary['calls']],
+            [('GET', '/api/server/users/{id}/', None), ('GET', '/api/server/users/{id}/organizations/', None)]
+        )
+        self.assertEqual(summary['n_plus_one'], [])
+
+    def test_trace_n_plus_one(self):
+        with traced_request(mock.Mock(), 'student_view'):
+            for user_id in range(4):
+                self._send('api/server/users', user_id)
+            self._send('api/server/workgroups', 1)
+
+        self.assertEqual(
+            self._get_summary()['n_plus_one'],
+            [{'method': 'GET', 'endpoint': '/api/server/users/{id}/', 'count': 4}]
+        )
+
+    def test_trace_cache(self):
+        @memoize_with_expiration()
+        def get_user(user_id):
+            return self._send('api/server/users', user_id)
+
+        with traced_request(mock.Mock(), 'student_view'):
+            get_user(1)
+            get_user(1)
+
+        summary = self._get_summary()
+        self.assertEqual((summary['api_calls'], summary['cache_hits'], summary['cache_misses']), (1, 1, 1))
+        self.assertEqual([call['cache'] for call in summary['calls']], [CACHE_MISS, CACHE_HIT])
+
+    def test_trace_error(self):
+        self.method.side_effect = ValueError("error")
+        with self.assertRaises(ValueError), traced_request(mock.Mock(), 'student_view'):
+            self._send('api/server/users', 1)
+
+        self.assertEqual(self._get_summary()['calls'][0]['error'], 'ValueError')
+
+    def test_nested_requests_traced_once(self):
+        with traced_request(mock.Mock(), 'student_view'):
+            with traced_request(mock.Mock(), 'author_view'):
+                self._send('api/server/users', 1)
+            self.sink.assert_not_called()
+
+        self.assertEqual(self._get_summary()['view'], 'Mock.student_view')
+
+    def test_propagate_trace(self):
+        with traced_request(mock.Mock(), 'student_view'):
+            worker = threading.Thread(target=propagate_trace(lambda: self._send('api/server/users', 1)))
+            worker.start()
+            worker.join()
+            # not propagated
+            worker = threading.Thread(target=lambda: self._send('api/server/users', 2))
+            worker.start()
+            worker.join()
+
+        self.assertEqual(self._get_summary()['api_calls'], 1)
+
+    def test_propagate_trace_cache_miss(self):
+        with traced_request(mock.Mock(), 'student_view'):
+            with api_tracing.cache_miss():
+                worker_func = propagate_trace(lambda: self._send('api/server/users', 1))
+            worker = threading.Thread(target=worker_func)
+            worker.start()
+            worker.join()
+
+        self.assertEqual([call['cache'] for call in self._get_summary()['calls']], [CACHE_MISS])
+
+    def test_propagate_trace_same_thread(self):
+        with traced_request(mock.Mock(), 'student_view'):
+            propagate_trace(lambda: self._send('api/server/users', 1))()
+            # trace is restored after wrapped function is called in thread owning it
+            self._send('api/server/users', 2)
+
+        self.assertEqual(self._get_summary()['api_calls'], 2)
+
+    @ddt.data(0, 0.5)
+    def test_not_sampled(self, sample_rate):
+        with override_settings(GROUP_PROJECT_V2_API_TRACING_SAMPLE_RATE=sample_rate), \
+                mock.patch.object(api_tracing.random, 'random', mock.Mock(return_value=0.5)):
+            with traced_request(mock.Mock(), 'student_view'):
+                self._send('api/server/users', 1)
+
+        self.sink.assert_not_called()
+        self.assertIsNone(api_tracing.get_current_trace())
+
+    def test_sink_error_suppressed(self):
+        self.sink.side_effect = ValueError("error")
+        with traced_request(mock.Mock(), 'student_view'):
+            self._send('api/server/users', 1)
+        self.assertIsNone(api_tracing.get_current_trace())
+
+    def test_log_sink(self):
+        api_tracing.set_sink(None)
+        with mock.patch.object(api_tracing, 'log') as log_mock, traced_request(mock.Mock(), 'student_view'):
+            for user_id in range(3):
+                self._send('api/server/users', user_id)
+
+        self.assertEqual(log_mock.info.call_count, 1)
+        self.assertEqual(log_mock.warning.call_count, 1)
+
+    def test_block_handler_traced(self):
+        runtime = mock.Mock()
+        runtime.handle.side_effect = lambda block, handler_name, request, suffix: self._send('api/server/users', 1)
+        block = TracedXBlock(runtime, field_data=DictFieldData({}), scope_ids=mock.Mock())
+
+        block.handle('refresh', mock.Mock())
+
+        runtime.handle.assert_called_once_with(block, 'refresh', mock.ANY, '')
+        self.assertEqual(self._get_summary()['view'], 'TracedXBlock.refresh')
+
+    def test_http_method_name(self):
+        self.assertEqual(GET.__name__, 'GET')
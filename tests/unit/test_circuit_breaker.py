@@ -0,0 +1,164 @@
+import json
+import socket
+from datetime import timedelta
+from unittest import TestCase
+from urllib.error import HTTPError, URLError
+
+import ddt
+import mock
+from django.test.utils import override_settings
+
+from group_project_v2 import circuit_breaker, metrics
+from group_project_v2.api_error import ApiCircuitOpenError, ApiConnectionError, ApiError
+from group_project_v2.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+from group_project_v2.json_requests import GET, TIMEOUT, get_timeout
+from group_project_v2.project_api.api_implementation import TypedProjectAPI
+from group_project_v2.utils import memoize_with_expiration
+
+
+def _make_response(content):
+    response = mock.Mock()
+    response.read.return_value = json.dumps(content).encode('utf8')
+    return response
+
+
+def _make_http_error(code):
+    return HTTPError('http://lms', code, 'error', {}, mock.Mock(read=mock.Mock(return_value=b'{}')))
+
+
+@ddt.ddt
+class TestCircuitBreaker(TestCase):
+    def setUp(self):
+        settings_override = override_settings(GROUP_PROJECT_V2_API_CIRCUIT_BREAKER={
+            'window': 4, 'min_calls': 4, 'failure_rate': 0.5, 'reset_timeout': 10,
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        circuit_breaker.reset()
+        self.addCleanup(circuit_breaker.reset)
+        metrics.REGISTRY.clear()
+        self.addCleanup(metrics.REGISTRY.clear)
+
+        self.time = 1000.0
+        time_patch = mock.patch.object(circuit_breaker.time, 'monotonic', side_effect=lambda: self.time)
+        time_patch.start()
+        self.addCleanup(time_patch.stop)
+
+        self.project_api = TypedProjectAPI('http://lms')
+        self.method = mock.Mock(__name__='GET', return_value=_make_response({'id': 1}))
+
+    def _send(self, user_id=1):
+        return self.project_api.send_request(self.method, ('api/server/users', user_id))
+
+    def _fail(self, times, error=None):
+        self.method.side_effect = error or _make_http_error(500)
+        for _ in range(times):
+            with self.assertRaises(ApiError):
+                self._send()
+        self.method.side_effect = None
+
+    def _get_state(self):
+        return circuit_breaker.get_breaker('http://lms/api/server/users/1/').state
+
+    def test_opens_on_failure_rate(self):
+        self._send()
+        self._fail(2)
+        self.assertEqual(self._get_state(), CLOSED)
+        self._fail(1)
+        self.assertEqual(self._get_state(), OPEN)
+
+        self.method.reset_mock()
+        with self.assertRaises(ApiCircuitOpenError) as raised:
+            self._send(2)
+        self.method.assert_not_called()
+        self.assertEqual(raised.exception.code, 503)
+        self.assertEqual(raised.exception.retry_after, 10)
+        self.assertEqual(metrics.API_CIRCUIT_REJECTIONS.get(endpoint='/api/server/users/{id}/'), 1)
+
+    def test_endpoints_tracked_separately(self):
+        self._fail(4)
+        self.method.return_value = _make_response([])
+        self.project_api.send_request(self.method, ('api/server/users', 1, 'organizations'))
+        self.method.assert_called()
+
+    @ddt.data(
+        _make_http_error(503),
+        URLError(socket.timeout('timed out')),
+        socket.timeout('timed out'),
+        ConnectionRefusedError(),
+    )
+    def test_failures(self, error):
+        self._fail(4, error)
+        self.assertEqual(self._get_state(), OPEN)
+
+    @ddt.data(_make_http_error(404), ValueError())
+    def test_not_failures(self, error):
+        self.method.side_effect = error
+        for _ in range(4):
+            with self.assertRaises(Exception):
+                self._send()
+        self.assertEqual(self._get_state(), CLOSED)
+
+    def test_connection_error_converted(self):
+        self.method.side_effect = URLError('connection refused')
+        with self.assertRaises(ApiConnectionError) as raised:
+            self._send()
+        self.assertEqual((raised.exception.code, raised.exception.message), (503, 'connection refused'))
+
+    def test_half_open_probe_closes(self):
+        self._fail(4)
+        self.time += 10
+
+        breaker = circuit_breaker.get_breaker('http://lms/api/server/users/1/')
+        breaker.before_call()
+        self.assertEqual(breaker.state, HALF_OPEN)
+        # only one probe at a time
+        with self.assertRaises(ApiCircuitOpenError):
+            self._send()
+        breaker.record_success()
+
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(self._send(), {'id': 1})
+
+    def test_half_open_probe_reopens(self):
+        self._fail(4)
+        self.time += 10
+        self._fail(1)
+        self.assertEqual(self._get_state(), OPEN)
+
+        self.time += 5
+        with self.assertRaises(ApiCircuitOpenError) as raised:
+            self._send()
+        self.assertEqual(raised.exception.retry_after, 5)
+        self.assertEqual(metrics.API_CIRCUIT_TRANSITIONS.get(endpoint='/api/server/users/{id}/', state=OPEN), 2)
+
+    def test_disabled(self):
+        with override_settings(GROUP_PROJECT_V2_API_CIRCUIT_BREAKER={'enabled': False}):
+            self._fail(10)
+            self.assertEqual(self._send(), {'id': 1})
+
+    def test_stale_cache_served(self):
+        @memoize_with_expiration(expires_after=timedelta(0))
+        def get_user(user_id):
+            return self._send(user_id)
+
+        self.assertEqual(get_user(1), {'id': 1})
+        self._fail(4)
+
+        self.assertEqual(get_user(1), {'id': 1})
+        with self.assertRaises(ApiCircuitOpenError):
+            get_user(2)
+        self.assertEqual(metrics.API_CIRCUIT_STALE_RESULTS.get(cache='get_user'), 1)
+
+
+class TestTimeouts(TestCase):
+    @override_settings(GROUP_PROJECT_V2_API_TIMEOUTS={'GET': 5})
+    def test_get_timeout(self):
+        self.assertEqual(get_timeout('GET'), 5)
+        self.assertEqual(get_timeout('POST'), TIMEOUT)
+
+    @override_settings(GROUP_PROJECT_V2_API_TIMEOUTS={'GET': 3})
+    def test_request_timeout(self):
+        with mock.patch('group_project_v2.json_requests.urlopen') as urlopen_mock:
+            GET('http://lms/api/server/users/1/')
+        self.assertEqual(urlopen_mock.call_args[1]['timeout'], 3)
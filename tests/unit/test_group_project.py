@@ -10,6 +10,7 @@ from xblock.field_data import DictFieldData
 from xblock.fields import ScopeIds
 from xblock.runtime import Runtime
 
+from group_project_v2 import metrics
 from group_project_v2.group_project import GroupActivityXBlock, GroupProjectXBlock
 from group_project_v2.project_api import TypedProjectAPI
 from group_project_v2.project_api.dtos import ProjectDetails, ReducedUserDetails, WorkgroupDetails
@@ -141,6 +142,27 @@ class TestGroupProjectXBlock(TestWithPatchesMixin, TestCase):
         self.assertEqual(lines[0], csv_repr(all_users[1]))
         self.assertEqual(lines[1], csv_repr(all_users[2]))
 
+    def test_export_metrics(self):
+        self.make_patch(self.block, 'can_access_dashboard', mock.Mock(return_value=True))
+        self.make_patch(self.block, 'user_id', 1)
+
+        response = self.block.export_metrics(mock.Mock())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Type'], metrics.CONTENT_TYPE)
+        self.assertIn(u"# TYPE group_project_v2_api_method_duration_seconds histogram", response.text)
+        self.block.can_access_dashboard.assert_called_once_with(1)
+
+    def test_export_metrics_access_denied(self):
+        self.make_patch(self.block, 'can_access_dashboard', mock.Mock(return_value=False))
+        self.make_patch(self.block, 'user_id', 1)
+        self.make_patch(self.block, '_', mock.Mock(side_effect=lambda text: text))
+
+        response = self.block.export_metrics(mock.Mock())
+
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn(u"group_project_v2_", response.text)
+
 
 @ddt.ddt
 class TestGroupActivityXBlock(TestWithPatchesMixin, TestCase):
@@ -0,0 +1,251 @@
+import gzip
+import io
+import json
+import zlib
+from unittest import TestCase
+from urllib.error import HTTPError
+
+import ddt
+import mock
+from django.test.utils import override_settings
+
+from group_project_v2 import json_requests, metrics
+from group_project_v2.api_error import ApiError
+from group_project_v2.json_requests import GET, JSONObjectStream, ResponseBody, loads
+from group_project_v2.project_api.api_implementation import TypedProjectAPI
+
+
+class ChunkedStream(io.BytesIO):
+    """
+    Returns at most `chunk_size` bytes per read, regardless of requested size - like a response arriving in packets
+    """
+    def __init__(self, content, chunk_size):
+        super(ChunkedStream, self).__init__(content)
+        self.chunk_size = chunk_size
+
+    def read(self, size=-1):  # pylint: disable=unused-argument
+        return super(ChunkedStream, self).read(self.chunk_size)
+
+
+def _raw_deflate(content):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(content) + compressor.flush()
+
+
+COMPRESSORS = {
+    'gzip': gzip.compress,
+    'deflate': zlib.compress,
+}
+
+
+@ddt.ddt
+class TestResponseBody(TestCase):
+    content = json.dumps([{'id': item_id, 'content_id': 'content'} for item_id in range(1000)]).encode('utf-8')
+
+    def _make_response(self, content, encoding, chunk_size=1024):
+        return mock.Mock(wraps=ChunkedStream(content, chunk_size), headers={'Content-Encoding': encoding})
+
+    @ddt.data('gzip', 'GZIP', 'deflate')
+    def test_decompressed(self, encoding):
+        compressed = COMPRESSORS[encoding.lower()](self.content)
+        body = ResponseBody(self._make_response(compressed, encoding))
+
+        self.assertEqual(body.read(), self.content)
+        self.assertEqual(body.bytes_read, len(compressed))
+        self.assertLess(body.bytes_read, len(self.content))
+
+    def test_raw_deflate(self):
+        body = ResponseBody(self._make_response(_raw_deflate(self.content), 'deflate'))
+        self.assertEqual(body.read(), self.content)
+
+    @ddt.data(1, 100, 64 * 1024)
+    def test_read_in_chunks(self, chunk_size):
+        body = ResponseBody(self._make_response(gzip.compress(self.content), 'gzip', chunk_size))
+
+        chunks = list(iter(lambda: body.read(chunk_size), b''))
+
+        self.assertEqual(b''.join(chunks), self.content)
+        self.assertTrue(all(len(chunk) <= chunk_size for chunk in chunks))
+
+    @ddt.data({}, {'Content-Encoding': 'identity'})
+    def test_not_compressed(self, headers):
+        response = mock.Mock(wraps=io.BytesIO(self.content), headers=headers)
+        body = ResponseBody(response)
+        self.assertEqual(body.read(10), self.content[:10])
+        self.assertEqual(body.read(), self.content[10:])
+        self.assertEqual(body.bytes_read, len(self.content))
+
+    def test_unsupported_encoding(self):
+        with self.assertRaises(ValueError):
+            ResponseBody(self._make_response(self.content, 'br'))
+
+    def test_streamed(self):
+        page = {'next': None, 'results': json.loads(self.content.decode('utf-8'))}
+        compressed = gzip.compress(json.dumps(page).encode('utf-8'))
+        stream = JSONObjectStream(ResponseBody(self._make_response(compressed, 'gzip')), 'results', 256)
+
+        self.assertEqual([value for key, value in stream if key == 'results'], page['results'])
+
+
+class TestCompressionNegotiation(TestCase):
+    url = 'http://lms/api/server/users/1/'
+
+    def setUp(self):
+        urlopen_patch = mock.patch('group_project_v2.json_requests.urlopen')
+        self.urlopen = urlopen_patch.start()
+        self.addCleanup(urlopen_patch.stop)
+
+    def _get_request_header(self, name):
+        return self.urlopen.call_args[1]['url'].get_header(name)
+
+    def test_accept_encoding(self):
+        GET(self.url)
+        self.assertEqual(self._get_request_header('Accept-encoding'), 'deflate, gzip')
+
+    @override_settings(GROUP_PROJECT_V2_API_COMPRESSION=False)
+    def test_disabled(self):
+        GET(self.url)
+        self.assertIsNone(self._get_request_header('Accept-encoding'))
+
+    def test_compressed_response(self):
+        self.urlopen.return_value = mock.Mock(
+            wraps=io.BytesIO(gzip.compress(b'{"id": 1}')), headers={'Content-Encoding': 'gzip'}, code=200
+        )
+        self.assertEqual(TypedProjectAPI('http://lms').send_request(GET, ('api/server/users', 1)), {'id': 1})
+
+    def test_compressed_error(self):
+        body = io.BytesIO(gzip.compress(b'{"message": "User not found"}'))
+        self.urlopen.side_effect = HTTPError(self.url, 404, 'Not Found', {'Content-Encoding': 'gzip'}, body)
+        with self.assertRaises(ApiError) as raised:
+            TypedProjectAPI('http://lms').send_request(GET, ('api/server/users', 1))
+        self.assertEqual(raised.exception.message, "User not found")
+
+
+@ddt.ddt
+class TestLoads(TestCase):
+    @ddt.data(
+        {'id': 1, 'name': u'Zoë', 'ratio': 0.5, 'tags': [], 'group': None, 'active': True},
+        [{'id': 1}, {'id': 2}],
+    )
+    def test_loads(self, value):
+        content = json.dumps(value).encode('utf-8')
+        self.assertEqual(loads(content), value)
+        with mock.patch.object(json_requests, 'orjson', None):
+            self.assertEqual(loads(content), value)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            loads(b'{"id": ')
+
+
+@ddt.ddt
+class TestJSONObjectStream(TestCase):
+    page = {
+        'count': 3,
+        'next': 'http://lms/api/server/courses/course1/completions/?page=2',
+        'results': [
+            {'id': 1, 'user_id': 10, 'content_id': u'блок', 'completed': True},
+            {'id': 23456789, 'user_id': 11, 'content_id': 'content', 'completed': False},
+            {'id': 3, 'user_id': 12, 'content_id': 'content', 'stage': {'nested': [1, 2.5, None]}},
+        ],
+        'previous': None,
+    }
+
+    @ddt.data(1, 2, 7, 64 * 1024)
+    def test_members_and_items(self, chunk_size):
+        content = json.dumps(self.page, indent=2).encode('utf-8')
+        stream = JSONObjectStream(ChunkedStream(content, chunk_size), 'results', chunk_size)
+
+        members = list(stream)
+
+        expected = [('count', 3), ('next', self.page['next'])]
+        expected += [('results', item) for item in self.page['results']]
+        expected += [('previous', None)]
+        self.assertEqual(members, expected)
+        self.assertEqual(stream.bytes_read, len(content))
+
+    def test_items_decoded_lazily(self):
+        content = json.dumps(self.page).encode('utf-8')
+        response = ChunkedStream(content, 16)
+        members = iter(JSONObjectStream(response, 'results', 16))
+
+        self.assertEqual(next(members), ('count', 3))
+        self.assertLess(response.tell(), len(content))
+
+    @ddt.data(b'{}', b' { } ', b'{"results": []}')
+    def test_empty(self, content):
+        self.assertEqual(list(JSONObjectStream(io.BytesIO(content), 'results')), [])
+
+    def test_list_key_not_a_list(self):
+        content = b'{"results": {"id": 1}}'
+        self.assertEqual(list(JSONObjectStream(io.BytesIO(content), 'results')), [('results', {'id': 1})])
+
+    @ddt.data(b'', b'[1, 2]', b'{"results": [1, 2', b'{"results": [1 2]}', b'{"count": 1, }', b'{"count": tru}')
+    def test_invalid(self, content):
+        with self.assertRaises(ValueError):
+            list(JSONObjectStream(ChunkedStream(content, 3), 'results', 3))
+
+
+class TestPagedResponseStreaming(TestCase):
+    def setUp(self):
+        metrics.REGISTRY.clear()
+        self.addCleanup(metrics.REGISTRY.clear)
+        self.project_api = TypedProjectAPI('http://lms')
+        self.url = 'http://lms/api/server/courses/course-v1:Org+Course+Run/completions/'
+        self.pages = {
+            self.url: {'next': self.url + '?page=2', 'results': [{'id': 1}, {'id': 2}]},
+            self.url + '?page=2': {'results': [{'id': 3}], 'next': None},
+        }
+        self.responses = []
+
+    def _get(self, url):
+        response = mock.Mock(wraps=io.BytesIO(json.dumps(self.pages[url]).encode('utf-8')), headers={})
+        self.responses.append(response)
+        return response
+
+    def test_pages(self):
+        method = mock.Mock(__name__='GET', side_effect=self._get)
+
+        items = list(self.project_api._consume_paged_response(method, self.url))  # pylint: disable=protected-access
+
+        self.assertEqual(items, [{'id': 1}, {'id': 2}, {'id': 3}])
+        self.assertEqual(
+            method.mock_calls, [mock.call(self.url), mock.call(self.url + '?page=2')]
+        )
+        for response in self.responses:
+            response.close.assert_called_once_with()
+        self.assertEqual(
+            metrics.API_REQUEST_DURATION.get(http_method='GET', endpoint='/api/server/courses/{key}/completions/')[0], 2
+        )
+
+    def test_stopped_early(self):
+        method = mock.Mock(__name__='GET', side_effect=self._get)
+
+        items = self.project_api._consume_paged_response(method, self.url)  # pylint: disable=protected-access
+        self.assertEqual(next(items), {'id': 1})
+        items.close()
+
+        self.assertEqual(len(self.responses), 1)
+        self.responses[0].close.assert_called_once_with()
+        self.assertEqual(
+            metrics.API_REQUEST_ERRORS.get(http_method='GET', endpoint='/api/server/courses/{key}/completions/'), 0
+        )
+
+    def test_measured_until_headers(self):
+        method = mock.Mock(__name__='GET', side_effect=self._get)
+        endpoint = '/api/server/courses/{key}/completions/'
+
+        items = self.project_api._consume_paged_response(method, self.url)  # pylint: disable=protected-access
+        self.assertEqual(next(items), {'id': 1})
+
+        # request is measured while caller is still consuming the response
+        self.assertEqual(metrics.API_REQUEST_DURATION.get(http_method='GET', endpoint=endpoint)[0], 1)
+        list(items)
+        self.assertEqual(metrics.API_REQUEST_DURATION.get(http_method='GET', endpoint=endpoint)[0], 2)
+
+    def test_error_while_iterating_converted(self):
+        with mock.patch('group_project_v2.json_requests.urlopen') as urlopen:
+            urlopen.return_value.read.side_effect = ConnectionResetError()
+            with self.assertRaises(ApiError) as raised:
+                list(self.project_api._consume_paged_response(GET, self.url))  # pylint: disable=protected-access
+        self.assertEqual(raised.exception.code, 503)
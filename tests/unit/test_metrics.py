@@ -0,0 +1,188 @@
+import json
+import time
+from unittest import TestCase
+
+import mock
+from web_fragments.fragment import Fragment
+
+from group_project_v2 import metrics
+from group_project_v2.metrics import Counter, Histogram, Registry, instrument_methods, measured_request
+from group_project_v2.project_api.api_implementation import TypedProjectAPI
+from group_project_v2.utils import FragmentCache, memoize_with_expiration
+
+
+class TestMetrics(TestCase):
+    def setUp(self):
+        self.registry = Registry()
+        self.counter = self.registry.register(Counter('test_total', "Test counter", ('kind',)))
+        self.histogram = self.registry.register(Histogram('test_seconds', "Test histogram", buckets=(0.1, 1)))
+
+    def test_render(self):
+        self.counter.inc(kind='a')
+        self.counter.inc(2, kind='b"')
+        for value in (0.05, 0.5, 5):
+            self.histogram.observe(value)
+
+        self.assertEqual(self.registry.render(), "\n".join([
+            '# HELP test_seconds Test histogram',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{le="0.1"} 1.0',
+            'test_seconds_bucket{le="1.0"} 2.0',
+            'test_seconds_bucket{le="+Inf"} 3.0',
+            'test_seconds_sum 5.55',
+            'test_seconds_count 3.0',
+            '# HELP test_total Test counter',
+            '# TYPE test_total counter',
+            'test_total{kind="a"} 1.0',
+            'test_total{kind="b\\""} 2.0',
+            '',
+        ]))
+
+    def test_labels_validated(self):
+        with self.assertRaises(ValueError):
+            self.counter.inc()
+        with self.assertRaises(ValueError):
+            self.histogram.observe(1, kind='a')
+
+    def test_register_duplicate(self):
+        with self.assertRaises(ValueError):
+            self.registry.register(Counter('test_total', "Duplicate"))
+
+    def test_clear(self):
+        self.counter.inc(kind='a')
+        self.registry.clear()
+        self.assertEqual(self.counter.get(kind='a'), 0)
+
+    def test_timed(self):
+        @self.histogram.timed()
+        def func():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            func()
+        self.assertEqual(self.histogram.get()[0], 1)
+
+    def test_instrument_methods(self):
+        histogram = Histogram('test_method_seconds', "Test", ('method',))
+
+        @instrument_methods(histogram)
+        class Instrumented(object):
+            def public(self):
+                return self._private()
+
+            def _private(self):  # pylint: disable=no-self-use
+                return 1
+
+        self.assertEqual(Instrumented().public(), 1)
+        self.assertEqual(Instrumented.public.__name__, 'public')
+        self.assertEqual(histogram.get(method='public')[0], 1)
+        self.assertEqual(histogram.get(method='_private')[0], 0)
+
+    def test_timed_generator(self):
+        def generator():
+            time.sleep(0.01)
+            yield 1
+            time.sleep(0.01)
+            yield 2
+
+        timed_generator = self.histogram.timed()(generator)
+        items = timed_generator()
+        self.assertEqual(self.histogram.get(), (0, 0.0))
+
+        self.assertEqual(next(items), 1)
+        time.sleep(0.2)  # time spent by the caller is not observed
+        self.assertEqual(list(items), [2])
+        count, duration = self.histogram.get()
+        self.assertEqual(count, 1)
+        self.assertGreaterEqual(duration, 0.02)
+        self.assertLess(duration, 0.2)
+
+    def test_timed_generator_closed_early(self):
+        @self.histogram.timed()
+        def generator():
+            yield 1
+            yield 2
+
+        items = generator()
+        self.assertEqual(next(items), 1)
+        items.close()
+        self.assertEqual(self.histogram.get()[0], 1)
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        metrics.REGISTRY.clear()
+        self.addCleanup(metrics.REGISTRY.clear)
+
+    def _send_request(self, project_api, method):
+        project_api.send_request(method, ('api/server/users', 1))
+
+    def test_api_request(self):
+        project_api = TypedProjectAPI('http://lms')
+        response = mock.Mock()
+        response.read.return_value = json.dumps({}).encode('utf8')
+        method = mock.Mock(__name__='GET', return_value=response)
+
+        with measured_request(mock.Mock(), 'student_view'):
+            self._send_request(project_api, method)
+            method.side_effect = ValueError()
+            with self.assertRaises(ValueError):
+                self._send_request(project_api, method)
+
+        labels = {'http_method': 'GET', 'endpoint': '/api/server/users/{id}/'}
+        self.assertEqual(metrics.API_REQUEST_DURATION.get(**labels)[0], 2)
+        self.assertEqual(metrics.API_REQUEST_ERRORS.get(**labels), 1)
+        self.assertEqual(metrics.API_METHOD_DURATION.get(method='send_request')[0], 2)
+        self.assertEqual(metrics.VIEW_API_REQUESTS.get(view='Mock.student_view'), (1, 2.0))
+
+    def test_nested_requests_measured_once(self):
+        with measured_request(mock.Mock(), 'student_view'), measured_request(mock.Mock(), 'author_view'):
+            metrics.observe_api_request('GET', '/api/server/users/{id}/', 0.1)
+
+        self.assertEqual(metrics.VIEW_API_REQUESTS.get(view='Mock.student_view'), (1, 1.0))
+        self.assertEqual(metrics.VIEW_API_REQUESTS.get(view='Mock.author_view'), (0, 0.0))
+
+    def test_bulk_api_requests(self):
+        project_api = TypedProjectAPI('http://lms')
+        response = mock.Mock()
+        response.read.return_value = json.dumps([]).encode('utf8')
+
+        with measured_request(mock.Mock(), 'student_view'), \
+                mock.patch('group_project_v2.project_api.api_implementation.GET') as patched_get:
+            patched_get.__name__ = 'GET'
+            patched_get.return_value = response
+            project_api.get_latest_submissions_by_workgroup([1, 2, 3])
+
+        self.assertEqual(patched_get.call_count, 3)
+        self.assertEqual(metrics.VIEW_API_REQUESTS.get(view='Mock.student_view'), (1, 3.0))
+
+    def test_memoized_cache_lookups(self):
+        @memoize_with_expiration()
+        def get_value(value):
+            return value
+
+        get_value(1)
+        get_value(1)
+        get_value(2)
+
+        self.assertEqual(metrics.CACHE_REQUESTS.get(cache='get_value', result='hit'), 1)
+        self.assertEqual(metrics.CACHE_REQUESTS.get(cache='get_value', result='miss'), 2)
+
+    def test_fragment_cache_lookups(self):
+        cache = FragmentCache(name='test')
+        cache.get('key')
+        cache.set('key', Fragment(u"content"))
+        cache.get('key')
+
+        self.assertEqual(metrics.CACHE_REQUESTS.get(cache='test', result='hit'), 1)
+        self.assertEqual(metrics.CACHE_REQUESTS.get(cache='test', result='miss'), 1)
+
+    def test_upload(self):
+        with metrics.measured_upload(mock.Mock(size=2048)):
+            pass
+        with self.assertRaises(IOError), metrics.measured_upload(mock.Mock(spec=[])):
+            raise IOError()
+
+        self.assertEqual(metrics.UPLOAD_SIZE.get(), (1, 2048))
+        self.assertEqual(metrics.UPLOAD_DURATION.get(result='success')[0], 1)
+        self.assertEqual(metrics.UPLOAD_DURATION.get(result='failure')[0], 1)
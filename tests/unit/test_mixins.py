@@ -95,36 +95,49 @@ class TestChildrenNavigationXBlockMixin(TestWithPatchesMixin, TestCase):
             child_with_no_target_props), None)
 
     def test_get_children_by_category(self):
-        child_categories = {
-            'block_1': 'category_1',
-            'block_1_2': 'category_1',
-            'block_2': 'category_2',
-            'block_3': 'category_3'
-        }
+        # workbench usage ids - block type is the second component
         self.children_mock.return_value = [
-            'block_1', 'block_1_2', 'block_2', 'block_3']
-        self.runtime_mock.get_block.side_effect = lambda block_id: _make_block_mock(
-            block_id, child_categories.get(block_id, None)
-        )
+            'scenario.category_1.block_1', 'scenario.category_1.block_1_2',
+            'scenario.category_2.block_2', 'scenario.category_3.block_3'
+        ]
+        self.runtime_mock.get_block.side_effect = lambda block_id: _make_block_mock(block_id, block_id.split('.')[1])
 
         def do_assert(expected_ids, *categories):
             response = self.block.get_children_by_category(*categories)
             response_ids = [block.usage_id for block in response]
             self.assertEqual(response_ids, expected_ids)
 
-        do_assert(['block_1', 'block_1_2'], 'category_1')
-        do_assert(['block_2'], 'category_2')
-        do_assert(['block_3'], 'category_3')
-        do_assert(['block_2', 'block_3'], 'category_2', 'category_3')
+        do_assert(['scenario.category_1.block_1', 'scenario.category_1.block_1_2'], 'category_1')
+        do_assert(['scenario.category_2.block_2'], 'category_2')
+        do_assert(['scenario.category_3.block_3'], 'category_3')
+        do_assert(['scenario.category_2.block_2', 'scenario.category_3.block_3'], 'category_2', 'category_3')
         do_assert([], 'missing_category')
 
-        self.assertEqual(self.block.get_child_of_category('category_1').usage_id, 'block_1')
-        self.assertEqual(self.block.get_child_of_category('category_2').usage_id, 'block_2')
-        self.assertEqual(self.block.get_child_of_category('category_3').usage_id, 'block_3')
+        self.assertEqual(self.block.get_child_of_category('category_1').usage_id, 'scenario.category_1.block_1')
+        self.assertEqual(self.block.get_child_of_category('category_2').usage_id, 'scenario.category_2.block_2')
+        self.assertEqual(self.block.get_child_of_category('category_3').usage_id, 'scenario.category_3.block_3')
 
         self.assertIsNone(self.block.get_child_of_category('missing_category'))
         self.assertIsNone(self.block.get_child_of_category('other_missing_category'))
 
+    def test_get_children_by_category_loads_matching_children(self):
+        self.children_mock.return_value = [
+            'scenario.category_1.block_1', 'scenario.category_2.block_2', 'scenario.category_2.block_3'
+        ]
+
+        self.assertEqual(
+            [child.usage_id for child in self.block.get_children_by_category('category_1')],
+            ['scenario.category_1.block_1']
+        )
+        self.runtime_mock.get_block.assert_called_once_with('scenario.category_1.block_1')
+
+        self.assertEqual(self.block.get_child_of_category('category_2').usage_id, 'scenario.category_2.block_2')
+        self.assertEqual(self.block.get_child_of_category('category_1').usage_id, 'scenario.category_1.block_1')
+        self.assertEqual(
+            self.runtime_mock.get_block.call_args_list,
+            [mock.call('scenario.category_1.block_1'), mock.call('scenario.category_2.block_2')]
+        )
+
     def test_has_child_of_category(self):
         def _make_block_usage(block_id, block_type):
             result = mock.Mock(spec=BlockUsageLocator)
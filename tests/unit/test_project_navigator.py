@@ -0,0 +1,264 @@
+import json
+from unittest import TestCase
+
+import ddt
+import mock
+import pkg_resources
+from django.utils import translation
+from web_fragments.fragment import Fragment
+from webob import Request
+from xblock.field_data import DictFieldData
+from xblock.runtime import Runtime
+
+import group_project_v2
+import group_project_v2.project_navigator
+import group_project_v2.static_bundles
+from group_project_v2.apps import GroupProjectV2Config
+from group_project_v2.project_navigator import (
+    GroupProjectNavigatorXBlock,
+    NavigationViewXBlock,
+    ViewTypes,
+    warm_up_translations,
+)
+from group_project_v2.stage.utils import StageState
+from group_project_v2.utils import Constants, GroupworkAccessDeniedError
+from tests.utils import TestWithPatchesMixin
+
+
+def _make_view(view_type, skip_content=False):
+    view = mock.Mock()
+    view.type = view_type
+    view.skip_content = skip_content
+    view.skip_selector = False
+    view.scope_ids.usage_id = "usage/{}".format(view_type)
+
+    def render(view_name, _context):
+        fragment = Fragment(u"{} {}".format(view_type, view_name))
+        fragment.add_css(u".{} {{}}".format(view_type))
+        return fragment
+
+    view.render.side_effect = render
+    return view
+
+
+class StubStageA(object):
+    get_stage_states = mock.Mock()
+
+    def __init__(self, stage_id, activity_id):
+        self.id = stage_id
+        self.activity = mock.Mock(id=activity_id)
+
+
+class StubStageB(StubStageA):
+    get_stage_states = mock.Mock()
+
+
+@ddt.ddt
+class TestGroupProjectNavigatorXBlock(TestWithPatchesMixin, TestCase):
+    def setUp(self):
+        super(TestGroupProjectNavigatorXBlock, self).setUp()
+        self.runtime_mock = mock.Mock(spec=Runtime)
+        self.settings_bucket = {}
+        self.runtime_mock.service.side_effect = self._get_service
+        self.block = GroupProjectNavigatorXBlock(
+            self.runtime_mock, field_data=DictFieldData({}), scope_ids=mock.Mock()
+        )
+        self.views = [
+            _make_view(ViewTypes.NAVIGATION),
+            _make_view(ViewTypes.RESOURCES),
+            _make_view(ViewTypes.ASK_TA, skip_content=True),
+        ]
+        self.make_patch(self.block, '_sorted_child_views', mock.Mock(return_value=self.views))
+        self.make_patch(self.block, 'get_translation_content', mock.Mock(return_value=u''))
+
+    def _get_service(self, _block, service_name):
+        if service_name == 'settings':
+            settings_service = mock.Mock()
+            settings_service.get_settings_bucket.return_value = self.settings_bucket
+            return settings_service
+        return None
+
+    def _rendered_views(self):
+        return [
+            call[0][0]
+            for view in self.views
+            for call in view.render.call_args_list
+            if call[0][0] == 'student_view'
+        ]
+
+    def test_student_view_eager(self):
+        fragment = self.block.student_view({})
+
+        for view in self.views[:2]:
+            view.render.assert_any_call('student_view', {})
+        self.assertNotIn('data-lazy', fragment.content)
+        self.assertIn(u"resources student_view", fragment.content)
+        self.assertIn(u".resources {}", fragment.head_html())
+
+    @ddt.data(
+        ({}, {}),
+        ({Constants.CURRENT_STAGE_ID_PARAMETER_NAME: 'stage-id', 'other': 'value'}, {'current_stage': 'stage-id'}),
+    )
+    @ddt.unpack
+    def test_student_view_lazy(self, context, expected_view_context):
+        self.settings_bucket[GroupProjectNavigatorXBlock.LAZY_VIEWS_SETTING_KEY] = True
+
+        fragment = self.block.student_view(context)
+
+        self.views[0].render.assert_any_call('student_view', context)
+        self.assertNotIn(mock.call('student_view', context), self.views[1].render.call_args_list)
+        self.assertEqual(self._rendered_views(), ['student_view'])
+        self.assertIn(u'data-view-type="resources" data-view-id="usage;_resources" data-lazy="true"', fragment.content)
+        self.assertNotIn(u"resources student_view", fragment.content)
+        self.assertIn(u"resources selector_view", fragment.content)
+        self.assertEqual(fragment.json_init_args['view_context'], expected_view_context)
+
+    def test_student_view_lazy_activated_view(self):
+        self.settings_bucket[GroupProjectNavigatorXBlock.LAZY_VIEWS_SETTING_KEY] = True
+        self.make_patch(
+            self.block, '_get_activated_view_type', mock.Mock(return_value=ViewTypes.RESOURCES)
+        )
+
+        fragment = self.block.student_view({})
+
+        self.views[1].render.assert_any_call('student_view', {})
+        self.assertNotIn(mock.call('student_view', {}), self.views[0].render.call_args_list)
+        self.assertIn(
+            u'data-view-type="navigation" data-view-id="usage;_navigation" data-lazy="true"', fragment.content
+        )
+
+    def _call_render_view(self, data):
+        request = Request.blank('/', method='POST', body=json.dumps(data).encode('utf-8'))
+        response = self.block.render_view(request)
+        return json.loads(response.body.decode('utf-8'))
+
+    def test_render_view(self):
+        result = self._call_render_view({
+            'view_type': ViewTypes.RESOURCES,
+            'context': {Constants.CURRENT_STAGE_ID_PARAMETER_NAME: 'stage-id', 'activate_block_id': 'block-id'}
+        })
+
+        self.views[1].render.assert_called_once_with('student_view', {'current_stage': 'stage-id'})
+        self.assertEqual(result['content'], u"resources student_view")
+        self.assertEqual(
+            result['resources'],
+            [{'kind': 'text', 'data': u".resources {}", 'mimetype': 'text/css', 'placement': 'head'}]
+        )
+
+    @ddt.data(ViewTypes.ASK_TA, ViewTypes.PRIVATE_DISCUSSION, None)
+    def test_render_view_unknown_view(self, view_type):
+        self.make_patch(self.block, '_', mock.Mock(side_effect=lambda text: text))
+        result = self._call_render_view({'view_type': view_type})
+
+        self.assertEqual(result['result'], 'error')
+        self.assertEqual(self._rendered_views(), [])
+
+
+@ddt.ddt
+class TestGroupProjectNavigatorTranslations(TestWithPatchesMixin, TestCase):
+    def setUp(self):
+        super(TestGroupProjectNavigatorTranslations, self).setUp()
+        self.runtime_mock = mock.Mock(spec=Runtime)
+        self.runtime_mock.local_resource_url.side_effect = lambda block, path: '/resource/' + path
+        self.block = GroupProjectNavigatorXBlock(
+            self.runtime_mock, field_data=DictFieldData({}), scope_ids=mock.Mock()
+        )
+        self.make_patch(group_project_v2.project_navigator, '_translations', {})
+        self.make_patch(group_project_v2.static_bundles, '_manifest', {})
+
+    @ddt.data(
+        ('fr', 'fr'),
+        ('pt-br', 'pt_BR'),
+        ('en', 'en'),
+        ('xx', 'en'),
+    )
+    @ddt.unpack
+    def test_get_translation_content(self, language, expected_locale):
+        expected_content = GroupProjectNavigatorXBlock.resource_string(
+            'public/js/translations/{}/textjs.js'.format(expected_locale)
+        )
+        with translation.override(language):
+            self.assertEqual(self.block.get_translation_content(), expected_content)
+
+    def test_translations_loaded_once(self):
+        with mock.patch('pkg_resources.resource_string', wraps=pkg_resources.resource_string) as resource_string_mock:
+            for language in ('fr', 'de', 'en', 'fr'):
+                with translation.override(language):
+                    self.block.get_translation_content()
+            calls = resource_string_mock.call_count
+
+        self.assertEqual(calls, warm_up_translations())
+
+    def test_translations_loaded_on_app_ready(self):
+        GroupProjectV2Config('group_project_v2', group_project_v2).ready()
+        self.assertIn('fr', group_project_v2.project_navigator._translations)  # pylint: disable=protected-access
+
+    def test_add_translations_inline(self):
+        fragment = Fragment()
+        with translation.override('fr'):
+            self.block.add_translations(fragment)
+        self.assertEqual([resource.kind for resource in fragment.resources], ['text'])
+
+    def test_add_translations_bundled(self):
+        self.make_patch(
+            group_project_v2.static_bundles, '_manifest',
+            {'public/js/translations/fr/textjs.js': 'public/bundles/js/translations/fr/textjs.0123.js'}
+        )
+        fragment = Fragment()
+        with translation.override('fr'):
+            self.block.add_translations(fragment)
+        self.assertEqual(
+            [(resource.kind, resource.data) for resource in fragment.resources],
+            [('url', '/resource/public/bundles/js/translations/fr/textjs.0123.js')]
+        )
+
+
+class TestNavigationViewXBlock(TestWithPatchesMixin, TestCase):
+    def setUp(self):
+        super(TestNavigationViewXBlock, self).setUp()
+        self.block = NavigationViewXBlock(mock.Mock(spec=Runtime), field_data=DictFieldData({}), scope_ids=mock.Mock())
+        self.stages = [StubStageA('a1', 'act1'), StubStageB('b1', 'act1'), StubStageA('a2', 'act2')]
+        self.activities = [mock.Mock(available_stages=self.stages[:2]), mock.Mock(available_stages=self.stages[2:])]
+        navigator = mock.Mock()
+        navigator.group_project.activities = self.activities
+        self.make_patch(self.block, 'navigator', navigator)
+
+        for stage_type in (StubStageA, StubStageB):
+            stage_type.get_stage_states = mock.Mock(side_effect=lambda stages: {
+                stage.id: StageState.COMPLETED if stage.id.startswith('a') else StageState.INCOMPLETE
+                for stage in stages
+            })
+
+    def test_stage_states(self):
+        expected_states = {'a1': StageState.COMPLETED, 'b1': StageState.INCOMPLETE, 'a2': StageState.COMPLETED}
+        self.assertEqual(self.block.stage_states, expected_states)
+        self.assertEqual(self.block.stage_states, expected_states)
+
+        StubStageA.get_stage_states.assert_called_once_with([self.stages[0], self.stages[2]])
+        StubStageB.get_stage_states.assert_called_once_with([self.stages[1]])
+
+    def test_stage_states_access_denied(self):
+        StubStageB.get_stage_states.side_effect = GroupworkAccessDeniedError("denied")
+        self.assertEqual(self.block.stage_states, {'a1': StageState.COMPLETED, 'a2': StageState.COMPLETED})
+
+    def test_student_view(self):
+        for activity in self.activities:
+            activity.render.return_value = Fragment(u"activity")
+        self.make_patch(self.block, 'render_student_view')
+
+        self.block.student_view({'other': 'value'})
+
+        for activity in self.activities:
+            activity.render.assert_called_once_with('navigation_view', {
+                'other': 'value', Constants.STAGE_STATES: self.block.stage_states
+            })
+
+    def test_refresh_stage_states(self):
+        request = Request.blank('/', method='POST', body=json.dumps({}).encode('utf-8'))
+        result = json.loads(self.block.refresh_stage_states(request).body.decode('utf-8'))
+
+        self.assertEqual(result, {'result': 'success', 'stage_states': [
+            {'activity_id': 'act1', 'stage_id': 'a1', 'state': StageState.COMPLETED},
+            {'activity_id': 'act1', 'stage_id': 'b1', 'state': StageState.INCOMPLETE},
+            {'activity_id': 'act2', 'stage_id': 'a2', 'state': StageState.COMPLETED},
+        ]})
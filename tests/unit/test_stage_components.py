@@ -13,6 +13,7 @@ from xblock.fields import ScopeIds
 from xblock.runtime import Runtime
 from xblock.validation import ValidationMessage
 
+import group_project_v2.stage_components
 from group_project_v2 import messages
 from group_project_v2.group_project import GroupActivityXBlock
 from group_project_v2.project_api import TypedProjectAPI
@@ -25,7 +26,9 @@ from group_project_v2.stage_components import (
     GroupProjectSubmissionXBlock,
     GroupProjectTeamEvaluationDisplayXBlock,
     StaticContentBaseXBlock,
+    render_question_markup,
 )
+from group_project_v2.tasks import ImmediateTaskExecutor
 from group_project_v2.upload_file import UploadFile
 from tests.utils import TestWithPatchesMixin, make_api_error, make_question
 from tests.utils import make_review_item as mri
@@ -146,6 +149,10 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
         super(TestGroupProjectSubmissionXBlock, self).setUp()
         self.project_api_mock = mock.create_autospec(TypedProjectAPI)
         self.make_patch(self.block_to_test, 'project_api', mock.PropertyMock(return_value=self.project_api_mock))
+        self.task_executor = ImmediateTaskExecutor()
+        self.make_patch(
+            group_project_v2.stage_components, 'get_task_executor', mock.Mock(return_value=self.task_executor)
+        )
         user_details = mock.Mock(user_label='Test label')
         self.block_to_test.project_api.get_user_details = mock.Mock(
             spec=TypedProjectAPI.get_user_details, return_value=user_details
@@ -350,11 +357,68 @@ class TestGroupProjectSubmissionXBlock(StageComponentXBlockTestBase):
                 self.runtime_mock.service(self, 'notifications')
             )
 
+    def test_persist_and_submit_file_side_effects_are_idempotent(self):
+        self.stage_mock.fire_file_upload_notification = mock.Mock()
+        self.runtime_mock.publish = mock.Mock()
+
+        with mock.patch('group_project_v2.stage_components.UploadFile') as upload_file_class_mock:
+            upload_file_mock = mock.create_autospec(UploadFile)
+            upload_file_mock.group_id = self.group_id
+            upload_file_mock.sha1 = 'sha1'
+            upload_file_mock.submission_id = '12345'
+            upload_file_mock.file = mock.Mock()
+            upload_file_class_mock.return_value = upload_file_mock
+
+            self.block.persist_and_submit_file(self.stage_mock.activity, mock.Mock(), self._make_file())
+            self.block.persist_and_submit_file(self.stage_mock.activity, mock.Mock(), self._make_file())
+
+            self.assertEqual(upload_file_mock.submit.call_count, 2)
+            self.assertEqual(self.runtime_mock.publish.call_count, 1)
+            self.assertEqual(self.stage_mock.fire_file_upload_notification.call_count, 1)
+
+    def test_persist_and_submit_file_side_effects_for_reupload(self):
+        self.stage_mock.fire_file_upload_notification = mock.Mock()
+        self.runtime_mock.publish = mock.Mock()
+
+        with mock.patch('group_project_v2.stage_components.UploadFile') as upload_file_class_mock:
+            upload_file_mocks = []
+            for submission_id in ('12345', '12346'):
+                upload_file_mock = mock.create_autospec(UploadFile)
+                upload_file_mock.group_id = self.group_id
+                upload_file_mock.sha1 = 'sha1'
+                upload_file_mock.submission_id = submission_id
+                upload_file_mock.file = mock.Mock()
+                upload_file_mocks.append(upload_file_mock)
+            upload_file_class_mock.side_effect = upload_file_mocks
+
+            self.block.persist_and_submit_file(self.stage_mock.activity, mock.Mock(), self._make_file())
+            self.block.persist_and_submit_file(self.stage_mock.activity, mock.Mock(), self._make_file())
+
+            self.assertEqual(self.runtime_mock.publish.call_count, 2)
+            self.assertEqual(self.stage_mock.fire_file_upload_notification.call_count, 2)
+
 
 @ddt.ddt
 class TestGroupProjectReviewQuestionXBlock(StageComponentXBlockTestBase):
     block_to_test = GroupProjectReviewQuestionXBlock
 
+    def setUp(self):
+        super(TestGroupProjectReviewQuestionXBlock, self).setUp()
+        render_question_markup.cache_clear()
+        self.addCleanup(render_question_markup.cache_clear)
+
+    def test_fragment_cache_version(self):
+        self.stage_mock.is_closed = False
+        version = self.block.get_fragment_cache_version()
+        self.assertEqual(self.block.get_fragment_cache_version(), version)
+
+        self.stage_mock.is_closed = True
+        closed_version = self.block.get_fragment_cache_version()
+        self.assertNotEqual(closed_version, version)
+
+        self.block.title = 'Updated question'
+        self.assertNotEqual(self.block.get_fragment_cache_version(), closed_version)
+
     def test_render_content_bad_content(self):
         self.block.question_content = "imparsable as XML"
 
@@ -391,6 +455,25 @@ class TestGroupProjectReviewQuestionXBlock(StageComponentXBlockTestBase):
             self.assertEqual(set(node_to_render.get('class').split(' ')), expected_classes)
             self.assertEqual(node_to_render.get('disabled', None), 'disabled' if closed else None)
 
+    def test_render_content_cached(self):
+        self.block.question_content = "<input type='text'/>"
+        self.stage_mock.is_closed = False
+
+        with mock.patch('group_project_v2.stage_components.ElementTree.fromstring', wraps=ElementTree.fromstring) \
+                as patched_fromstring:
+            first_response = self.block.render_content()
+            self.assertEqual(self.block.render_content(), first_response)
+            self.assertEqual(patched_fromstring.call_count, 1)
+
+            self.stage_mock.is_closed = True
+            closed_response = self.block.render_content()
+            self.assertIn('disabled', closed_response)
+            self.assertNotIn('disabled', first_response)
+
+            self.block.question_content = "<textarea/>"
+            self.assertIn('<textarea', self.block.render_content())
+            self.assertEqual(patched_fromstring.call_count, 3)
+
 
 class CommonFeedbackDisplayStageTests(object):
     def setUp(self):
@@ -3,11 +3,17 @@ from collections import OrderedDict
 
 import ddt
 import mock
+from django.utils import translation
+from web_fragments.fragment import Fragment
+from xblock.field_data import DictFieldData
 
+import group_project_v2.stage.base
+from group_project_v2.api_error import ApiError
 from group_project_v2.project_api.dtos import ReducedUserDetails
 from group_project_v2.stage import BaseGroupActivityStage
 from group_project_v2.stage.utils import StageState
-from group_project_v2.utils import Constants
+from group_project_v2.stage_components import GroupProjectReviewQuestionXBlock
+from group_project_v2.utils import Constants, fragment_cache
 from tests.unit.test_stages.base import BaseStageTest
 from tests.utils import KNOWN_USERS, OTHER_GROUPS, WORKGROUP, TestConstants
 
@@ -240,3 +246,175 @@ class TestBaseGroupActivityStage(BaseStageTest):
 
     def test_get_external_status_label(self):
         self.assertEqual(self.block.get_external_status_label('irrelevant'), self.block.DEFAULT_EXTERNAL_STATUS_LABEL)
+
+    @ddt.data(
+        (False, [2, 3]),
+        (True, [1, 2, 3]),
+    )
+    @ddt.unpack
+    def test_get_team_members_data(self, include_current_user, expected_user_ids):
+        self.project_api_mock.get_members_data.side_effect = lambda user_ids: [
+            ReducedUserDetails(id=user_id) for user_id in user_ids
+        ]
+
+        team_members = self.block.get_team_members_data(include_current_user=include_current_user)
+
+        self.assertEqual([user.id for user in team_members], expected_user_ids)
+        self.project_api_mock.get_members_data.assert_called_once_with(expected_user_ids)
+
+    def test_team_members_not_group_member(self):
+        self.make_patch(self.block_to_test, 'is_group_member', mock.PropertyMock(return_value=False))
+        self.assertEqual(self.block.team_members, [])
+        self.project_api_mock.get_members_data.assert_not_called()
+
+    def test_team_members_api_error(self):
+        self.project_api_mock.get_members_data.side_effect = ApiError(mock.Mock())
+        self.assertEqual(self.block.team_members, [])
+
+    def test_team_members_data_teammates_api_error(self):
+        self.project_api_mock.get_members_data.side_effect = ApiError(mock.Mock())
+        self.project_api_mock.get_member_data.side_effect = lambda user_id: ReducedUserDetails(id=user_id)
+
+        team_members = self.block.get_team_members_data(include_current_user=True)
+
+        self.assertEqual([user.id for user in team_members], [1])
+        self.project_api_mock.get_member_data.assert_called_once_with(1)
+
+    def test_team_members_data_current_user_api_error(self):
+        self.project_api_mock.get_members_data.side_effect = ApiError(mock.Mock())
+        self.project_api_mock.get_member_data.side_effect = ApiError(mock.Mock())
+
+        with self.assertRaises(ApiError):
+            self.block.get_team_members_data(include_current_user=True)
+
+    @ddt.data(
+        ({}, StageState.INCOMPLETE, True),
+        ({Constants.STAGE_STATES: {}}, StageState.INCOMPLETE, True),
+        ({Constants.STAGE_STATES: {'stage-id': StageState.COMPLETED}}, StageState.COMPLETED, False),
+    )
+    @ddt.unpack
+    def test_navigation_view_stage_state(self, context, expected_state, state_calculated):
+        self.block.scope_ids.usage_id = 'stage-id'
+        get_stage_state = self.make_patch(self.block, 'get_stage_state', mock.Mock(return_value=StageState.INCOMPLETE))
+        self.make_patch(self.block, 'is_current_stage', mock.Mock(return_value=False))
+        self.make_patch(group_project_v2.stage.base, 'get_link_to_block', mock.Mock(return_value='link'))
+        render_patch = self.make_patch(group_project_v2.stage.base.loader, 'render_django_template')
+        render_patch.return_value = u"rendered"
+
+        self.block.navigation_view(context)
+
+        self.assertEqual(render_patch.call_args[0][1]['stage_state'], expected_state)
+        self.assertEqual(get_stage_state.called, state_calculated)
+
+    def test_stage_state_memoized(self):
+        get_stage_state = self.make_patch(self.block, 'get_stage_state', mock.Mock(return_value=StageState.COMPLETED))
+
+        self.assertTrue(self.block.completed)
+        self.assertEqual(self.block.stage_state, StageState.COMPLETED)
+        self.assertEqual(DummyStageBlock.get_stage_states([self.block]), {str(self.block.id): StageState.COMPLETED})
+        get_stage_state.assert_called_once_with()
+
+        # state is recalculated after stage data was changed
+        get_stage_state.return_value = StageState.INCOMPLETE
+        self.assertEqual(self.block.get_new_stage_state_data()['state'], StageState.INCOMPLETE)
+        self.assertFalse(self.block.completed)
+        self.assertEqual(get_stage_state.call_count, 2)
+
+
+class TestStageChildrenFragmentCache(BaseStageTest):
+    """ Tests for caching fragments of user-independent stage children """
+    block_to_test = DummyStageBlock
+
+    def setUp(self):
+        super(TestStageChildrenFragmentCache, self).setUp()
+        fragment_cache.clear()
+        self.addCleanup(fragment_cache.clear)
+
+        self.question = GroupProjectReviewQuestionXBlock(
+            self.runtime_mock, field_data=DictFieldData({'title': 'Question'}), scope_ids=mock.Mock()
+        )
+        self.question.scope_ids.usage_id = 'question-usage-id'
+        self.make_patch(GroupProjectReviewQuestionXBlock, 'stage', mock.PropertyMock(return_value=self.block))
+        self.make_patch(DummyStageBlock, 'is_closed', mock.PropertyMock(return_value=False))
+        self.user_dependent_child = mock.Mock()
+        self.make_patch(
+            DummyStageBlock, '_children', mock.PropertyMock(return_value=[self.question, self.user_dependent_child])
+        )
+        self.render_patch = self.make_patch(self.block, '_render_child_fragment', mock.Mock(
+            side_effect=lambda child, context, view: self._render(child)
+        ))
+        self.view_patch = self.make_patch(self.question, 'student_view', mock.Mock(
+            side_effect=lambda context: self._render(self.question)
+        ))
+        self.wrapper = u"user-1"
+        self.runtime_mock.wrap_xblock.side_effect = lambda block, view, frag, context: self._wrap(frag)
+        self.runtime_mock.render_asides.side_effect = lambda block, view, frag, context: frag
+
+    @staticmethod
+    def _render(child):
+        fragment = Fragment(u"content of {}".format(child.scope_ids.usage_id))
+        fragment.add_css(u".question {}")
+        return fragment
+
+    def _wrap(self, fragment):
+        wrapped = Fragment(u"<div data-wrapper='{}'>{}</div>".format(self.wrapper, fragment.content))
+        wrapped.add_fragment_resources(fragment)
+        return wrapped
+
+    def _rendered_children(self):
+        return [call[0][0] for call in self.render_patch.call_args_list]
+
+    def test_user_independent_children_rendered_once(self):
+        first_fragments = self.block.render_children_fragments({})
+        second_fragments = self.block.render_children_fragments({})
+
+        self.assertEqual(self.view_patch.call_count, 1)
+        self.assertEqual(self._rendered_children(), [self.user_dependent_child, self.user_dependent_child])
+        self.assertEqual(second_fragments[0].content, first_fragments[0].content)
+        self.assertEqual(second_fragments[0].resources, first_fragments[0].resources)
+        self.assertIsNot(second_fragments[0], first_fragments[0])
+
+    def test_cached_fragments_wrapped_per_request(self):
+        first_fragments = self.block.render_children_fragments({})
+        self.wrapper = u"user-2"
+        second_fragments = self.block.render_children_fragments({})
+
+        self.assertEqual(self.view_patch.call_count, 1)
+        self.assertEqual(self.runtime_mock.wrap_xblock.call_count, 2)
+        self.assertIn(u"user-1", first_fragments[0].content)
+        self.assertIn(u"user-2", second_fragments[0].content)
+        self.assertNotIn(u"user-1", second_fragments[0].content)
+
+    def test_cache_invalidated_on_content_change(self):
+        self.block.render_children_fragments({})
+        self.question.title = 'Updated question'
+        self.block.render_children_fragments({})
+
+        self.assertEqual(self.view_patch.call_count, 2)
+
+    def test_cache_per_context(self):
+        for context in ({'completed': False}, {'completed': True}, {'completed': False}):
+            self.block.render_children_fragments(context)
+
+        self.assertEqual(self.view_patch.call_count, 2)
+
+    def test_not_cached_for_context_with_objects(self):
+        self.block.render_children_fragments({'stage': self.block})
+        self.block.render_children_fragments({'stage': self.block})
+
+        self.assertEqual(self._rendered_children().count(self.question), 2)
+        self.view_patch.assert_not_called()
+
+    def test_cache_per_language(self):
+        for language in ('en', 'fr', 'en'):
+            with translation.override(language):
+                self.block.render_children_fragments({})
+
+        self.assertEqual(self.view_patch.call_count, 2)
+
+    def test_not_cached_for_other_views(self):
+        self.block.render_children_fragments({}, view='author_view')
+        self.block.render_children_fragments({}, view='author_view')
+
+        self.assertEqual(self._rendered_children().count(self.question), 2)
+        self.view_patch.assert_not_called()
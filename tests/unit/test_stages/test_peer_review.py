@@ -181,6 +181,24 @@ class TestPeerReviewStageReviewStatus(ReviewStageBaseTest, ReviewStageUserComple
 
         self.assertEqual(self.project_api_mock.get_workgroup_review_items_for_group.mock_calls, expected_calls)
 
+    def test_get_review_states(self):
+        reviews = {
+            GROUP_ID: [mri(USER_ID, "q1", group=GROUP_ID, answer='1'), mri(USER_ID, "q2", group=GROUP_ID, answer='2')],
+            OTHER_GROUP_ID: [mri(USER_ID, "q1", group=OTHER_GROUP_ID, answer='3')],
+        }
+        self.project_api_mock.get_workgroup_review_items.side_effect = lambda _reviewer, group_id, _content: reviews[
+            group_id
+        ]
+        with patch_obj(self.block_to_test, 'required_questions', mock.PropertyMock()) as patched_questions:
+            patched_questions.return_value = [make_question(q_id, 'irrelevant') for q_id in ('q1', 'q2')]
+
+            review_states = self.block.get_review_states([GROUP_ID, OTHER_GROUP_ID])
+
+        self.assertEqual(review_states, {GROUP_ID: ReviewState.COMPLETED, OTHER_GROUP_ID: ReviewState.INCOMPLETE})
+        self.assertEqual(self.project_api_mock.get_workgroup_review_items.mock_calls, [
+            mock.call(USER_ID, group_id, self.block.activity_content_id) for group_id in (GROUP_ID, OTHER_GROUP_ID)
+        ])
+
     @ddt.data(
         # no reviews - not started
         ([GROUP_ID], ["q1"], [], (set(), set())),
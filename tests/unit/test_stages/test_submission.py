@@ -1,7 +1,19 @@
+import io
+import shutil
+import tempfile
+import zipfile
+
 import ddt
 import mock
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from webob import Request
+from xblock.field_data import DictFieldData
 
+import group_project_v2.stage.basic
+from group_project_v2.api_error import ApiError
 from group_project_v2.stage import SubmissionStage
+from group_project_v2.stage.utils import StageState
 from tests.unit.test_stages.base import BaseStageTest
 from tests.utils import make_workgroup as mk_wg
 
@@ -71,18 +83,189 @@ class TestSubmissionStage(BaseStageTest):
         }
 
         expected_completed, expected_partially_completed = expected_result
-        expected_calls = [mock.call(group.id) for group in workgroups]
-
-        def get_submissions_by_id(group_id):
-            return workgroup_submissions.get(group_id, {})
 
         self._set_upload_ids(uploads)
-        self.project_api_mock.get_latest_workgroup_submissions_by_id.side_effect = get_submissions_by_id
+        self.project_api_mock.get_latest_submissions_by_workgroup.return_value = workgroup_submissions
         completed, partially_completed = self.block.get_users_completion(workgroups, 'irrelevant')
 
         self.assertEqual(completed, expected_completed)
         self.assertEqual(partially_completed, expected_partially_completed)
+        self.project_api_mock.get_latest_submissions_by_workgroup.assert_called_once_with(
+            [group.id for group in workgroups], set(uploads)
+        )
+        self.project_api_mock.get_latest_workgroup_submissions_by_id.assert_not_called()
+
+    @ddt.data(
+        (['u1'], {}, StageState.NOT_STARTED),
+        (['u1', 'u2'], {'u1': 'irrelevant'}, StageState.INCOMPLETE),
+        (['u1', 'u2'], {'u1': 'irrelevant', 'u2': 'irrelevant'}, StageState.COMPLETED),
+        (['u1'], {'u1': 'irrelevant', 'u2': 'irrelevant'}, StageState.COMPLETED),
+    )
+    @ddt.unpack
+    def test_external_group_status_single_and_bulk_agree(self, uploads, group_submissions, expected_result):
+        group = mk_wg(1, [{'id': 1}])
+        self._set_upload_ids(uploads)
+        self.project_api_mock.get_latest_workgroup_submissions_by_id.return_value = group_submissions
+        self.project_api_mock.get_latest_submissions_by_workgroup.return_value = {1: group_submissions}
+
+        self.assertEqual(self.block.get_external_group_status(group), expected_result)
+        self.assertEqual(self.block.get_external_group_statuses([group]), {1: expected_result})
+
+    @ddt.data(
+        (['u1'], {}, StageState.NOT_STARTED),
+        (['u1', 'u2'], {'u1': 'irrelevant'}, StageState.INCOMPLETE),
+        (['u1', 'u2'], {'u1': 'irrelevant', 'u2': 'irrelevant'}, StageState.COMPLETED),
+    )
+    @ddt.unpack
+    def test_get_stage_state(self, uploads, group_submissions, expected_result):
+        self._set_upload_ids(uploads)
+        self.project_api_mock.get_latest_submissions_by_workgroup.return_value = {1: group_submissions}
+
+        self.assertEqual(self.block.get_stage_state(), expected_result)
+        self.project_api_mock.get_latest_submissions_by_workgroup.assert_called_once_with(mock.ANY, set(uploads))
+        self.assertEqual(list(self.project_api_mock.get_latest_submissions_by_workgroup.call_args[0][0]), [1])
+        self.project_api_mock.get_latest_workgroup_submissions_by_id.assert_not_called()
+
+    def test_get_stage_states_fetches_submissions_once(self):
+        other_stage = SubmissionStage(self.runtime_mock, field_data=DictFieldData({}), scope_ids=mock.Mock())
+        # submissions property is read once per stage, in order of stages
+        self.submissions_mock.side_effect = [
+            [mock.Mock(upload_id=upload_id) for upload_id in uploads] for uploads in (['u1'], ['u2', 'u3'])
+        ]
+        self.project_api_mock.get_latest_submissions_by_workgroup.return_value = {1: {'u1': {}, 'u2': {}}}
+
+        states = SubmissionStage.get_stage_states([self.block, other_stage])
+
+        self.assertEqual(states, {
+            str(self.block.id): StageState.COMPLETED,
+            str(other_stage.id): StageState.INCOMPLETE,
+        })
+        self.project_api_mock.get_latest_submissions_by_workgroup.assert_called_once_with(
+            mock.ANY, {'u1', 'u2', 'u3'}
+        )
+
+    def test_get_stage_states_memoized(self):
+        self._set_upload_ids(['u1'])
+        self.project_api_mock.get_latest_submissions_by_workgroup.return_value = {1: {'u1': {}}}
+
+        self.assertTrue(self.block.completed)
+        self.assertEqual(SubmissionStage.get_stage_states([self.block]), {str(self.block.id): StageState.COMPLETED})
+        self.assertEqual(self.project_api_mock.get_latest_submissions_by_workgroup.call_count, 1)
+
+    def test_get_stage_states_no_stages(self):
+        self.assertEqual(SubmissionStage.get_stage_states([]), {})
+        self.project_api_mock.get_latest_submissions_by_workgroup.assert_not_called()
+
+    def _prepare_archive_storage(self):
+        storage_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_root)
+        storage = FileSystemStorage(location=storage_root)
+        self.make_patch(group_project_v2.stage.basic, 'get_storage', mock.Mock(return_value=storage))
+        can_access_all_orgs_mock = self.make_patch(
+            self.block, '_can_user_access_all_orgs', mock.Mock(return_value=True)
+        )
+        storage.save('group_work/blobs/sha1/file1.pdf', ContentFile(b'blob contents'))
+        storage.save('group_work/2/sha2/file2.pdf', ContentFile(b'legacy contents'))
+        self.activity_mock.project.project_details.workgroups = [1, 2, 3]
+        self.activity_mock.display_name = 'Activity'
+        self.project_api_mock.get_latest_submissions_by_workgroup.return_value = {
+            1: {'u1': {
+                'document_url': 'http://storage/group_work/blobs/sha1/file1.pdf', 'document_filename': 'my file.pdf',
+                'workgroup': 1, 'modified': '2015-08-01T00:00:00Z',
+            }},
+            2: {'u2': {
+                'document_url': 'http://storage/group_work/2/sha2/file2.pdf', 'document_filename': 'file2.pdf',
+                'workgroup': 2, 'modified': '2015-08-02T00:00:00Z',
+            }},
+            3: {'u1': {
+                'document_url': 'http://storage/group_work/blobs/missing/file.pdf', 'document_filename': 'file.pdf',
+                'workgroup': 3, 'modified': '2015-08-02T00:00:00Z',
+            }},
+        }
+        return can_access_all_orgs_mock
+
+    @ddt.data(
+        ('/', {1, 2, 3}),
+        ('/?group_id=1&group_id=2', {1, 2}),
+        ('/?group_id=2&group_id=15', {2}),
+    )
+    @ddt.unpack
+    def test_download_submissions_archive(self, url, expected_group_ids):
+        self._prepare_archive_storage()
+        self._set_upload_ids(['u1', 'u2'])
+
+        with mock.patch.object(self.block, 'can_access_dashboard', mock.Mock(return_value=True)):
+            response = self.block.download_submissions_archive(Request.blank(url))
+
+        self.assertEqual(response.content_type, 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.app_iter)))
+        self.project_api_mock.get_latest_submissions_by_workgroup.assert_called_once_with(
+            expected_group_ids, {'u1', 'u2'}
+        )
         self.assertEqual(
-            self.project_api_mock.get_latest_workgroup_submissions_by_id.mock_calls,
-            expected_calls
+            sorted(archive.namelist()), ['group_work/1/u1/my file.pdf', 'group_work/2/u2/file2.pdf']
+        )
+        self.assertEqual(archive.read('group_work/1/u1/my file.pdf'), b'blob contents')
+        self.assertEqual(archive.read('group_work/2/u2/file2.pdf'), b'legacy contents')
+
+    @ddt.data(
+        ('/', {1, 3}),
+        ('/?group_id=2&group_id=3', {3}),
+        ('/?client_filter_id=10', {1, 3}),
+        ('/?client_filter_id=20', set()),
+    )
+    @ddt.unpack
+    def test_download_submissions_archive_limited_to_organization(self, url, expected_group_ids):
+        can_access_all_orgs_mock = self._prepare_archive_storage()
+        self._set_upload_ids(['u1', 'u2'])
+        can_access_all_orgs_mock.return_value = False
+        workgroups = {1: mk_wg(1, [{'id': 11}]), 2: mk_wg(2, [{'id': 21}]), 3: mk_wg(3, [{'id': 22}, {'id': 12}])}
+        user_orgs = {self.user_id: 10, 11: 10, 12: 10, 21: 20, 22: 20}
+        self.project_api_mock.get_workgroup_by_id.side_effect = workgroups.get
+        self.project_api_mock.get_user_organizations.side_effect = lambda user_id: [{'id': user_orgs[user_id]}]
+
+        with mock.patch.object(self.block, 'can_access_dashboard', mock.Mock(return_value=True)):
+            self.block.download_submissions_archive(Request.blank(url))
+
+        self.project_api_mock.get_latest_submissions_by_workgroup.assert_called_once_with(
+            expected_group_ids, {'u1', 'u2'}
         )
+
+    def test_download_submissions_archive_access_denied(self):
+        with mock.patch.object(self.block, 'can_access_dashboard', mock.Mock(return_value=False)), \
+                mock.patch.object(self.block, '_', lambda text: text):
+            response = self.block.download_submissions_archive(Request.blank('/'))
+
+        self.assertEqual(response.status_code, 403)
+        self.project_api_mock.get_latest_submissions_by_workgroup.assert_not_called()
+
+    def test_download_submissions_archive_api_error(self):
+        self._prepare_archive_storage()
+        self._set_upload_ids(['u1'])
+        self.project_api_mock.get_latest_submissions_by_workgroup.side_effect = ApiError(mock.Mock(reason='API down'))
+
+        with mock.patch.object(self.block, 'can_access_dashboard', mock.Mock(return_value=True)):
+            response = self.block.download_submissions_archive(Request.blank('/'))
+
+        self.assertEqual(response.status_code, 502)
+        self.assertNotEqual(response.content_type, 'application/zip')
+
+    def test_download_submissions_archive_filename(self):
+        self._prepare_archive_storage()
+        self._set_upload_ids(['u1'])
+        self.activity_mock.display_name = u'Étape "1"'
+
+        with mock.patch.object(self.block, 'can_access_dashboard', mock.Mock(return_value=True)):
+            response = self.block.download_submissions_archive(Request.blank('/'))
+
+        disposition = response.headers['Content-Disposition']
+        disposition.encode('latin-1')
+        self.assertIn(u'filename="Etape _1_', disposition)
+        self.assertIn(u"filename*=UTF-8''%C3%89tape%20%221%22", disposition)
+
+    def test_download_submissions_archive_bad_group_id(self):
+        self.activity_mock.project.project_details.workgroups = [1]
+        with mock.patch.object(self.block, 'can_access_dashboard', mock.Mock(return_value=True)):
+            response = self.block.download_submissions_archive(Request.blank('/?group_id=qwe'))
+
+        self.assertEqual(response.status_code, 400)
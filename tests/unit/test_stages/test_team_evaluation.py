@@ -1,10 +1,14 @@
+import json
+
 import ddt
 import mock
+from webob import Request
+from xblock.field_data import DictFieldData
 from xblock.validation import ValidationMessage
 
 from group_project_v2.project_api.dtos import ReducedUserDetails
 from group_project_v2.stage import TeamEvaluationStage
-from group_project_v2.stage.utils import ReviewState
+from group_project_v2.stage.utils import ReviewState, StageState
 from group_project_v2.stage_components import GroupProjectReviewQuestionXBlock, PeerSelectorXBlock
 from tests.unit.test_stages.base import BaseStageTest, ReviewStageBaseTest, ReviewStageUserCompletionStatsMixin
 from tests.unit.test_stages.utils import GROUP_ID, OTHER_GROUP_ID, OTHER_USER_ID, USER_ID, patch_obj
@@ -37,6 +41,39 @@ class TestTeamEvaluationStage(ReviewStageBaseTest, BaseStageTest):
         categories = [GroupProjectReviewQuestionXBlock.CATEGORY, PeerSelectorXBlock.CATEGORY]
         self.validate_and_check_message(categories, questions, None)
 
+    def test_load_peer_feedback(self):
+        self.project_api_mock.get_peer_review_items.return_value = [
+            dict(mri(USER_ID, 'q1', peer=OTHER_USER_ID, answer='1'), id=10, created='today', modified='today')
+        ]
+
+        response = self.block.load_peer_feedback(Request.blank('/?peer_id={}'.format(OTHER_USER_ID)))
+
+        self.assertEqual(json.loads(response.body.decode('utf-8')), {'q1': '1'})
+
+    def test_submit_review(self):
+        self.block.do_submit_review({'review_subject_id': OTHER_USER_ID, 'q1': '2'})
+
+        self.project_api_mock.submit_peer_review_items.assert_called_once_with(
+            USER_ID, OTHER_USER_ID, self.workgroup_data.id, self.activity_mock.content_id, {'q1': '2'}
+        )
+
+    def test_get_review_states(self):
+        self.project_api_mock.get_peer_review_items_for_group.return_value = [
+            mri(USER_ID, "q1", peer=10, answer='1'), mri(USER_ID, "q2", peer=10, answer='2'),
+            mri(USER_ID, "q1", peer=11, answer='3'), mri(OTHER_USER_ID, "q1", peer=12, answer='4'),
+        ]
+        with patch_obj(self.block_to_test, 'required_questions', mock.PropertyMock()) as patched_questions:
+            patched_questions.return_value = [make_question(q_id, 'irrelevant') for q_id in ('q1', 'q2')]
+
+            review_states = self.block.get_review_states([10, 11, 12])
+
+        self.assertEqual(
+            review_states, {10: ReviewState.COMPLETED, 11: ReviewState.INCOMPLETE, 12: ReviewState.NOT_STARTED}
+        )
+        self.project_api_mock.get_peer_review_items_for_group.assert_called_once_with(
+            self.workgroup_data.id, self.activity_mock.content_id
+        )
+
 
 @ddt.ddt
 class TestTeamEvaluationStageStageStatus(ReviewStageUserCompletionStatsMixin, BaseStageTest):
@@ -91,6 +128,46 @@ class TestTeamEvaluationStageStageStatus(ReviewStageUserCompletionStatsMixin, Ba
                 self.workgroup_data.id, self.activity_mock.content_id
             )
 
+    def _make_stage(self, visited=True):
+        stage = self.block_to_test(self.runtime_mock, field_data=DictFieldData({}), scope_ids=mock.Mock())
+        stage.visited = visited
+        return stage
+
+    def test_get_stage_states_loads_review_items_once(self):
+        self.block.visited = True
+        other_stage, not_visited_stage = self._make_stage(), self._make_stage(visited=False)
+        self.project_api_mock.get_peer_review_items_for_group.return_value = [
+            mri(USER_ID, "q1", peer=2, answer='1'), mri(USER_ID, "q1", peer=3, answer='2'),
+        ]
+
+        with patch_obj(self.block_to_test, 'required_questions', mock.PropertyMock()) as patched_questions:
+            patched_questions.return_value = [make_question('q1', 'irrelevant')]
+
+            states = TeamEvaluationStage.get_stage_states([self.block, other_stage, not_visited_stage])
+
+        self.assertEqual(states, {
+            str(self.block.id): StageState.COMPLETED,
+            str(other_stage.id): StageState.COMPLETED,
+            str(not_visited_stage.id): StageState.NOT_STARTED,
+        })
+        self.project_api_mock.get_peer_review_items_for_group.assert_called_once_with(
+            self.workgroup_data.id, self.activity_mock.content_id
+        )
+
+    def test_get_stage_states_memoized(self):
+        self.block.visited = True
+        self.project_api_mock.get_peer_review_items_for_group.return_value = []
+
+        self.assertEqual(self.block.stage_state, StageState.NOT_STARTED)
+        self.assertEqual(
+            TeamEvaluationStage.get_stage_states([self.block]), {str(self.block.id): StageState.NOT_STARTED}
+        )
+        self.assertEqual(self.project_api_mock.get_peer_review_items_for_group.call_count, 1)
+
+    def test_get_stage_states_no_stages(self):
+        self.assertEqual(TeamEvaluationStage.get_stage_states([]), {})
+        self.project_api_mock.get_peer_review_items_for_group.assert_not_called()
+
     def _set_project_api_responses(self, workgroups, review_items):
         def workgroups_side_effect(user_id, _course_id):
             return workgroups.get(user_id, None)
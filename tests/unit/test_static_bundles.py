@@ -0,0 +1,181 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import ddt
+import mock
+from django.core.management import call_command
+from django.test.utils import override_settings
+from web_fragments.fragment import Fragment
+
+import group_project_v2.static_bundles
+from group_project_v2.management.commands.build_static_bundles import Command
+from group_project_v2.static_bundles import (
+    MANIFEST_PATH,
+    build_bundles,
+    get_bundle_manifest,
+    get_bundled_path,
+    minify_css,
+    rebase_css_urls,
+)
+from group_project_v2.utils import add_resource
+
+CSS = u"""
+/* comment */
+.block  .title ,
+.block > .body {
+    color: red;
+    margin : 0 ;
+}
+@font-face { src: url('fonts/font.woff?v=1') format('woff'), url("data:font/woff;base64,AAA"); }
+"""
+
+JS = u"""function test() {
+    "use strict";
+    return 1;
+}
+"""
+
+
+def _write(root, path, content):
+    full_path = os.path.join(root, path)
+    if not os.path.isdir(os.path.dirname(full_path)):
+        os.makedirs(os.path.dirname(full_path))
+    with open(full_path, 'w') as target:
+        target.write(content)
+
+
+def _read(root, path):
+    with open(os.path.join(root, path)) as source:
+        return source.read()
+
+
+@ddt.ddt
+class TestStaticBundles(TestCase):
+    def setUp(self):
+        self.package_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.package_dir)
+        _write(self.package_dir, 'public/css/vendor/style.css', CSS)
+        _write(self.package_dir, 'public/js/block.js', JS)
+        _write(self.package_dir, 'public/js/readme.txt', u"not a resource")
+        self.make_manifest_patch(None)
+
+    def make_manifest_patch(self, manifest):
+        patcher = mock.patch.object(group_project_v2.static_bundles, '_manifest', manifest)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_minify_css(self):
+        self.assertEqual(
+            minify_css(u".block  .title ,\n.block > .body {\n  color: red;\n  margin : 0 ;\n}\n/* comment */"),
+            u".block .title,.block>.body{color: red;margin : 0}"
+        )
+
+    @ddt.data(
+        ("fonts/font.woff?v=1", "../../../css/vendor/fonts/font.woff?v=1"),
+        ("../img/icon.png", "../../../css/img/icon.png"),
+        ("/static/icon.png", "/static/icon.png"),
+        ("https://example.com/icon.png", "https://example.com/icon.png"),
+        ("data:image/png;base64,AAA", "data:image/png;base64,AAA"),
+    )
+    @ddt.unpack
+    def test_rebase_css_urls(self, url, expected_url):
+        self.assertEqual(
+            rebase_css_urls(
+                u"a {{ background: url('{}'); }}".format(url),
+                'public/css/vendor/style.css', 'public/bundles/css/vendor/style.0123.css'
+            ),
+            u"a {{ background: url('{}'); }}".format(expected_url)
+        )
+
+    def test_build_bundles(self):
+        manifest = build_bundles(self.package_dir)
+
+        self.assertEqual(sorted(manifest.keys()), ['public/css/vendor/style.css', 'public/js/block.js'])
+        self.assertRegex(manifest['public/js/block.js'], r'^public/bundles/js/block\.[0-9a-f]{12}\.js$')
+        self.assertRegex(
+            manifest['public/css/vendor/style.css'], r'^public/bundles/css/vendor/style\.[0-9a-f]{12}\.css$'
+        )
+        self.assertEqual(json.loads(_read(self.package_dir, MANIFEST_PATH)), manifest)
+
+        css_bundle = _read(self.package_dir, manifest['public/css/vendor/style.css'])
+        self.assertNotIn(u"comment", css_bundle)
+        self.assertIn(u"url('../../../css/vendor/fonts/font.woff?v=1')", css_bundle)
+        self.assertIn(u'url("data:font/woff;base64,AAA")', css_bundle)
+
+    def test_build_bundles_content_hash(self):
+        first_manifest = build_bundles(self.package_dir)
+        self.assertEqual(build_bundles(self.package_dir), first_manifest)
+
+        _write(self.package_dir, 'public/js/block.js', JS.replace(u"1", u"2"))
+        second_manifest = build_bundles(self.package_dir)
+
+        self.assertNotEqual(second_manifest['public/js/block.js'], first_manifest['public/js/block.js'])
+        self.assertEqual(second_manifest['public/css/vendor/style.css'], first_manifest['public/css/vendor/style.css'])
+        # stale bundles are removed
+        self.assertFalse(os.path.exists(os.path.join(self.package_dir, first_manifest['public/js/block.js'])))
+
+    def test_build_bundles_no_minify(self):
+        manifest = build_bundles(self.package_dir, minify=False)
+        self.assertIn(u"/* comment */", _read(self.package_dir, manifest['public/css/vendor/style.css']))
+        self.assertEqual(_read(self.package_dir, manifest['public/js/block.js']), JS)
+
+    def test_command(self):
+        with mock.patch('group_project_v2.management.commands.build_static_bundles.build_bundles') as build_mock:
+            build_mock.return_value = {'public/js/block.js': 'public/bundles/js/block.0123.js'}
+            call_command(Command(), no_minify=True)
+        build_mock.assert_called_once_with(minify=False)
+
+    def test_get_bundle_manifest_missing(self):
+        with mock.patch('pkg_resources.resource_string', mock.Mock(side_effect=IOError)):
+            self.assertEqual(get_bundle_manifest(), {})
+            self.assertIsNone(get_bundled_path('public/js/block.js'))
+
+    def test_get_bundle_manifest_loaded_once(self):
+        manifest = {'public/js/block.js': 'public/bundles/js/block.0123.js'}
+        with mock.patch('pkg_resources.resource_string') as resource_string_mock:
+            resource_string_mock.return_value = json.dumps(manifest).encode('utf-8')
+            self.assertEqual(get_bundle_manifest(), manifest)
+            self.assertEqual(get_bundled_path('public/js/block.js'), 'public/bundles/js/block.0123.js')
+        self.assertEqual(resource_string_mock.call_count, 1)
+
+    @override_settings(GROUP_PROJECT_V2_STATIC_BUNDLES=False)
+    def test_get_bundled_path_disabled(self):
+        self.make_manifest_patch({'public/js/block.js': 'public/bundles/js/block.0123.js'})
+        self.assertIsNone(get_bundled_path('public/js/block.js'))
+
+
+@ddt.ddt
+class TestAddResource(TestCase):
+    def setUp(self):
+        self.block = mock.Mock()
+        self.block.runtime.local_resource_url.side_effect = lambda block, path: '/resource/' + path
+        patcher = mock.patch.object(
+            group_project_v2.static_bundles, '_manifest', {
+                'public/js/group_project.js': 'public/bundles/js/group_project.0123.js',
+                'public/css/group_project.css': 'public/bundles/css/group_project.0123.css',
+            }
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @ddt.data(
+        ('javascript', 'public/js/group_project.js', 'application/javascript', 'bundles/js/group_project.0123.js'),
+        ('css', 'public/css/group_project.css', 'text/css', 'bundles/css/group_project.0123.css'),
+    )
+    @ddt.unpack
+    def test_bundled(self, resource_type, path, mimetype, bundle):
+        fragment = Fragment()
+        add_resource(self.block, resource_type, path, fragment)
+        self.assertEqual(
+            [(resource.kind, resource.mimetype, resource.data) for resource in fragment.resources],
+            [('url', mimetype, '/resource/public/' + bundle)]
+        )
+
+    def test_not_bundled(self):
+        fragment = Fragment()
+        add_resource(self.block, 'javascript', 'public/js/group_project_common.js', fragment)
+        self.assertEqual([resource.kind for resource in fragment.resources], ['text'])
+        self.assertIn(u"GroupProjectCommon", fragment.resources[0].data)
@@ -0,0 +1,90 @@
+import threading
+from unittest import TestCase
+
+import ddt
+import mock
+from django.test.utils import override_settings
+
+import group_project_v2.tasks
+from group_project_v2.tasks import ImmediateTaskExecutor, ThreadPoolTaskExecutor, get_task_executor
+
+
+@ddt.ddt
+class TestImmediateTaskExecutor(TestCase):
+    def setUp(self):
+        self.executor = ImmediateTaskExecutor()
+
+    def test_runs_task(self):
+        task = mock.Mock()
+        self.assertTrue(self.executor.apply_async(task, args=(1, 2), kwargs={'a': 3}))
+        task.assert_called_once_with(1, 2, a=3)
+
+    def test_drops_duplicate_task_ids(self):
+        task = mock.Mock()
+        self.assertTrue(self.executor.apply_async(task, task_id='key'))
+        self.assertFalse(self.executor.apply_async(task, task_id='key'))
+        self.assertTrue(self.executor.apply_async(task, task_id='other_key'))
+        self.assertTrue(self.executor.apply_async(task))
+        self.assertTrue(self.executor.apply_async(task))
+        self.assertEqual(task.call_count, 4)
+
+    def test_does_not_retry_and_suppresses_exceptions(self):
+        task = mock.Mock(side_effect=ValueError("boom"))
+        with mock.patch.object(group_project_v2.tasks, 'log') as log_mock, \
+                mock.patch.object(group_project_v2.tasks.time, 'sleep') as sleep_mock:
+            self.assertTrue(self.executor.apply_async(task))
+        self.assertEqual(task.call_count, 1)
+        self.assertEqual(log_mock.exception.call_count, 1)
+        sleep_mock.assert_not_called()
+
+
+@ddt.ddt
+class TestThreadPoolTaskExecutor(TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolTaskExecutor(max_workers=1, retry_backoff=0)
+
+    def _run_with_retries(self, task):
+        return self.executor._run_with_retries(task, (), {}, None)  # pylint: disable=protected-access
+
+    def test_runs_task_in_background_thread(self):
+        done = threading.Event()
+        threads = []
+
+        def task(value):
+            threads.append((threading.current_thread(), value))
+            done.set()
+
+        self.executor.apply_async(task, args=('value',))
+        self.assertTrue(done.wait(5))
+        self.assertNotEqual(threads[0][0], threading.current_thread())
+        self.assertEqual(threads[0][1], 'value')
+
+    @ddt.data(0, 1, 3)
+    def test_retries_and_suppresses_exceptions(self, max_retries):
+        self.executor.max_retries = max_retries
+        task = mock.Mock(side_effect=ValueError("boom"))
+        with mock.patch.object(group_project_v2.tasks, 'log') as log_mock:
+            self.assertIsNone(self._run_with_retries(task))
+        self.assertEqual(task.call_count, max_retries + 1)
+        self.assertEqual(log_mock.exception.call_count, 1)
+
+    def test_retry_succeeds(self):
+        task = mock.Mock(side_effect=[ValueError("boom"), 'result'])
+        self.assertEqual(self._run_with_retries(task), 'result')
+        self.assertEqual(task.call_count, 2)
+
+
+class TestGetTaskExecutor(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(group_project_v2.tasks, '_executor', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_default(self):
+        executor = get_task_executor()
+        self.assertIsInstance(executor, ImmediateTaskExecutor)
+        self.assertIs(get_task_executor(), executor)
+
+    @override_settings(GROUP_PROJECT_V2_TASK_EXECUTOR='group_project_v2.tasks.ThreadPoolTaskExecutor')
+    def test_configured(self):
+        self.assertIsInstance(get_task_executor(), ThreadPoolTaskExecutor)
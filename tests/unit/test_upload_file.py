@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import TestCase
+
+import ddt
+import mock
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+
+from group_project_v2.management.commands.gc_submission_blobs import Command, collect_garbage
+from group_project_v2.upload_file import UploadFile
+
+
+@ddt.ddt
+class TestUploadFile(TestCase):
+    def setUp(self):
+        self.storage_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.storage_root)
+        self.storage = FileSystemStorage(location=self.storage_root, base_url='/media/')
+        patcher = mock.patch('group_project_v2.upload_file.get_storage', mock.Mock(return_value=self.storage))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.project_api = mock.Mock()
+
+    def _upload(self, content, file_name, group_id=1, upload_id='upload'):
+        context = {'user_id': 'user', 'group_id': group_id, 'course_id': 'course', 'project_api': self.project_api}
+        upload = UploadFile(ContentFile(content, name=file_name), upload_id, context)
+        upload.save_file()
+        upload.submit()
+        return upload
+
+    def _stored_blobs(self):
+        directories, _files = self.storage.listdir('group_work/blobs')
+        return sorted(
+            "{}/{}".format(directory, file_name)
+            for directory in directories
+            for file_name in self.storage.listdir('group_work/blobs/' + directory)[1]
+        )
+
+    def _make_old(self, path):
+        old = time.time() - 7200
+        os.utime(self.storage.path(path), (old, old))
+
+    def test_file_storage_path(self):
+        upload = self._upload(b'content', 'file.pdf')
+        self.assertEqual(upload.file_storage_path, 'group_work/blobs/{}/content'.format(upload.sha1))
+        self.assertEqual(upload.file_url.split('/')[-2], upload.sha1)
+        submission = self.project_api.create_submission.call_args[0][0]
+        self.assertEqual(submission['document_url'], '/media/' + upload.file_storage_path)
+        self.assertEqual(submission['document_filename'], 'file.pdf')
+
+    @ddt.data(
+        ('file.pdf', 2, 'upload'),  # same file uploaded by other group
+        ('file.pdf', 1, 'upload'),  # re-upload
+        ('other_name.pdf', 1, 'other_upload'),  # same contents uploaded under other name to other deliverable
+    )
+    @ddt.unpack
+    def test_same_content_is_stored_once(self, file_name, group_id, upload_id):
+        first = self._upload(b'content', 'file.pdf')
+        second = self._upload(b'content', file_name, group_id=group_id, upload_id=upload_id)
+
+        self.assertEqual(first.file_storage_path, second.file_storage_path)
+        self.assertEqual(self._stored_blobs(), ['{}/content'.format(first.sha1)])
+        submission = self.project_api.create_submission.call_args[0][0]
+        self.assertEqual(submission['document_filename'], file_name)
+        self.assertNotIn('file.pdf', submission['document_url'])
+
+    def test_ref_points_to_latest_submission(self):
+        self._upload(b'first', 'file.pdf')
+        latest = self._upload(b'second', 'file.pdf')
+
+        with self.storage.open(UploadFile.ref_path(1, 'upload')) as ref_file:
+            self.assertEqual(
+                json.loads(ref_file.read().decode('utf-8')),
+                {'blob': latest.file_storage_path, 'filename': 'file.pdf'}
+            )
+
+    def test_collect_garbage(self):
+        replaced = self._upload(b'first', 'file.pdf')
+        latest = self._upload(b'second', 'file.pdf')
+        other_group = self._upload(b'first', 'file.pdf', group_id=2)
+        orphaned = self._upload(b'third', 'orphan.pdf', group_id=3)
+        self.storage.delete(UploadFile.ref_path(3, 'upload'))
+        self.assertEqual(replaced.file_storage_path, other_group.file_storage_path)
+
+        self.assertEqual(collect_garbage(self.storage, timedelta(hours=1)), [])
+
+        deleted = collect_garbage(self.storage, timedelta(hours=-1), dry_run=True)
+        self.assertEqual(deleted, [orphaned.file_storage_path])
+        self.assertTrue(self.storage.exists(orphaned.file_storage_path))
+
+        self.assertEqual(collect_garbage(self.storage, timedelta(hours=-1)), [orphaned.file_storage_path])
+        self.assertFalse(self.storage.exists(orphaned.file_storage_path))
+        self.assertTrue(self.storage.exists(latest.file_storage_path))
+        self.assertTrue(self.storage.exists(other_group.file_storage_path))
+
+    def test_collect_garbage_keeps_leased_blob(self):
+        orphaned = self._upload(b'content', 'orphan.pdf')
+        self.storage.delete(UploadFile.ref_path(1, 'upload'))
+        self._make_old(orphaned.file_storage_path)
+        for lease_path in self.storage.listdir(UploadFile.lease_directory(orphaned.sha1))[1]:
+            self._make_old(UploadFile.lease_directory(orphaned.sha1) + '/' + lease_path)
+
+        # new upload reuses old unreferenced blob, but has not written its ref yet
+        reused = UploadFile(
+            ContentFile(b'content', name='file.pdf'), 'upload',
+            {'user_id': 'user', 'group_id': 2, 'course_id': 'course', 'project_api': self.project_api}
+        )
+        reused.save_file()
+
+        self.assertEqual(collect_garbage(self.storage, timedelta(hours=1)), [])
+        self.assertTrue(self.storage.exists(reused.file_storage_path))
+        # expired lease of the first upload has been removed
+        self.assertEqual(len(self.storage.listdir(UploadFile.lease_directory(orphaned.sha1))[1]), 1)
+
+    def test_collect_garbage_empty_storage(self):
+        self.assertEqual(collect_garbage(self.storage, timedelta(hours=-1)), [])
+
+    def test_gc_command(self):
+        orphaned = self._upload(b'content', 'orphan.pdf')
+        self.storage.delete(UploadFile.ref_path(1, 'upload'))
+        with mock.patch(
+            'group_project_v2.management.commands.gc_submission_blobs.get_storage',
+            mock.Mock(return_value=self.storage)
+        ):
+            call_command(Command(), grace_hours=0)
+        self.assertFalse(self.storage.exists(orphaned.file_storage_path))
@@ -1,4 +1,6 @@
-from datetime import datetime
+import io
+import zipfile
+from datetime import datetime, timedelta
 from unittest import TestCase
 
 import ddt
@@ -10,7 +12,16 @@ from xblock.core import XBlock
 from xblock.field_data import DictFieldData
 from xblock.fields import String
 
-from group_project_v2.utils import FieldValuesContextManager, build_date_field, get_block_content_id
+from group_project_v2.utils import (
+    FieldValuesContextManager,
+    build_date_field,
+    get_blob_key_from_url,
+    get_block_content_id,
+    get_default_stage,
+    make_content_disposition,
+    memoize_with_expiration,
+    stream_zip_archive,
+)
 
 
 class DummyXBlock(XBlock):
@@ -68,3 +79,145 @@ class TestUtils(TestCase):
     def test_build_date_field(self, json_string, expected):
         actual = build_date_field(json_string)
         self.assertEqual(actual, expected)
+
+    @ddt.data(
+        ("https://bucket.s3.amazonaws.com/group_work/blobs/abc/file.pdf?Signature=1", "group_work/blobs/abc/file.pdf"),
+        ("https://s3.amazonaws.com/bucket/group_work/blobs/abc/some%20file.pdf", "group_work/blobs/abc/some file.pdf"),
+        ("file:////base/media/group_work/blobs/abc/file.pdf", "group_work/blobs/abc/file.pdf"),
+        ("https://bucket.s3.amazonaws.com/group_work/12/abc/file.pdf", None),
+        ("/media/group_work/12/abc/file.pdf", None),
+    )
+    @ddt.unpack
+    def test_get_blob_key_from_url(self, url, expected):
+        self.assertEqual(get_blob_key_from_url(url), expected)
+
+    def test_stream_zip_archive(self):
+        big_payload = bytes(bytearray(range(256))) * 1024
+        modified = datetime(2015, 8, 1, 12, 30)
+
+        def missing_file():
+            raise IOError("no such file")
+
+        entries = [
+            ('dir/big.bin', lambda: io.BytesIO(big_payload), modified),
+            ('missing.bin', missing_file, modified),
+            ('dir/small.txt', lambda: io.BytesIO(b'small'), modified),
+        ]
+        chunks = list(stream_zip_archive(entries, chunk_size=1024))
+
+        self.assertGreater(len(chunks), 2)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        self.assertEqual(archive.namelist(), ['dir/big.bin', 'dir/small.txt'])
+        self.assertEqual(archive.read('dir/big.bin'), big_payload)
+        self.assertEqual(archive.read('dir/small.txt'), b'small')
+        self.assertEqual(archive.getinfo('dir/small.txt').date_time, (2015, 8, 1, 12, 30, 0))
+
+    @ddt.data(
+        (u"file.zip", u"attachment; filename=\"file.zip\"; filename*=UTF-8''file.zip"),
+        (u'my "file".zip', u"attachment; filename=\"my _file_.zip\"; filename*=UTF-8''my%20%22file%22.zip"),
+        (u"Résumé.zip", u"attachment; filename=\"Resume.zip\"; filename*=UTF-8''R%C3%A9sum%C3%A9.zip"),
+        (u"Тема.zip", u"attachment; filename=\".zip\"; filename*=UTF-8''%D0%A2%D0%B5%D0%BC%D0%B0.zip"),
+    )
+    @ddt.unpack
+    def test_make_content_disposition(self, filename, expected):
+        self.assertEqual(make_content_disposition(filename), expected)
+
+
+class StubStage(object):
+    """
+    Stage with open/closed flags; records which stages had their completion calculated
+    """
+    def __init__(self, name, is_open, is_closed, completed, completion_log):
+        self.name, self.is_open, self.is_closed = name, is_open, is_closed
+        self._completed, self._completion_log = completed, completion_log
+
+    @property
+    def completed(self):
+        self._completion_log.append(self.name)
+        return self._completed
+
+
+@ddt.ddt
+class TestGetDefaultStage(TestCase):
+    # stage spec: (is_open, is_closed, completed)
+    @ddt.data(
+        ([], None, []),
+        ([(False, False, False), (False, False, False)], 0, []),
+        ([(True, True, True), (True, True, False)], 1, []),
+        ([(True, True, True), (True, False, True), (True, False, False), (True, False, False)], 2, [1, 2]),
+        ([(True, False, False), (True, False, True), (False, False, False)], 0, [0]),
+        ([(True, False, True), (True, False, True), (False, False, False)], 1, [0, 1]),
+        ([(True, True, True), (False, False, False)], None, []),
+    )
+    @ddt.unpack
+    def test_get_default_stage(self, stage_specs, expected_index, expected_completion_calculated):
+        completion_log = []
+        stages = [StubStage(index, *spec, completion_log=completion_log) for index, spec in enumerate(stage_specs)]
+
+        default_stage = get_default_stage([None] + stages)
+
+        self.assertEqual(default_stage, stages[expected_index] if expected_index is not None else None)
+        self.assertEqual(completion_log, expected_completion_calculated)
+
+
+class TestMemoizeWithExpiration(TestCase):
+    def setUp(self):
+        self.now = datetime(2020, 1, 1)
+        for module in ('group_project_v2.utils', 'group_project_v2.api_cache'):
+            datetime_patch = mock.patch(module + '.datetime')
+            datetime_patch.start().now.side_effect = lambda: self.now
+            self.addCleanup(datetime_patch.stop)
+
+        self.refreshes = []
+        executor_patch = mock.patch('group_project_v2.utils._get_refresh_executor')
+        executor_patch.start().return_value.submit.side_effect = lambda *args: self.refreshes.append(args)
+        self.addCleanup(executor_patch.stop)
+
+        self.values = iter(range(100))
+        self.func = mock.Mock(__name__='get_value', side_effect=lambda key: next(self.values))
+
+    def _run_refreshes(self):
+        refreshes, self.refreshes = self.refreshes, []
+        for refresh in refreshes:
+            refresh[0](*refresh[1:])
+
+    def test_expiration(self):
+        get_value = memoize_with_expiration(timedelta(seconds=10))(self.func)
+        self.assertEqual(get_value(1), 0)
+        self.now += timedelta(seconds=9)
+        self.assertEqual(get_value(1), 0)
+        self.assertEqual(get_value(2), 1)
+        self.now += timedelta(seconds=1)
+        self.assertEqual(get_value(1), 2)
+        self.assertEqual(self.refreshes, [])
+
+    def test_stale_while_revalidate(self):
+        get_value = memoize_with_expiration(timedelta(seconds=10), stale_while_revalidate=timedelta(seconds=20))(
+            self.func
+        )
+        self.assertEqual(get_value(1), 0)
+        self.now += timedelta(seconds=15)
+
+        # stale value returned, single refresh scheduled
+        self.assertEqual(get_value(1), 0)
+        self.assertEqual(get_value(1), 0)
+        self.assertEqual(len(self.refreshes), 1)
+        self._run_refreshes()
+        self.assertEqual(get_value(1), 1)
+
+        # refresh failure keeps stale value, next call schedules refresh again
+        self.now += timedelta(seconds=15)
+        self.func.side_effect = ValueError()
+        self.assertEqual(get_value(1), 1)
+        self._run_refreshes()
+        self.assertEqual(get_value(1), 1)
+        self.assertEqual(len(self.refreshes), 1)
+
+    def test_max_staleness(self):
+        get_value = memoize_with_expiration(timedelta(seconds=10), stale_while_revalidate=timedelta(seconds=20))(
+            self.func
+        )
+        self.assertEqual(get_value(1), 0)
+        self.now += timedelta(seconds=30)
+        self.assertEqual(get_value(1), 1)
+        self.assertEqual(self.refreshes, [])
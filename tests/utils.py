@@ -90,6 +90,7 @@ def get_mock_project_api():
     mock_api.get_user_details = Mock(side_effect=_get_user_details)
     mock_api.get_workgroups_to_review = Mock(return_value={})
     mock_api.get_latest_workgroup_submissions_by_id = Mock(return_value={})
+    mock_api.get_latest_submissions_by_workgroup = Mock(return_value={})
     mock_api.get_user_peer_review_items = Mock(return_value={})
     mock_api.get_peer_review_items_for_group = Mock(return_value={})
     mock_api.get_workgroup_review_items = Mock(return_value={})
@@ -98,6 +99,7 @@ def get_mock_project_api():
         return_value=[{'display_name': "Org1", "id": 1}])
     mock_api.get_workgroup_reviewers = Mock(return_value={})
     mock_api.get_member_data = Mock(side_effect=_get_user_details)
+    mock_api.get_members_data = Mock(side_effect=lambda user_ids: [_get_user_details(user_id) for user_id in user_ids])
     mock_api.get_user_groups = Mock(return_value=tuple())
     mock_api.get_user_permissions = Mock(return_value=tuple())
     mock_api.get_user_roles_for_course = Mock(return_value=set())